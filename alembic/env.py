@@ -16,7 +16,7 @@ from app.models.life_moment import LifeMoment, LifeStage
 from app.models.prompt import Prompt
 from app.models.question import Question, QuestionType, Answer
 from app.models.influence import InfluenceType, InfluencingQuestion, ContentType
-from app.models.research import ResearchSource, SourceSite
+from app.models.research import ResearchSource, SourceSite, ResearchResult, ResearchClaim, ResearchSubject, ResearchSubjectPhase
 from app.models.twin import Twin
 from app.models.vision import VisionAnswers, VisionQuestion, VisionQuestionType
 from app.models.writing_style import Style, StyleContentType
@@ -8,7 +8,14 @@ from app.models.book_user import BookUser
 from app.models.research import ResearchSource
 from app.schemas.book import BookSetupSubmitSchema, BookCreate,BookSetupRequest, BookUpdate, BookListSchema
 from app.models.book import Book
-from app.scripts.web_research import conduct_research,conduct_research_copy
+from app.scripts.web_research import conduct_research,conduct_research_copy,compile_dossier
+from app.crud.research import replace_research_results, get_research_sections, replace_research_claims, get_research_claims, resolve_research_subject, get_research_inputs, subject_profile_url
+from app.services.phase_store import SubjectPhaseStore
+from app.services.pre_research import settle_speculative_research
+from app.services.citation_index import extract_claims_from_records
+from app.services.outline_generator import materialize_outline, load_outline_chapters, outline_from_chapters, outline_chapters, chapter_pages, store_streamed_chapter
+from app.crud.chapter import mark_chapter_ready, get_chapter
+from app.models.chapter import Chapter
 from app.scripts.expand_all_chapters import expand_all_chapters_copy
 from app.scripts.generate_outline import generate_outline_copy
 from app.scripts.expand_all_chapters import extract_chapter_titles_from_outline,expand_chapter_copy
@@ -29,23 +36,26 @@ from app.services.common import safe_json_loads
 
 import logging
 import time 
+from collections import Counter
 # root logger
 logger = logging.getLogger()
 router = APIRouter()
 
 
 
-def normalize_outline(outline):
-    if outline is None:
+def load_research_files(db: Session, book_user_id: UUID, figure_name: str):
+    """Rebuild the research archive from stored research rows (one indexed query).
+
+    Returns None when the book user has no stored rows yet, so callers fall
+    back to the files under static/research.
+    """
+    sections = get_research_sections(db, book_user_id)
+    if not sections:
         return None
-    if isinstance(outline, str):
-        return json.loads(outline)
-    if isinstance(outline, dict):
-        return outline
-    raise TypeError(f"Unexpected outline type: {type(outline)}")
+    return {"dossier.md": compile_dossier(figure_name, sections)}
 
 
-def run_conduct_research_worker(book_id: UUID):
+def run_conduct_research_worker(book_id: UUID, force_research: bool = False, force_outline: bool = False):
      
     db = SessionLocal()
     try:
@@ -81,34 +91,12 @@ def run_conduct_research_worker(book_id: UUID):
 
 
         # 3️⃣ Load research sources
-        research_sources = (
-            db.query(ResearchSource.source_url, ResearchSource.source_site)
-            .filter(ResearchSource.book_user_id == book_user.id)
-            .all()
-        )
-
-
-
-        research_sources = {
-            site: url
-            for url, site in research_sources
-            if url
-        }
-
-        
-
-        research_sources_lst = [
-            url
-            for site, url in research_sources.items()
-            if site not in ["linkedin", "twitter","youtube"]
-        ]
-
-        linkedin=research_sources.get("linkedin")
-        twitter=research_sources.get("twitter")
-        youtube=research_sources.get("youtube")
-
+        research_inputs = get_research_inputs(db, book_user.id)
+        research_sources_lst = research_inputs["research_sources"]
+        linkedin = research_inputs["linkedin"]
+        twitter = research_inputs["twitter"]
+        youtube = research_inputs["youtube"]
 
-        logger.info(f"🔍 Research sources: {research_sources}")
         logger.info(f"🔍 Research sources lst: {research_sources_lst}")
         logger.info(f"🔍 linkedin and twitter: {linkedin} , {twitter}")
 
@@ -123,7 +111,18 @@ def run_conduct_research_worker(book_id: UUID):
         # ⏳ Simulate research
         # time.sleep(20)
         
-        search_results=conduct_research_copy(figure_name=figure_name,refresh=True,research_sources=research_sources_lst,linkedin=linkedin, twitter=twitter, youtube=youtube)
+        # Public-web research is shared by every book about the same figure
+        # (user answers are not part of it), so repeat subjects reuse fresh phases
+        subject = resolve_research_subject(db, book_user.name, book_user.title, subject_profile_url(research_inputs))
+        book_user.subject_id = subject.id
+        db.commit()
+        subject_store = SubjectPhaseStore(subject.id, SessionLocal, sources=research_inputs)
+
+        # Speculative research queued at onboarding fills the same subject store:
+        # drop it if it has not started yet, otherwise let it finish and reuse its phases
+        settle_speculative_research(book_user.id)
+
+        search_results=conduct_research_copy(figure_name=figure_name,refresh=True,research_sources=research_sources_lst,linkedin=linkedin, twitter=twitter, youtube=youtube, force=force_research, store=subject_store)
 
         
         
@@ -134,23 +133,42 @@ def run_conduct_research_worker(book_id: UUID):
         # search_results = {"A":"v"}
 
         # 4️⃣ Update DB
-        book_user.digital_footprint_summary = json.dumps(search_results)
-        logger.info(f"✅ Research completed for book {book.id}")
-        dossier_path=search_results.get("dossier_path")
-        with open(dossier_path, "r", encoding="utf-8") as f:
-           dossier_text = f.read()
-
-        research_files = {
-                "dossier.md": dossier_text
-            }
+        records = search_results.pop("records", [])
+        replace_research_results(db, book_user.id, records)
+        claims = extract_claims_from_records(records)
+        replace_research_claims(db, book_user.id, claims)
+        book_user.digital_footprint_summary = json.dumps({
+            "dossier_path": search_results.get("dossier_path"),
+            "results_per_phase": dict(Counter(record["phase"] for record in records)),
+            "claims": len(claims),
+        })
+        logger.info(f"✅ Research completed for book {book.id} ({len(records)} results, {len(claims)} cited claims stored)")
+
+        research_files = load_research_files(db, book_user.id, figure_name) or {
+            "dossier.md": Path(search_results["dossier_path"]).read_text(encoding="utf-8")
+        }
 
 
 
         # handle create book outline 
         # outline=dummy_outline_json
-        outline=generate_outline_copy(figure_name=figure_name,research_files=research_files,context=answers_life_moments_context,no_of_chapters=book.number_of_chapters)
+        def save_streamed_chapter(chapter, outline_so_far):
+            # Store each chapter as soon as it is generated so the frontend can show
+            # it early and a failure later in the stream keeps what was produced;
+            # rows left from a previous outline are dropped as the stream passes them
+            book.raw_outline_json = outline_so_far
+            book.status = "outline_streaming"
+            store_streamed_chapter(db, book.id, len(outline_so_far["chapters"]), chapter)
+            db.commit()
+
+        outline=generate_outline_copy(figure_name=figure_name,research_files=research_files,context=answers_life_moments_context,no_of_chapters=book.number_of_chapters, on_chapter=save_streamed_chapter, force=force_outline or force_research)
+        if not outline:
+            raise RuntimeError("Outline generation failed")
         if isinstance(outline, str):
-            outline = safe_json_loads(outline)
+            outline = safe_json_loads(outline, expect=dict)
+        if not outline_chapters(outline):
+            # Never replace the stored chapters with an outline that has none
+            raise RuntimeError(f"Outline generation returned no chapters ({type(outline).__name__})")
 
 
 
@@ -162,6 +180,7 @@ def run_conduct_research_worker(book_id: UUID):
         # logger.info(f"after extract_chapter_titles_from_outline:{book.raw_outline_json}")
         book.status = "outline_ready"
         book.raw_outline_json=outline
+        materialize_outline(db, book.id, outline)
 
         logger.info("outline genereated")
 
@@ -232,15 +251,23 @@ def run_create_book(book_id: UUID):
         logger.info(f"figure name :{figure_name}")
 
 
-        outline=book.raw_outline_json
-        outline = normalize_outline(book.raw_outline_json)
-        logger.info(f"outline at run_create_book:{outline}")
+        # Chapters are read (and later updated) as single rows, not through the outline blob
+        chapters = load_outline_chapters(db, book)
+        chapters_by_index = {chapter.chapter_index: chapter for chapter in chapters}
+        outline = outline_from_chapters(chapters)
+        logger.info(f"outline at run_create_book: {len(chapters)} chapters")
         # outline=dummy_outline_json
 
 
         # handle expand chapter using outline 
 
-        generated_book=expand_all_chapters_copy(figure_name=figure_name,outline=outline)
+        research_files = load_research_files(db, book_user.id, figure_name)
+        claims = get_research_claims(db, book_user.id)
+        def save_expanded_chapter(index, content):
+            mark_chapter_ready(db, chapters_by_index[index], chapter_pages(content))
+            db.commit()
+
+        generated_book=expand_all_chapters_copy(figure_name=figure_name,outline=outline,research_files=research_files,claims=claims,on_chapter_expanded=save_expanded_chapter)
 
         logger.info(f"book md files genereted for :{book_id}")
         book.status = "created"
@@ -351,6 +378,72 @@ def check_book_status(
 
 
 
+@router.get("/chapters/{book_id}", status_code=status.HTTP_200_OK)
+def list_book_chapters(
+    book_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Per-chapter titles and statuses, without loading the outline or pages."""
+    chapters = (
+        db.query(Chapter.chapter_index, Chapter.title, Chapter.status)
+        .join(Book, Chapter.book_id == Book.id)
+        .join(BookUser, Book.book_user_id == BookUser.id)
+        .filter(
+            Chapter.book_id == book_id,
+            BookUser.user_id == current_user.id,
+            Book.is_deleted == False
+        )
+        .order_by(Chapter.chapter_index)
+        .all()
+    )
+    return {
+        "success": True,
+        "book_id": book_id,
+        "chapters": [
+            {"chapter_index": index, "title": title, "status": chapter_status}
+            for index, title, chapter_status in chapters
+        ],
+    }
+
+
+@router.get("/chapters/{book_id}/{chapter_index}", status_code=status.HTTP_200_OK)
+def get_book_chapter(
+    book_id: UUID,
+    chapter_index: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    book = (
+        db.query(Book)
+        .join(BookUser, Book.book_user_id == BookUser.id)
+        .filter(
+            Book.id == book_id,
+            BookUser.user_id == current_user.id,
+            Book.is_deleted == False
+        )
+        .first()
+    )
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    chapter = get_chapter(db, book_id, chapter_index)
+    if not chapter:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+
+    return {
+        "success": True,
+        "book_id": book_id,
+        "chapter_index": chapter.chapter_index,
+        "title": chapter.title,
+        "status": chapter.status,
+        "outline": chapter.outline,
+        "pages": chapter.pages,
+    }
+
+
+
+
 @router.get("/research-data/{book_id}", status_code=status.HTTP_200_OK)
 def get_research_data(
     book_id: UUID,
@@ -690,6 +783,8 @@ def get_dummy_book_setup():
 def create_book_outline(
     book_id:UUID,
     background_tasks: BackgroundTasks,
+    force_research: bool = False,
+    force_outline: bool = False,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -716,7 +811,9 @@ def create_book_outline(
 
         background_tasks.add_task(
                 run_conduct_research_worker,
-                book_id
+                book_id,
+                force_research,
+                force_outline
             )
         return {
             "status":"success"
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 from pathlib import Path
+from app.services.cache import cache_stats
 
 router = APIRouter()
 
@@ -57,4 +58,15 @@ def list_static_files():
         "base": "static",
         "total_files": len(files),
         "files": files
-    }
\ No newline at end of file
+    }
+
+
+
+@router.get("/cache/stats", tags=["Cache"])
+def get_cache_stats():
+    """
+    Hit/miss counters of the research/response caches in this process.
+    """
+    return {
+        "caches": cache_stats()
+    }
@@ -24,6 +24,7 @@ from app.schemas.book_user import BookUserCreate,BookUserRead
 from app.crud.research import create_research_source,create_research_sources_from_social_profiles,get_social_profiles_for_book_user
 from app.crud.book_user import create_book_user,get_latest_book_user
 from app.crud.vision import get_vision_answers_for_book_user
+from app.services.pre_research import enqueue_speculative_research
 
 # root logger
 logger = logging.getLogger()
@@ -91,6 +92,10 @@ def submit_onboarding(
 
         logger.info("Research sources created from social profiles")
 
+        # 5️⃣ Start public-web research now so it is ready by the time the outline is requested
+        if enqueue_speculative_research(db, book_user):
+            logger.info("Speculative research queued")
+
 
         return {
             "success": True,
@@ -463,6 +468,10 @@ def update_onboarding(
 
     # logger.info(f"after deleting research sources:{}")
 
+    # Re-queues only if name/title/sources changed (the stale job is cancelled)
+    if enqueue_speculative_research(db, book_user):
+        logger.info("Speculative research re-queued")
+
     return {
             "success": True,
             "book_user_id": book_user.id,
@@ -24,3 +24,44 @@ def update_chapter(db: Session, chapter: Chapter, data: ChapterUpdate) -> Chapte
     db.commit()
     db.refresh(chapter)
     return chapter
+
+
+def get_chapter(db: Session, book_id: UUID, chapter_index: int) -> Chapter | None:
+    return db.query(Chapter).filter(
+        Chapter.book_id == book_id,
+        Chapter.chapter_index == chapter_index,
+    ).first()
+
+
+def upsert_outline_chapter(db: Session, book_id: UUID, chapter_index: int, outline_chapter: dict) -> Chapter:
+    """Create or refresh a chapter row from its outline entry (caller commits).
+
+    A chapter whose outline entry changed goes back to pending and loses its
+    expanded pages.
+    """
+    chapter = get_chapter(db, book_id, chapter_index)
+    if chapter is None:
+        chapter = Chapter(book_id=book_id, chapter_index=chapter_index, status="pending")
+        db.add(chapter)
+    elif chapter.outline != outline_chapter:
+        chapter.pages = None
+        chapter.status = "pending"
+    chapter.title = (outline_chapter.get("chapter_title") or "")[:255] or None
+    chapter.description = outline_chapter.get("core_focus")
+    chapter.outline = outline_chapter
+    return chapter
+
+
+def delete_chapters_after(db: Session, book_id: UUID, last_index: int) -> int:
+    """Drop chapter rows past the outline's last chapter (caller commits)."""
+    return db.query(Chapter).filter(
+        Chapter.book_id == book_id,
+        Chapter.chapter_index > last_index,
+    ).delete(synchronize_session=False)
+
+
+def mark_chapter_ready(db: Session, chapter: Chapter, pages: dict) -> Chapter:
+    """Store a chapter's expanded pages and mark it ready (caller commits)."""
+    chapter.pages = pages
+    chapter.status = "ready"
+    return chapter
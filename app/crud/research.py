@@ -15,8 +15,10 @@
 
 from sqlalchemy.orm import Session
 from uuid import UUID
-from app.models.research import ResearchSource
+from app.models.research import ResearchSource, ResearchResult, ResearchClaim, ResearchSubject
 from app.schemas.research import ResearchSourceCreate, ResearchSourceUpdate
+from app.services.research_engine import format_search_result
+from app.services.enrichment import normalize_linkedin_url
 import logging
 
 # root logger
@@ -35,6 +37,28 @@ def get_research_sources(db: Session, book_user_id: UUID):
     ).all()
 
 
+def get_research_inputs(db: Session, book_user_id: UUID) -> dict:
+    """Research sources of a book user in the shape web research takes them.
+
+    Returns {"research_sources": [site urls], "linkedin", "twitter", "youtube"};
+    social profiles get their own queries, every other source is searched by site.
+    """
+    rows = (
+        db.query(ResearchSource.source_url, ResearchSource.source_site)
+        .filter(ResearchSource.book_user_id == book_user_id)
+        .all()
+    )
+    sources = {site: url for url, site in rows if url}
+    return {
+        "research_sources": [
+            url for site, url in sources.items() if site not in ["linkedin", "twitter", "youtube"]
+        ],
+        "linkedin": sources.get("linkedin"),
+        "twitter": sources.get("twitter"),
+        "youtube": sources.get("youtube"),
+    }
+
+
 def update_research_source(
     db: Session,
     source: ResearchSource,
@@ -47,7 +71,7 @@ def update_research_source(
     return source
 
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 def create_research_sources_from_social_profiles(
     db: Session,
@@ -186,3 +210,139 @@ def upsert_research_sources_from_social_profiles(
             .all()
         )
     logger.info(f"no of research sources created/updated from social profiles: {len(existing)}")
+
+
+
+# dossier order of research phases
+RESEARCH_PHASE_ORDER = ["Biography", "Profiles", "Media", "Publications", "Quotes", "Frameworks", "Themes"]
+
+
+def replace_research_results(db: Session, book_user_id: UUID, records: list):
+    """Swap a book user's research rows for a fresh run (caller commits)."""
+    db.query(ResearchResult).filter(
+        ResearchResult.book_user_id == book_user_id
+    ).delete(synchronize_session=False)
+
+    rows = []
+    for record in records:
+        usage = record.get("usage") or {}
+        rows.append(
+            ResearchResult(
+                book_user_id=book_user_id,
+                phase=record["phase"],
+                query_index=record["query_index"],
+                query=record["query"],
+                content=record["content"],
+                citations=record.get("citations"),
+                search_results=record.get("search_results"),
+                usage=record.get("usage"),
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                model=record.get("model"),
+                duration_ms=record.get("duration_ms"),
+            )
+        )
+    db.add_all(rows)
+    logger.info(f"stored {len(rows)} research results for book_user_id:{book_user_id}")
+    return rows
+
+
+def get_research_sections(db: Session, book_user_id: UUID, phases: list | None = None) -> dict:
+    """Load research as {phase: markdown} with one indexed query, in dossier order."""
+    query = db.query(
+        ResearchResult.phase,
+        ResearchResult.query_index,
+        ResearchResult.query,
+        ResearchResult.content,
+    ).filter(ResearchResult.book_user_id == book_user_id)
+    if phases:
+        query = query.filter(ResearchResult.phase.in_(phases))
+    rows = query.order_by(ResearchResult.phase, ResearchResult.query_index).all()
+
+    blocks = {}
+    for phase, query_index, query_text, content in rows:
+        blocks.setdefault(phase, []).append(format_search_result(query_index, query_text, content))
+
+    order = phases or RESEARCH_PHASE_ORDER
+    ordered = sorted(blocks, key=lambda p: order.index(p) if p in order else len(order))
+    return {phase: "\n".join(blocks[phase]) for phase in ordered}
+
+
+def replace_research_claims(db: Session, book_user_id: UUID, claims: list):
+    """Swap a book user's cited-claim index for a fresh run (caller commits)."""
+    db.query(ResearchClaim).filter(
+        ResearchClaim.book_user_id == book_user_id
+    ).delete(synchronize_session=False)
+
+    rows = [
+        ResearchClaim(
+            book_user_id=book_user_id,
+            phase=claim["phase"],
+            query_index=claim["query_index"],
+            query=claim["query"],
+            claim=claim["claim"],
+            citations=claim["citations"],
+        )
+        for claim in claims
+    ]
+    db.add_all(rows)
+    logger.info(f"stored {len(rows)} research claims for book_user_id:{book_user_id}")
+    return rows
+
+
+def get_research_claims(db: Session, book_user_id: UUID) -> list:
+    """A book user's claims as dicts, in research order (one indexed query)."""
+    rows = (
+        db.query(
+            ResearchClaim.phase,
+            ResearchClaim.query_index,
+            ResearchClaim.query,
+            ResearchClaim.claim,
+            ResearchClaim.citations,
+        )
+        .filter(ResearchClaim.book_user_id == book_user_id)
+        .all()
+    )
+    order = {phase: i for i, phase in enumerate(RESEARCH_PHASE_ORDER)}
+    rows.sort(key=lambda row: (order.get(row.phase, len(order)), row.query_index))
+    return [
+        {"phase": row.phase, "query_index": row.query_index, "query": row.query, "claim": row.claim, "citations": row.citations}
+        for row in rows
+    ]
+
+
+def research_subject_key(name: str, title: str | None = None, profile_url: str | None = None) -> str:
+    """Canonical key for a public figure: lowercased name + title, punctuation and extra spaces dropped.
+
+    With a profile URL (the person's own LinkedIn/X/YouTube page) the normalized
+    URL is appended, so different people sharing a name and title get different subjects.
+    """
+    raw = f"{name or ''} {title or ''}".lower()
+    key = " ".join("".join(c if c.isalnum() else " " for c in raw).split())
+    if profile_url:
+        key += f" | {normalize_linkedin_url(profile_url)}"
+    return key
+
+
+def subject_profile_url(research_inputs: dict) -> str | None:
+    """Strongest identity signal in a book user's research inputs: LinkedIn, else X, else YouTube."""
+    return research_inputs.get("linkedin") or research_inputs.get("twitter") or research_inputs.get("youtube")
+
+
+def resolve_research_subject(db: Session, name: str, title: str | None = None, profile_url: str | None = None) -> ResearchSubject:
+    """Get or create the canonical subject for a figure (safe against concurrent creation)."""
+    key = research_subject_key(name, title, profile_url)
+    subject = db.query(ResearchSubject).filter(ResearchSubject.subject_key == key).first()
+    if subject:
+        return subject
+
+    display_name = " ".join(part for part in [name, title] if part)
+    try:
+        with db.begin_nested():
+            subject = ResearchSubject(subject_key=key, display_name=display_name)
+            db.add(subject)
+    except IntegrityError:
+        # Another worker created it first
+        subject = db.query(ResearchSubject).filter(ResearchSubject.subject_key == key).one()
+    logger.info(f"resolved research subject '{display_name}' -> {subject.id}")
+    return subject
@@ -22,6 +22,8 @@ class BookUser(Base):
     title = Column(String(255),nullable=True)  
     bio = Column(Text,nullable=True)
     digital_footprint_summary = Column(Text,nullable=True)
+    # Canonical public figure whose shared research this book user reuses
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("research_subjects.id"), nullable=True)
     is_deleted = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
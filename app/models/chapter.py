@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Text, String, Integer, Enum, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Text, String, Integer, Enum, JSON, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import Base
 
@@ -8,6 +8,9 @@ from app.db.base import Base
 class Chapter(Base):
     "WE KEEP DATA FOR CHAPTERS OF BOOK , CREATED WHEN THE OUTLINE IS GENERATED USING AI" 
     __tablename__ = "chapters"
+    __table_args__ = (
+        UniqueConstraint("book_id", "chapter_index"),
+    )
 
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -15,7 +18,9 @@ class Chapter(Base):
 
     chapter_index = Column(Integer, nullable=False)
     title = Column(String(255),nullable=True)
-    description=Column(String(255),nullable=True)
+    description=Column(Text,nullable=True)
+    # THE CHAPTER'S ENTRY FROM THE OUTLINE (core_focus, opening_story, big_ideas, direct_quotes)
+    outline = Column(JSON,nullable=True)
 
     pages = Column(JSON,nullable=True)
     # Example:
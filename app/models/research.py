@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID, JSON
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Text, String, Integer, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSON, JSONB
 from app.db.base import Base
 
 
@@ -39,3 +39,93 @@ class ResearchSource(Base):
     source_metadata = Column("metadata", JSON,nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+
+class ResearchResult(Base):
+    """ONE ROW PER RESEARCH QUERY ANSWERED FOR A BOOK USER (PHASE, QUERY, ANSWER)
+    WITH ITS CITATIONS, TOKEN USAGE AND TIMING. OUTLINE AND CHAPTER STAGES
+    LOAD THEIR RESEARCH SECTIONS FROM HERE INSTEAD OF THE DOSSIER FILE
+    """
+    __tablename__ = "research_results"
+    __table_args__ = (
+        Index("ix_research_results_book_user_id_phase", "book_user_id", "phase", "query_index"),
+        Index("ix_research_results_citations", "citations", postgresql_using="gin"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    book_user_id = Column(UUID(as_uuid=True), ForeignKey("book_users.id"), nullable=False)
+    phase = Column(String(64), nullable=False)
+    query_index = Column(Integer, nullable=False)
+    query = Column(Text, nullable=False)
+    content = Column(Text, nullable=False)
+    citations = Column(JSONB, nullable=True)
+    search_results = Column(JSONB, nullable=True)
+    usage = Column(JSONB, nullable=True)
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    model = Column(String(64), nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+
+class ResearchClaim(Base):
+    """ONE ROW PER CITED FACT EXTRACTED FROM A BOOK USER'S RESEARCH ANSWERS
+    (CLAIM TEXT + RESOLVED SOURCE URLS, WITH THE PHASE AND QUERY IT CAME FROM).
+    CHAPTER PROMPTS PULL THE RELEVANT CLAIMS INSTEAD OF THE WHOLE DOSSIER
+    """
+    __tablename__ = "research_claims"
+    __table_args__ = (
+        Index("ix_research_claims_book_user_id_phase", "book_user_id", "phase", "query_index"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    book_user_id = Column(UUID(as_uuid=True), ForeignKey("book_users.id"), nullable=False)
+    phase = Column(String(64), nullable=False)
+    query_index = Column(Integer, nullable=False)
+    query = Column(Text, nullable=False)
+    claim = Column(Text, nullable=False)
+    citations = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+
+class ResearchSubject(Base):
+    """CANONICAL PUBLIC FIGURE THAT BOOKS RESOLVE TO (NORMALIZED NAME + TITLE, PLUS THE
+    PERSON'S OWN PROFILE URL WHEN KNOWN SO NAMESAKES DO NOT SHARE A SUBJECT).
+    PUBLIC-WEB RESEARCH IS STORED ONCE PER SUBJECT AND SHARED BY EVERY BOOK USER
+    POINTING AT IT; USER-PRIVATE ANSWERS NEVER GO IN HERE
+    """
+    __tablename__ = "research_subjects"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    subject_key = Column(String(512), nullable=False, unique=True)
+    display_name = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+
+class ResearchSubjectPhase(Base):
+    """LATEST RESEARCH OF ONE PHASE FOR A SUBJECT: INPUT FINGERPRINT, ANSWER RECORDS,
+    VERSION (BUMPED ON EVERY REFRESH) AND WHEN IT WAS RESEARCHED (FOR FRESHNESS).
+    PHASES WHOSE QUERIES EMBED THE USER'S OWN SOURCES ARE KEPT PER SOURCES_KEY
+    (HASH OF THOSE SOURCES, EMPTY FOR PHASES SHARED BY EVERY BOOK OF THE SUBJECT)
+    """
+    __tablename__ = "research_subject_phases"
+    __table_args__ = (
+        UniqueConstraint("subject_id", "phase", "sources_key"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("research_subjects.id"), nullable=False)
+    phase = Column(String(64), nullable=False)
+    sources_key = Column(String(64), nullable=False, default="")
+    fingerprint = Column(String(64), nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    records = Column(JSONB, nullable=False)
+    queries = Column(Integer, nullable=True)
+    executed = Column(Integer, nullable=True)
+    skipped = Column(Integer, nullable=True)
+    researched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Context Compression Benchmark - measures extractive TF-IDF compression
+throughput on real dossier files or on synthetic MB-sized dossiers, and
+compares term coverage against plain head truncation.
+
+Usage:
+    python -m app.scripts.benchmark_compression
+    python -m app.scripts.benchmark_compression --dossier "static/research/<figure>/dossier.md"
+    python -m app.scripts.benchmark_compression --sizes 500 2000 8000 --budget 12000
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+from app.services.chunking import approx_tokens, CHARS_PER_TOKEN
+from app.services.context_compression import compress_text
+from app.scripts.benchmark_dedup import PHASES
+
+_TERM_RE = re.compile(r"[a-z0-9]{3,}")
+
+
+def synthetic_dossier(target_kb, seed=11):
+    """Six-phase markdown dossier of ~target_kb with Zipf-distributed vocabulary and real sentence breaks."""
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(20000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    blocks, size, query = [], 0, 0
+    while size < target_kb * 1024:
+        phase = PHASES[query % len(PHASES)]
+        query += 1
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(vocabulary, weights=weights, k=rng.randint(8, 28))
+            sentences.append(" ".join(words).capitalize() + ".")
+        block = f"### {phase} search {query}\n\n{' '.join(sentences)}\n\n"
+        blocks.append(block)
+        size += len(block)
+    return "".join(blocks)
+
+
+def term_coverage(original, compressed):
+    terms = set(_TERM_RE.findall(original.lower()))
+    kept = set(_TERM_RE.findall(compressed.lower()))
+    return len(terms & kept) / len(terms) if terms else 1.0
+
+
+def run_case(label, text, budget, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressed = compress_text(text, budget)
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    mb = len(text) / (1024 * 1024)
+    truncated = text[:budget * CHARS_PER_TOKEN]
+    print(
+        f"{label:<28} {len(text) / 1024:>9.0f} KB {approx_tokens(text):>9} -> {approx_tokens(compressed):>6} tok "
+        f"{best * 1000:>9.1f} ms {mb / best if best else 0:>7.2f} MB/s "
+        f"coverage {term_coverage(text, compressed):>6.1%} (truncation {term_coverage(text, truncated):>6.1%})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extractive context compression")
+    parser.add_argument("--dossier", action="append", default=[], help="Path to a real dossier.md (repeatable)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[200, 1000, 4000], help="Synthetic dossier sizes in KB")
+    parser.add_argument("--budget", type=int, default=12000, help="Target size in tokens")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best time is reported)")
+    args = parser.parse_args()
+
+    for path in args.dossier:
+        text = Path(path).read_text(encoding="utf-8")
+        if not text.strip():
+            print(f"❌ Empty dossier: {path}")
+            sys.exit(1)
+        run_case(Path(path).parent.name[:28], text, args.budget, args.repeat)
+
+    for size_kb in args.sizes:
+        run_case(f"synthetic {size_kb}KB", synthetic_dossier(size_kb), args.budget, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Dossier Dedup Benchmark - measures MinHash/LSH near-duplicate removal
+on real dossier files or on synthetic dossiers of realistic sizes.
+
+Usage:
+    python -m app.scripts.benchmark_dedup
+    python -m app.scripts.benchmark_dedup --dossier "static/research/<figure>/dossier.md"
+    python -m app.scripts.benchmark_dedup --sizes 100 500 2000
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+from app.services.dedup import dedupe_sections
+
+PHASES = ["Biography", "Media", "Publications", "Quotes", "Frameworks", "Themes"]
+
+
+def load_dossier_sections(path):
+    """Split a dossier.md into {section title: markdown} on its '## ' headings."""
+    text = Path(path).read_text(encoding="utf-8")
+    parts = re.split(r"^## (.+)$", text, flags=re.MULTILINE)
+    return {parts[i].strip(): parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+
+
+def synthetic_sections(target_kb, duplicate_ratio=0.35, seed=7):
+    """Build a six-phase dossier of ~target_kb where a share of paragraphs are lightly edited repeats."""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(4000)]
+    originals = []
+    sections = {phase: [] for phase in PHASES}
+    size = 0
+    query = 0
+    while size < target_kb * 1024:
+        phase = PHASES[query % len(PHASES)]
+        query += 1
+        header = f"### Search {len(sections[phase]) + 1}: \"Subject\" query {query}"
+        if originals and rng.random() < duplicate_ratio:
+            words = rng.choice(originals).split()
+            for _ in range(max(1, len(words) // 30)):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            paragraph = " ".join(words) + f" [{rng.randint(1, 9)}]"
+        else:
+            paragraph = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(60, 140)))
+            originals.append(paragraph)
+        block = f"{header}\n\n{paragraph}\n\n"
+        sections[phase].append(block)
+        size += len(block)
+    return {phase: "\n".join(blocks) for phase, blocks in sections.items()}
+
+
+def run_case(label, sections, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, stats = dedupe_sections(sections)
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    mb = stats["chars_in"] / (1024 * 1024)
+    saved = 1 - stats["chars_out"] / stats["chars_in"] if stats["chars_in"] else 0
+    print(
+        f"{label:<28} {stats['chars_in'] / 1024:>9.0f} KB {stats['paragraphs']:>7} paras "
+        f"{stats['dropped']:>6} dropped {saved:>6.1%} saved {best * 1000:>9.1f} ms "
+        f"{mb / best if best else 0:>7.2f} MB/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dossier near-duplicate removal")
+    parser.add_argument("--dossier", action="append", default=[], help="Path to a real dossier.md (repeatable)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[50, 200, 500, 1000], help="Synthetic dossier sizes in KB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best time is reported)")
+    args = parser.parse_args()
+
+    for path in args.dossier:
+        sections = load_dossier_sections(path)
+        if not sections:
+            print(f"❌ No sections found in {path}")
+            sys.exit(1)
+        run_case(Path(path).parent.name[:28], sections, args.repeat)
+
+    for size_kb in args.sizes:
+        run_case(f"synthetic {size_kb}KB", synthetic_sections(size_kb), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
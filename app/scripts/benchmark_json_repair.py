@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+JSON Repair Benchmark - measures the tolerant outline parser (repair_json)
+on synthetic outline completions of typical sizes, clean and with the
+defects LLMs commonly produce, and compares it with json.loads and with the
+previous quote-replacement/brace-trimming fallback.
+
+Usage:
+    python -m app.scripts.benchmark_json_repair
+    python -m app.scripts.benchmark_json_repair --chapters 12 24 48 --repeat 20
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+
+from app.services.common import repair_json
+
+
+def legacy_safe_json_loads(text):
+    """The fallback safe_json_loads used before repair_json, kept for comparison."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        repaired = text.replace("“", "\"").replace("”", "\"").replace("’", "'")
+        start = repaired.find("{")
+        end = repaired.rfind("}")
+        if start != -1 and end != -1:
+            repaired = repaired[start:end + 1]
+        return json.loads(repaired)
+
+
+def synthetic_outline(chapters, seed=7):
+    """Outline dict in the generate_outline schema with ~60-word fields."""
+    rng = random.Random(seed)
+    words = "leadership growth customer product team market vision story risk capital trust scale".split()
+
+    def sentence(n=60):
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+    return {
+        "book_title": "The Long Game",
+        "introduction": {
+            "core_focus": sentence(),
+            "opening_story": sentence(120),
+            "big_idea": sentence(),
+            "direct_quote": sentence(20),
+        },
+        "chapters": [
+            {
+                "chapter_number": n,
+                "chapter_title": f"Chapter {n}: {sentence(5)}",
+                "core_focus": sentence(),
+                "opening_story": sentence(120),
+                "big_ideas": [sentence() for _ in range(5)],
+                "direct_quotes": [sentence(25) for _ in range(5)],
+            }
+            for n in range(1, chapters + 1)
+        ],
+    }
+
+
+DEFECTS = {
+    "clean": lambda text: text,
+    "fenced": lambda text: f"Here is the outline:\n```json\n{text}\n```",
+    "trailing commas": lambda text: re.sub(r'"\n(\s*)([}\]])', r'",\n\1\2', text),
+    "raw newlines": lambda text: text.replace("growth ", "growth\n", 40),
+    "inner quotes": lambda text: text.replace("vision story", 'vision "story"'),
+    "smart quotes": lambda text: text.replace('"book_title"', "“book_title”").replace('"chapters"', "“chapters”"),
+    "truncated 70%": lambda text: text[: int(len(text) * 0.7)],
+}
+
+
+def time_best(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            fn(text)
+        except ValueError:
+            pass
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def parses(fn, text):
+    try:
+        fn(text)
+        return True
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tolerant JSON repair on outline-sized completions")
+    parser.add_argument("--chapters", type=int, nargs="*", default=[8, 12, 24], help="Chapters per synthetic outline")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per case (best time is reported)")
+    args = parser.parse_args()
+
+    for chapters in args.chapters:
+        text = json.dumps(synthetic_outline(chapters), indent=2, ensure_ascii=False)
+        baseline = time_best(json.loads, text, args.repeat)
+        print(f"\n{chapters} chapters, {len(text) / 1024:.0f} KB (json.loads on clean text: {baseline * 1000:.2f} ms)")
+        for name, corrupt in DEFECTS.items():
+            broken = corrupt(text)
+            elapsed = time_best(repair_json, broken, args.repeat)
+            value, repairs = repair_json(broken)
+            kept = len(value.get("chapters", [])) if isinstance(value, dict) else 0
+            print(
+                f"  {name:<16} repair {elapsed * 1000:>8.2f} ms {len(broken) / 1024 / 1024 / elapsed:>6.2f} MB/s "
+                f"{len(repairs):>4} fixes {kept:>3}/{chapters} chapters   "
+                f"legacy {'ok' if parses(legacy_safe_json_loads, broken) else 'FAILED'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
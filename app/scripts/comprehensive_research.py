@@ -6,8 +6,12 @@ Replaces the "Ultimate Exhaustive Research" Cursor workflow
 
 import os
 import sys
+import json
+import time
 import argparse
 import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,79 +24,137 @@ from enrich_email import get_enrich_so_data
 
 load_dotenv()
 
+# Per-source timeouts (seconds), measured from the start of the run
+WEB_RESEARCH_TIMEOUT = float(os.getenv("COMPREHENSIVE_WEB_TIMEOUT", "1800"))
+EMAIL_TIMEOUT = float(os.getenv("COMPREHENSIVE_EMAIL_TIMEOUT", "60"))
+LINKEDIN_TIMEOUT = float(os.getenv("COMPREHENSIVE_LINKEDIN_TIMEOUT", "600"))
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
 
+def _start(fn, *args):
+    """Run fn(*args) on a daemon thread and return a Future for its result.
+
+    Daemon threads let a timed-out source be abandoned without holding up
+    interpreter exit (ThreadPoolExecutor workers are joined at exit).
+    """
+    future = Future()
+
+    def _run():
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_run, daemon=True).start()
+    return future
+
+
+def _wait(future, name, deadline):
+    """Result of a source's future, or None if it failed or missed its deadline."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        logging.warning(f"{name} timed out; continuing without it")
+    except Exception as e:
+        logging.error(f"{name} error: {e}")
+    return None
+
+
+def _save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    logging.info(f"Saved {path}")
+
+
 def comprehensive_research(figure_name, context=None, refresh=False, linkedin_url=None, email=None):
-    """Conduct comprehensive research using all available data sources."""
+    """Conduct comprehensive research using all available data sources.
+
+    Web research, email enrichment and LinkedIn enhancement run concurrently,
+    each with its own timeout, so the total time is roughly that of the slowest
+    source and a stuck source is skipped instead of blocking the others. When
+    no LinkedIn URL is given, LinkedIn enhancement waits for email enrichment to
+    discover one.
+    """
     logging.info(f"Starting comprehensive research for {figure_name}...")
     
     research_dir = Path("research") / figure_name
     research_dir.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
     
-    # Step 1: Web Research
-    logging.info("Phase 1: Web Research")
-    dossier_path = conduct_research(figure_name, context, refresh)
-    if not dossier_path:
-        logging.warning("Web research failed or skipped")
+    logging.info("Phase 1: Web Research (started)")
+    web_future = _start(conduct_research, figure_name, context, refresh)
     
-    # Step 2: Email Enrichment (if email provided)
-    enriched_data = None
+    email_future = None
     if email:
-        logging.info("Phase 2: Email Enrichment")
-        enriched_data = get_enrich_so_data(email)
+        logging.info("Phase 2: Email Enrichment (started)")
+        email_future = _start(get_enrich_so_data, email)
+    
+    def linkedin_source():
+        url = linkedin_url
+        if not url and email_future is not None:
+            enriched = _wait(email_future, "Email enrichment", started + EMAIL_TIMEOUT)
+            url = enriched.get("linkedin") if enriched and enriched.get("success") else None
+            if url:
+                logging.info(f"LinkedIn URL discovered via email enrichment: {url}")
+        if not url:
+            return url, None
+        return url, run_linkedin_research(figure_name, url)
+    
+    linkedin_future = None
+    if linkedin_url or email:
+        logging.info("Phase 3: LinkedIn Enhancement (started)")
+        linkedin_future = _start(linkedin_source)
+    
+    # Step 2: Email Enrichment result
+    enriched_data = None
+    if email_future is not None:
+        enriched_data = _wait(email_future, "Email enrichment", started + EMAIL_TIMEOUT)
         if enriched_data and enriched_data.get("success"):
             logging.info(f"✅ Enriched data retrieved for {email}")
-            # Save enriched data
-            enriched_path = research_dir / "enriched_data.json"
-            import json
-            with open(enriched_path, "w", encoding="utf-8") as f:
-                json.dump(enriched_data, f, indent=2, ensure_ascii=False)
-            logging.info(f"Enriched data saved to {enriched_path}")
-            
-            # Update LinkedIn URL if discovered via email
-            if not linkedin_url and enriched_data.get("linkedin"):
-                linkedin_url = enriched_data.get("linkedin")
-                logging.info(f"LinkedIn URL discovered via email enrichment: {linkedin_url}")
+            _save_json(research_dir / "enriched_data.json", enriched_data)
         else:
             logging.warning("Email enrichment failed or returned no data")
     
-    # Step 3: LinkedIn Enhancement (if LinkedIn URL available)
-    if linkedin_url:
-        logging.info("Phase 3: LinkedIn Enhancement")
-        try:
-            linkedin_result = run_linkedin_research(figure_name, linkedin_url)
+    # Step 3: LinkedIn Enhancement result
+    linkedin_status = "Skipped"
+    if linkedin_future is not None:
+        outcome = _wait(linkedin_future, "LinkedIn enhancement", started + LINKEDIN_TIMEOUT)
+        if outcome is None:
+            linkedin_status = "Failed/Timed out"
+        elif outcome[0]:
+            linkedin_result = outcome[1]
             if linkedin_result and linkedin_result.get("success"):
                 logging.info("✅ LinkedIn enhancement completed")
-                # Save LinkedIn data
-                linkedin_path = research_dir / "linkedin_data.json"
-                import json
-                with open(linkedin_path, "w", encoding="utf-8") as f:
-                    json.dump(linkedin_result, f, indent=2, ensure_ascii=False)
-                logging.info(f"LinkedIn data saved to {linkedin_path}")
+                _save_json(research_dir / "linkedin_data.json", linkedin_result)
+                linkedin_status = "Completed"
             else:
                 logging.warning("LinkedIn enhancement failed")
-        except Exception as e:
-            logging.error(f"LinkedIn enhancement error: {e}")
+                linkedin_status = "Failed"
+    
+    # Step 1: Web Research result
+    dossier_path = _wait(web_future, "Web research", started + WEB_RESEARCH_TIMEOUT)
+    if not dossier_path:
+        logging.warning("Web research failed or skipped")
     
     # Step 4: Data Integration Summary
-    logging.info("Phase 4: Data Integration Complete")
+    logging.info(f"Phase 4: Data Integration Complete ({time.monotonic() - started:.1f}s)")
     summary_path = research_dir / "research_summary.md"
     with open(summary_path, "w", encoding="utf-8") as f:
         f.write(f"# Research Summary: {figure_name}\n\n")
         f.write(f"## Data Sources Used\n\n")
         f.write(f"- ✅ Web Research: {'Completed' if dossier_path else 'Skipped/Failed'}\n")
         f.write(f"- ✅ Email Enrichment: {'Completed' if enriched_data and enriched_data.get('success') else 'Skipped/Failed'}\n")
-        f.write(f"- ✅ LinkedIn Enhancement: {'Completed' if linkedin_url else 'Skipped'}\n\n")
+        f.write(f"- ✅ LinkedIn Enhancement: {linkedin_status}\n\n")
         f.write(f"## Output Files\n\n")
         if dossier_path:
             f.write(f"- Dossier: {dossier_path}\n")
-        if enriched_data:
+        if enriched_data and enriched_data.get("success"):
             f.write(f"- Enriched Data: research/{figure_name}/enriched_data.json\n")
-        if linkedin_url:
+        if linkedin_status == "Completed":
             f.write(f"- LinkedIn Data: research/{figure_name}/linkedin_data.json\n")
     
     logging.info(f"✅ Comprehensive research complete. Summary: {summary_path}")
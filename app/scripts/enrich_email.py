@@ -5,11 +5,15 @@ Helper script to enrich email addresses with LinkedIn and other data using Enric
 import os
 import sys
 import subprocess
-import requests
 import time
 import json
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Make `app.*` importable when this file is run directly
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.services.enrichment import enrich_person, enrich_many
+
 def get_venv_python():
     """Get the Python executable from the virtual environment"""
     if os.name == 'nt':  # Windows
@@ -54,61 +58,8 @@ def import_pandas():
 load_dotenv()
 
 def get_enrich_so_data(email):
-    """Get enriched data from Enrich.so API for a given email"""
-    api_token = os.getenv("ENRICH_SO_API_KEY")
-    
-    if not api_token:
-        return {'error': 'ENRICH_SO_API_KEY not found in environment variables'}
-    
-    payload = {'email': email}
-    headers = {
-        'accept': 'application/json', 
-        'authorization': f'Bearer {api_token}'
-    }
-    
-    try:
-        resp = requests.get('https://api.enrich.so/v1/api/person', 
-                          params=payload, headers=headers, timeout=30)
-        
-        if resp.status_code == 200:
-            result = resp.json()
-            
-            # Extract all possible fields
-            enriched_data = {
-                "email": email,
-                "full_name": result.get("displayName"),
-                "first_name": result.get("firstName"),
-                "last_name": result.get("lastName"),
-                "linkedin": result.get("linkedInUrl"),
-                "company": result.get("company", {}).get("name"),
-                "company_website": result.get("company", {}).get("website"),
-                "company_industry": result.get("company", {}).get("industry"),
-                "company_size": result.get("company", {}).get("staff_count"),
-                "job_title": result.get("jobTitle"),
-                "location": result.get("location"),
-                "twitter": result.get("social", {}).get("twitter"),
-                "facebook": result.get("social", {}).get("facebook"),
-                "github": result.get("social", {}).get("github"),
-                "phone": result.get("phone"),
-                "additional_emails": ", ".join(result.get("emails", [])) if result.get("emails") else None,
-                "skills": ", ".join(result.get("skills", [])) if result.get("skills") else None,
-                "education": ", ".join([edu.get("name", "") for edu in result.get("education", [])]) if result.get("education") else None,
-                "experience": ", ".join([exp.get("title", "") + " at " + exp.get("company", "") for exp in result.get("experience", [])]) if result.get("experience") else None,
-                "success": True
-            }
-            return enriched_data
-        else:
-            return {
-                'email': email, 
-                'error': f'API Error {resp.status_code}: {resp.text}',
-                'success': False
-            }
-    except requests.exceptions.RequestException as e:
-        return {
-            'email': email, 
-            'error': f'Request failed: {str(e)}',
-            'success': False
-        }
+    """Get enriched data from Enrich.so API for a given email (cached, see app/services/enrichment.py)"""
+    return enrich_person(email=email)
 
 def enrich_single_email(email):
     """Enrich a single email address and return the data"""
@@ -143,11 +94,24 @@ def create_csv_from_enrichment(enrichment_data, csv_path="temp_enriched.csv"):
     
     return csv_path
 
+def enrich_emails(emails):
+    """Enrich a batch of email addresses concurrently (within the Enrich.so rate limit)"""
+    print(f"🔍 Enriching {len(emails)} emails...")
+    results = enrich_many(emails)
+    found = sum(1 for result in results if result.get('success'))
+    print(f"✅ Found data for {found}/{len(emails)} emails")
+    return results
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python3 scripts/enrich_email.py <email_address>")
+        print("Usage: python3 scripts/enrich_email.py <email_address> [more_email_addresses...]")
         sys.exit(1)
     
+    if len(sys.argv) > 2:
+        results = enrich_emails(sys.argv[1:])
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        sys.exit(0 if any(result.get('success') for result in results) else 1)
+    
     email = sys.argv[1]
     result = enrich_single_email(email)
     
@@ -6,10 +6,17 @@ Performs multi-phase research and saves to multiple structured files.
 
 import os
 import sys
+import time
+import asyncio
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from perplexity import Perplexity
+from perplexity import Perplexity, AsyncPerplexity
+
+# Allow running as `python3 scripts/exhaustive_research.py` from the app directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.services.research_engine import run_phases_async
+from app.scripts.web_research import search_perplexity_async, search_perplexity_record
 
 load_dotenv()
 
@@ -21,19 +28,14 @@ logging.basicConfig(
 )
 
 
-def search_perplexity(client, query, max_tokens=2000):
-    """Search using Perplexity API and return results."""
-    try:
-        completion = client.chat.completions.create(
-            model="sonar-pro",
-            messages=[{"role": "user", "content": query}],
-            max_tokens=max_tokens,
-            temperature=0.1
-        )
-        return completion.choices[0].message.content
-    except Exception as e:
-        logging.error(f"Perplexity search failed: {e}")
-        return None
+def search_perplexity(client, query, max_tokens=2000, refresh=False):
+    """Search using Perplexity API and return results.
+
+    Goes through the same research cache and shared rate budget as the
+    parallel mode; refresh=True skips cached answers.
+    """
+    record = search_perplexity_record(client, query, max_tokens, refresh=refresh)
+    return record["content"] if record else None
 
 
 def save_research_file(research_dir, filename, content):
@@ -45,8 +47,148 @@ def save_research_file(research_dir, filename, content):
     return filepath
 
 
-def exhaustive_research(figure_name, context=None, refresh=False):
-    """Conduct exhaustive multi-phase research."""
+def format_result(query, result):
+    return f"### {query}\n\n{result}\n\n"
+
+
+def build_phases(figure_name):
+    """Research phases as (label, output filename, queries)."""
+    return [
+        ("Phase 1: Identity & Biography", "bio.md", [
+            f'site:linkedin.com/in/ "{figure_name}"',
+            f'site:wikipedia.org "{figure_name}"',
+            f'site:crunchbase.com "{figure_name}"',
+            f'"{figure_name}" biography OR "about" OR "profile"',
+            f'"{figure_name}" CEO OR founder OR executive'
+        ]),
+        ("Phase 2: Media Sweep", "media.md", [
+            f'site:youtube.com "{figure_name}" interview OR talk OR speech',
+            f'site:spotify.com OR site:apple.com/podcasts "{figure_name}"',
+            f'"{figure_name}" video OR webinar OR presentation',
+            f'"{figure_name}" interview OR conversation OR discussion',
+            f'"{figure_name}" conference OR summit OR keynote'
+        ]),
+        ("Phase 3: Publications", "publications.md", [
+            f'"{figure_name}" book OR author OR published',
+            f'"{figure_name}" article OR blog OR writing',
+            f'"{figure_name}" research OR study OR paper',
+            f'"{figure_name}" whitepaper OR report OR analysis',
+            f'site:medium.com OR site:substack.com "{figure_name}"'
+        ]),
+        ("Phase 4: Quotes", "quotes.md", [
+            f'"{figure_name}" quotes OR sayings OR wisdom',
+            f'"{figure_name}" said OR stated OR mentioned',
+            f'site:twitter.com OR site:linkedin.com "{figure_name}"',
+            f'"{figure_name}" speech OR presentation OR keynote',
+            f'"{figure_name}" quote OR insight OR perspective'
+        ]),
+        ("Phase 5: Frameworks", "frameworks.md", [
+            f'"{figure_name}" framework OR model OR methodology',
+            f'"{figure_name}" process OR system OR approach',
+            f'"{figure_name}" strategy OR method OR technique',
+            f'"{figure_name}" concept OR theory OR principle',
+            f'"{figure_name}" philosophy OR mindset OR thinking'
+        ]),
+        ("Phase 6: Themes", "themes.md", [
+            f'"{figure_name}" values OR beliefs OR principles',
+            f'"{figure_name}" mission OR purpose OR vision',
+            f'"{figure_name}" philosophy OR worldview OR perspective',
+            f'"{figure_name}" passionate OR interested OR focused',
+            f'"{figure_name}" goal OR objective OR aim'
+        ]),
+    ]
+
+
+def run_phases_sequential(client, phases, research_dir, refresh=False):
+    """Run phases one after another; returns {label: (answered, seconds)}."""
+    timings = {}
+    for label, filename, queries in phases:
+        logging.info(label)
+        started = time.monotonic()
+        content = []
+        for query in queries:
+            result = search_perplexity(client, query, refresh=refresh)
+            if result:
+                content.append(format_result(query, result))
+        save_research_file(research_dir, filename, "\n".join(content))
+        timings[label] = (len(content), time.monotonic() - started)
+    return timings
+
+
+def run_phases_parallel(figure_name, phases, research_dir, refresh=False):
+    """Run all phases concurrently and write each phase file in query order.
+
+    Every query gets its own call (no packing), as in the sequential mode.
+    Answers are buffered per phase and appended as soon as all earlier
+    queries of the phase are in; answers waiting behind a failed query are
+    written once the run ends.
+    """
+    files = {label: open(research_dir / filename, "w", encoding="utf-8") for label, filename, _ in phases}
+    answered = {label: 0 for label, _, _ in phases}
+    buffered = {label: {} for label, _, _ in phases}
+    next_index = {label: 1 for label, _, _ in phases}
+    finished = {}
+    started = time.monotonic()
+
+    def write(label, record):
+        handle = files[label]
+        if answered[label]:
+            handle.write("\n")
+        handle.write(format_result(record["query"], record["content"]))
+        handle.flush()
+        answered[label] += 1
+        finished[label] = time.monotonic() - started
+
+    def on_result(record):
+        label = record["phase"]
+        buffered[label][record["query_index"]] = record
+        while next_index[label] in buffered[label]:
+            write(label, buffered[label].pop(next_index[label]))
+            next_index[label] += 1
+
+    async def _run():
+        async with AsyncPerplexity(api_key=PERPLEXITY_API_KEY) as client:
+            await run_phases_async(
+                [(label, [q.replace("{", "{{").replace("}", "}}") for q in queries]) for label, _, queries in phases],
+                lambda query, max_tokens: search_perplexity_async(client, query, max_tokens, refresh=refresh),
+                figure_name,
+                adaptive=False,
+                pack=False,
+                on_result=on_result,
+            )
+
+    try:
+        asyncio.run(_run())
+        for label, pending in buffered.items():
+            for index in sorted(pending):
+                write(label, pending[index])
+    finally:
+        for handle in files.values():
+            handle.close()
+    for label, filename, _ in phases:
+        logging.info(f"Saved: {filename}")
+    return {label: (answered[label], finished.get(label, 0.0)) for label, _, _ in phases}
+
+
+def log_timing_summary(timings):
+    logging.info("Phase timing summary:")
+    for label, (answered, seconds) in timings.items():
+        logging.info(f"  {label:<32} {answered:>2} answers {seconds:>7.1f}s")
+    if timings:
+        logging.info(f"  {'Longest phase':<32} {max(seconds for _, seconds in timings.values()):>18.1f}s")
+
+
+def exhaustive_research(figure_name, context=None, refresh=False, parallel=False):
+    """Conduct exhaustive multi-phase research.
+
+    With parallel=True all phases run concurrently under the shared Perplexity
+    rate budget, one call per query, and each phase file is written in query
+    order as its answers arrive.
+
+    Both modes read and fill the shared 7-day research cache, so they return
+    the same answers; refresh=True bypasses cached answers in both (the fresh
+    answers replace them).
+    """
     if not PERPLEXITY_API_KEY:
         logging.error("PERPLEXITY_API_KEY not set. Cannot conduct research.")
         return None
@@ -60,121 +202,22 @@ def exhaustive_research(figure_name, context=None, refresh=False):
         logging.info(f"Research already exists for {figure_name}. Use --refresh to overwrite.")
         return str(dossier_path)
     
-    try:
-        client = Perplexity(api_key=PERPLEXITY_API_KEY)
-    except Exception as e:
-        logging.error(f"Failed to initialize Perplexity client: {e}")
-        return None
+    client = None
+    if not parallel:
+        try:
+            client = Perplexity(api_key=PERPLEXITY_API_KEY)
+        except Exception as e:
+            logging.error(f"Failed to initialize Perplexity client: {e}")
+            return None
     
     logging.info(f"Starting exhaustive research for {figure_name}...")
-    
-    # Phase 1: Identity & Biography
-    logging.info("Phase 1: Identity & Biography")
-    bio_queries = [
-        f'site:linkedin.com/in/ "{figure_name}"',
-        f'site:wikipedia.org "{figure_name}"',
-        f'site:crunchbase.com "{figure_name}"',
-        f'"{figure_name}" biography OR "about" OR "profile"',
-        f'"{figure_name}" CEO OR founder OR executive'
-    ]
-    bio_content = []
-    for query in bio_queries:
-        result = search_perplexity(client, query)
-        if result:
-            bio_content.append(f"### {query}\n\n{result}\n\n")
-        import time
-        time.sleep(1)
-    save_research_file(research_dir, "bio.md", "\n".join(bio_content))
-    
-    # Phase 2: Media Sweep
-    logging.info("Phase 2: Media Sweep")
-    media_queries = [
-        f'site:youtube.com "{figure_name}" interview OR talk OR speech',
-        f'site:spotify.com OR site:apple.com/podcasts "{figure_name}"',
-        f'"{figure_name}" video OR webinar OR presentation',
-        f'"{figure_name}" interview OR conversation OR discussion',
-        f'"{figure_name}" conference OR summit OR keynote'
-    ]
-    media_content = []
-    for query in media_queries:
-        result = search_perplexity(client, query)
-        if result:
-            media_content.append(f"### {query}\n\n{result}\n\n")
-        import time
-        time.sleep(1)
-    save_research_file(research_dir, "media.md", "\n".join(media_content))
-    
-    # Phase 3: Publications
-    logging.info("Phase 3: Publications")
-    pub_queries = [
-        f'"{figure_name}" book OR author OR published',
-        f'"{figure_name}" article OR blog OR writing',
-        f'"{figure_name}" research OR study OR paper',
-        f'"{figure_name}" whitepaper OR report OR analysis',
-        f'site:medium.com OR site:substack.com "{figure_name}"'
-    ]
-    pub_content = []
-    for query in pub_queries:
-        result = search_perplexity(client, query)
-        if result:
-            pub_content.append(f"### {query}\n\n{result}\n\n")
-        import time
-        time.sleep(1)
-    save_research_file(research_dir, "publications.md", "\n".join(pub_content))
-    
-    # Phase 4: Quotes
-    logging.info("Phase 4: Quotes")
-    quote_queries = [
-        f'"{figure_name}" quotes OR sayings OR wisdom',
-        f'"{figure_name}" said OR stated OR mentioned',
-        f'site:twitter.com OR site:linkedin.com "{figure_name}"',
-        f'"{figure_name}" speech OR presentation OR keynote',
-        f'"{figure_name}" quote OR insight OR perspective'
-    ]
-    quote_content = []
-    for query in quote_queries:
-        result = search_perplexity(client, query)
-        if result:
-            quote_content.append(f"### {query}\n\n{result}\n\n")
-        import time
-        time.sleep(1)
-    save_research_file(research_dir, "quotes.md", "\n".join(quote_content))
-    
-    # Phase 5: Frameworks
-    logging.info("Phase 5: Frameworks")
-    framework_queries = [
-        f'"{figure_name}" framework OR model OR methodology',
-        f'"{figure_name}" process OR system OR approach',
-        f'"{figure_name}" strategy OR method OR technique',
-        f'"{figure_name}" concept OR theory OR principle',
-        f'"{figure_name}" philosophy OR mindset OR thinking'
-    ]
-    framework_content = []
-    for query in framework_queries:
-        result = search_perplexity(client, query)
-        if result:
-            framework_content.append(f"### {query}\n\n{result}\n\n")
-        import time
-        time.sleep(1)
-    save_research_file(research_dir, "frameworks.md", "\n".join(framework_content))
-    
-    # Phase 6: Themes
-    logging.info("Phase 6: Themes")
-    theme_queries = [
-        f'"{figure_name}" values OR beliefs OR principles',
-        f'"{figure_name}" mission OR purpose OR vision',
-        f'"{figure_name}" philosophy OR worldview OR perspective',
-        f'"{figure_name}" passionate OR interested OR focused',
-        f'"{figure_name}" goal OR objective OR aim'
-    ]
-    theme_content = []
-    for query in theme_queries:
-        result = search_perplexity(client, query)
-        if result:
-            theme_content.append(f"### {query}\n\n{result}\n\n")
-        import time
-        time.sleep(1)
-    save_research_file(research_dir, "themes.md", "\n".join(theme_content))
+
+    phases = build_phases(figure_name)
+    if parallel:
+        phase_timings = run_phases_parallel(figure_name, phases, research_dir, refresh=refresh)
+    else:
+        phase_timings = run_phases_sequential(client, phases, research_dir, refresh=refresh)
+    log_timing_summary(phase_timings)
     
     # Phase 7: Sources
     logging.info("Phase 7: Sources")
@@ -252,10 +295,11 @@ def main():
     parser.add_argument("figure_name", help="Name of the public figure to research")
     parser.add_argument("--context", help="Optional context for disambiguation")
     parser.add_argument("--refresh", action="store_true", help="Force fresh research")
+    parser.add_argument("--parallel", action="store_true", help="Run all phases concurrently and stream each file as results arrive")
     
     args = parser.parse_args()
     
-    result = exhaustive_research(args.figure_name, args.context, args.refresh)
+    result = exhaustive_research(args.figure_name, args.context, args.refresh, parallel=args.parallel)
     if result:
         print(f"✅ Research complete: {result}")
         sys.exit(0)
@@ -15,11 +15,46 @@ from dotenv import load_dotenv
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)
 from expand_chapter import load_research_archive, expand_chapter, slugify,expand_chapter_copy
+from app.services.citation_index import select_claims, render_claims
 
 load_dotenv()
 
 logger = logging.getLogger()
 
+# Cited facts per chapter prompt (see app/services/citation_index.py)
+CHAPTER_FACTS_TOKENS = int(os.getenv("CHAPTER_FACTS_TOKENS", "4000"))
+MIN_CHAPTER_FACTS = 8
+
+
+def _chapter_brief(chapter):
+    """Flatten an outline chapter (title, focus, story, ideas, quotes) into one text."""
+    if isinstance(chapter, str):
+        return chapter
+    parts = []
+    for value in (chapter or {}).values():
+        if isinstance(value, list):
+            parts.extend(str(item) for item in value)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def chapter_research_files(research_files, claims, chapter):
+    """Research for one chapter: its relevant cited facts in place of the dossier.
+
+    Falls back to the full research files when the claim index has fewer than
+    MIN_CHAPTER_FACTS facts relevant to the chapter.
+    """
+    if not claims:
+        return research_files
+    facts = select_claims(claims, _chapter_brief(chapter), CHAPTER_FACTS_TOKENS)
+    if len(facts) < MIN_CHAPTER_FACTS:
+        return research_files
+    logger.info(f"Using {len(facts)} cited facts for chapter instead of the dossier")
+    files = {name: content for name, content in (research_files or {}).items() if name != "dossier.md"}
+    files["facts.md"] = render_claims(facts)
+    return files
+
 
 
 def extract_chapter_titles_from_outline(outline_content):
@@ -139,8 +174,16 @@ def expand_all_chapters(figure_name):
     return expanded_count == len(chapters)
 
 
-def expand_all_chapters_copy(figure_name,outline):
-    """Expand all chapters from the outline."""
+def expand_all_chapters_copy(figure_name,outline,research_files=None,claims=None,on_chapter_expanded=None):
+    """Expand all chapters from the outline.
+
+    research_files: preloaded research archive (e.g. rebuilt from stored research rows);
+    falls back to the files under static/research when not given.
+    claims: the book's cited-claim index; when given, each chapter gets its
+    relevant facts instead of the whole dossier.
+    on_chapter_expanded(index, content): called with each chapter's markdown
+    (1-based index) as soon as it is written or found on disk.
+    """
     logger.info("expand_all_chapters_copy called")
     logger.info(f"outline in expand all chapters")
     research_dir = Path("static/research") / figure_name
@@ -182,7 +225,8 @@ def expand_all_chapters_copy(figure_name,outline):
     logger.info(f"Expanding {len(chapters)} chapters...")
     
     # Load research archive
-    research_files = load_research_archive(figure_name) # okay till here 
+    if research_files is None:
+        research_files = load_research_archive(figure_name) # okay till here 
     if not research_files:
         logger.warning(f"No research files found for {figure_name}, proceeding with outline only")
     
@@ -214,6 +258,8 @@ def expand_all_chapters_copy(figure_name,outline):
         if chapter_path.exists():
             logger.warning(f"Chapter already exists: {chapter_path}, skipping...")
             expanded_count += 1
+            if on_chapter_expanded is not None:
+                on_chapter_expanded(i, chapter_path.read_text(encoding="utf-8"))
             continue
 
 
@@ -221,7 +267,7 @@ def expand_all_chapters_copy(figure_name,outline):
         chapter_content = expand_chapter_copy(
             figure_name=figure_name,
             chapter_title=chapter_title,
-            research_files=research_files,
+            research_files=chapter_research_files(research_files, claims, chapter),
             chapter=chapter,
             previous_chapter=prev_summary,
         )
@@ -232,6 +278,8 @@ def expand_all_chapters_copy(figure_name,outline):
 
             logger.info(f"✅ Chapter {i} saved: {chapter_path}")
             expanded_count += 1
+            if on_chapter_expanded is not None:
+                on_chapter_expanded(i, chapter_content)
         else:
 
             logger.error(f"❌ Failed to expand chapter: {chapter_title}")
@@ -12,10 +12,32 @@ from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+# Make `app.*` importable when this file is run directly
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.services.rate_limiter import acquire, estimate_tokens
+from app.services.context_packer import pack_sections, render_sections, context_budget, count_tokens
+
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 
+CHAPTER_MODEL = "gpt-5.1"
+# Optional research context cap per chapter in real tokens (e.g. to bound prompt cost);
+# by default the context fills whatever the model window leaves
+CHAPTER_CONTEXT_TOKENS = int(os.getenv("CHAPTER_CONTEXT_TOKENS", "0")) or None
+# Expansion attempts resend the draft twice and may complete up to 16k tokens
+CHAPTER_RESERVED_TOKENS = 3 * 16000
+# Packing order of the chapter context (lower first); the rest go after these
+CHAPTER_CONTEXT_PRIORITIES = {
+    "=== CHAPTER TO EXPAND ===": 0,
+    "=== INTERVIEW TXT ===": 1,
+    "=== FACTS MD ===": 2,
+    "=== QUOTES MD ===": 3,
+    "=== THEMES MD ===": 4,
+    "=== DOSSIER MD ===": 6,
+}
+_CONTEXT_SLOT = "\x00RESEARCH_ARCHIVE\x00"
+
 logger = logging.getLogger()
 
 
@@ -220,6 +242,10 @@ You must expand this chapter to reach at least {MIN_WORD_COUNT} words. This is n
                 ]
                 max_completion_tokens = 16000  # Increased tokens for substantial expansion
             
+            acquire(
+                "openai",
+                estimate_tokens("".join(m["content"] for m in messages), max_completion_tokens),
+            )
             completion = client.chat.completions.create(
                 model="gpt-5.1",
                 messages=messages,
@@ -261,6 +287,16 @@ def extract_text(response):
     return ""
 
 
+def chapter_context_budget(system_prompt, fixed_prompt):
+    """Context tokens for a chapter: what the model window leaves after the prompts and the
+    output reserve, halved because expansion attempts carry the context twice, then
+    capped by CHAPTER_CONTEXT_TOKENS when that is set."""
+    budget = context_budget(CHAPTER_MODEL, [system_prompt, fixed_prompt, fixed_prompt], CHAPTER_RESERVED_TOKENS) // 2
+    if CHAPTER_CONTEXT_TOKENS:
+        budget = min(budget, CHAPTER_CONTEXT_TOKENS)
+    return budget
+
+
 
 def expand_chapter_copy(figure_name, chapter_title, research_files,chapter,previous_chapter=None):
     """Expand a chapter into full manuscript using ChatGPT."""
@@ -273,7 +309,7 @@ def expand_chapter_copy(figure_name, chapter_title, research_files,chapter,previ
     
     try:
         # client = OpenAI(api_key=OPENAI_API_KEY)
-        model = init_chat_model( model="gpt-5.1", api_key=OPENAI_API_KEY, temperature=0.7, max_tokens=60000 )
+        model = init_chat_model( model=CHAPTER_MODEL, api_key=OPENAI_API_KEY, temperature=0.7, max_tokens=60000 )
     except Exception as e:
         logging.error(f"Failed to initialize OpenAI client: {e}")
         return None
@@ -297,23 +333,15 @@ def expand_chapter_copy(figure_name, chapter_title, research_files,chapter,previ
         chapter_details = f"# {chapter_title}\n\n[Chapter details from outline not found]"
     
     # Build context
-    context_parts = [f"=== CHAPTER TO EXPAND ===\n{chapter_details}\n"]
+    sections = [("=== CHAPTER TO EXPAND ===", str(chapter_details))]
     
     # Add research files in priority order
-    for filename in ["interview.txt", "themes.md", "quotes.md", "media.md", "bio.md", "frameworks.md", "dossier.md"]:
+    for filename in ["interview.txt", "facts.md", "themes.md", "quotes.md", "media.md", "bio.md", "frameworks.md", "dossier.md"]:
         if filename in research_files:
-            context_parts.append(f"=== {filename.upper().replace('.', ' ')} ===\n{research_files[filename]}\n")
+            sections.append((f"=== {filename.upper().replace('.', ' ')} ===", research_files[filename]))
     
-    full_context = "\n".join(context_parts)
-
-    logger.info(f"full cnotext:{full_context}")
-    
-    # Truncate if too long (gpt-4o supports ~128k tokens, so ~500k characters is safe)
-    MAX_CONTEXT = 500000
-    if len(full_context) > MAX_CONTEXT:
-        logger.warning(f"Context too long ({len(full_context)} chars), truncating to {MAX_CONTEXT}")
-
-        full_context = full_context[:MAX_CONTEXT] + "\n\n[Context truncated...]"
+    # The research is packed in once the rest of the prompt is known
+    full_context = _CONTEXT_SLOT
     
     system_prompt = """You are a professional nonfiction ghostwriter. You expand book outlines into clear, authoritative manuscript chapters written in the first person from the subject's perspective."""
     
@@ -353,6 +381,21 @@ def expand_chapter_copy(figure_name, chapter_title, research_files,chapter,previ
 
 **Manuscript Chapter:**
 """
+
+    # Fit the research into what the window leaves, by priority (chapter brief and
+    # interview first, dossier last); expansion attempts carry the context twice
+    fixed_prompt = user_prompt.replace(_CONTEXT_SLOT, "")
+    sections = pack_sections(
+        sections,
+        CHAPTER_CONTEXT_PRIORITIES,
+        chapter_context_budget(system_prompt, fixed_prompt),
+        model=CHAPTER_MODEL,
+        separator="\n",
+    )
+    full_context = render_sections(sections, separator="\n")
+    user_prompt = user_prompt.replace(_CONTEXT_SLOT, full_context)
+
+    logger.info(f"Chapter context: {count_tokens(full_context, CHAPTER_MODEL)} tokens")
     
     chapter = None
     word_count = 0
@@ -453,6 +496,10 @@ You must expand this chapter to reach at least {MIN_WORD_COUNT} words. This is n
 
                 max_completion_tokens = 16000  # Increased tokens for substantial expansion
             
+            acquire(
+                "openai",
+                estimate_tokens("".join(m.content for m in messages), max_completion_tokens),
+            )
             response = model.invoke(messages)
             # completion = client.chat.completions.create(
             #     model="gpt-5.1",
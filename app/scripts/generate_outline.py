@@ -12,11 +12,48 @@ from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+# Make `app.*` importable when this file is run directly
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.services.rate_limiter import acquire, estimate_tokens
+from app.services.context_packer import pack_sections, render_sections, context_budget
+from app.services.outline_stream import StreamingOutlineParser
+from app.services.cache import DiskCache, make_key
+from app.services.common import repair_json
+
 load_dotenv()
 
 XAI_API_KEY = os.getenv("XAI_API_KEY", "").strip()
 GROK_ENDPOINT_BASE = "https://api.x.ai/v1"
 
+OUTLINE_MODEL = "grok-4-latest"
+OUTLINE_MAX_TOKENS = 4000
+# Research context cap for outline generation in real tokens (bounds prompt cost; the model window bounds it too)
+OUTLINE_CONTEXT_TOKENS = int(os.getenv("OUTLINE_CONTEXT_TOKENS", "12000"))
+USER_ANSWERS_HEADER = "=== USER ANSWERS & LIFE MOMENTS ==="
+# Packing order of the outline context (lower first); the rest go after these
+OUTLINE_CONTEXT_PRIORITIES = {
+    USER_ANSWERS_HEADER: 0,
+    "=== PRIMARY SOURCE: Interview Transcript ===": 1,
+    "=== QUOTES MD ===": 2,
+    "=== THEMES MD ===": 3,
+    "=== DOSSIER MD ===": 5,
+}
+_CONTEXT_SLOT = "\x00RESEARCH_MATERIALS\x00"
+# Stream the outline completion and hand over chapters as they close
+OUTLINE_STREAMING = os.getenv("OUTLINE_STREAMING", "true").lower() in ("1", "true", "yes")
+OUTLINE_TEMPERATURE = 0.7
+# Bump when the outline prompt changes so cached outlines from the old prompt are not reused
+OUTLINE_PROMPT_VERSION = 1
+
+# Generated outlines keyed by research files + user context + chapter count + prompt/model settings
+OUTLINE_CACHE_TTL_SECONDS = int(os.getenv("OUTLINE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+OUTLINE_CACHE_MAX_ENTRIES = int(os.getenv("OUTLINE_CACHE_MAX_ENTRIES", "500"))
+outline_cache = DiskCache(
+    "outlines",
+    ttl_seconds=OUTLINE_CACHE_TTL_SECONDS,
+    max_entries=OUTLINE_CACHE_MAX_ENTRIES,
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -129,6 +166,7 @@ For each chapter:
 **Book Outline:**
 """
     
+    acquire("xai", estimate_tokens(system_prompt + user_prompt, 4000))
     try:
         completion = client.chat.completions.create(
             model="grok-4-latest",
@@ -147,10 +185,46 @@ For each chapter:
         return None
 
 
-def generate_outline_copy(figure_name, research_files, no_of_chapters,context):
-    """Generate book outline using Grok."""
+def outline_cache_key(figure_name, research_files, no_of_chapters, context):
+    """Hash of everything the outline prompt is built from, plus the prompt version and model settings."""
+    return make_key(
+        OUTLINE_PROMPT_VERSION,
+        OUTLINE_MODEL,
+        OUTLINE_TEMPERATURE,
+        OUTLINE_MAX_TOKENS,
+        OUTLINE_CONTEXT_TOKENS,
+        figure_name,
+        no_of_chapters,
+        research_files,
+        context,
+    )
+
+
+def _is_complete_outline(outline):
+    """True if the outline text parses without having to close a truncated structure."""
+    try:
+        _, repairs = repair_json(outline, expect=dict)
+    except ValueError:
+        return False
+    return not any(r["fix"].startswith(("closed_truncated", "dropped_truncated")) for r in repairs)
+
+
+def generate_outline_copy(figure_name, research_files, no_of_chapters,context, on_chapter=None, force=False):
+    """Generate book outline using Grok.
+
+    With on_chapter (and OUTLINE_STREAMING on) the completion is streamed and
+    on_chapter(chapter, outline_so_far) is called as soon as each chapter
+    object is complete, so callers can store it before the rest arrives.
+    Identical inputs return the cached outline unless force=True.
+    """
     logger.info("generate outline copy called")
 
+    cache_key = outline_cache_key(figure_name, research_files, no_of_chapters, context)
+    if not force:
+        cached = outline_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Outline cache hit for {figure_name}")
+            return cached
 
     if not XAI_API_KEY:
         logger.error("XAI_API_KEY not set. Cannot generate outline.")
@@ -162,34 +236,24 @@ def generate_outline_copy(figure_name, research_files, no_of_chapters,context):
         logging.error(f"Failed to initialize Grok client: {e}")
         return None
     
-    # Build context from research files
-    context_parts = []
+    # Build context from research files as (header, content) sections
+    sections = []
     
     # Priority: interview.txt if available
     if "interview.txt" in research_files:
-        context_parts.append(f"=== PRIMARY SOURCE: Interview Transcript ===\n{research_files['interview.txt']}\n")
+        sections.append(("=== PRIMARY SOURCE: Interview Transcript ===", research_files["interview.txt"]))
     
     # Add other research files
     for filename in ["dossier.md", "bio.md", "media.md", "publications.md", "quotes.md", "frameworks.md", "themes.md"]:
         if filename in research_files:
             logger.info(f"filename:{filename} exist in generate outline function")
-            context_parts.append(f"=== {filename.upper().replace('.', ' ')} ===\n{research_files[filename]}\n")
+            sections.append((f"=== {filename.upper().replace('.', ' ')} ===", research_files[filename]))
     
-    # full_context = "\n".join(context_parts).join("/n").join(context) 
-    full_context = ""
-
-    if context_parts:
-        full_context += "\n\n".join(context_parts)
-
     if context:
-        full_context += "\n\n=== USER ANSWERS & LIFE MOMENTS ===\n"
-        full_context += context if isinstance(context, str) else json.dumps(context, indent=2)
-        
-    # Truncate if too long (Grok has limits)
-    MAX_CONTEXT = 50000
-    if len(full_context) > MAX_CONTEXT:
-        logging.warning(f"Context too long ({len(full_context)}), truncating to {MAX_CONTEXT}")
-        full_context = full_context[:MAX_CONTEXT] + "\n\n[Context truncated...]"
+        sections.append((USER_ANSWERS_HEADER, context if isinstance(context, str) else json.dumps(context, indent=2)))
+    
+    # The research is packed in once the rest of the prompt is known
+    full_context = _CONTEXT_SLOT
     
     system_prompt = """You are Book Architect, a world-class ghostwriter and nonfiction book strategist. 
 You create comprehensive book outlines in the authentic voice of the subject, using their actual words, 
@@ -255,22 +319,69 @@ Research Materials:
 Now return the JSON object only.
 """
 
+    # Fit the research into what the window leaves, by priority (user answers and
+    # interview first, dossier last), so nothing overflows or is cut mid-answer
+    budget = context_budget(
+        OUTLINE_MODEL,
+        [system_prompt, user_prompt.replace(_CONTEXT_SLOT, "")],
+        OUTLINE_MAX_TOKENS,
+        cap=OUTLINE_CONTEXT_TOKENS,
+    )
+    sections = pack_sections(sections, OUTLINE_CONTEXT_PRIORITIES, budget, model=OUTLINE_MODEL)
+    user_prompt = user_prompt.replace(_CONTEXT_SLOT, render_sections(sections))
+
+    acquire("xai", estimate_tokens(system_prompt + user_prompt, OUTLINE_MAX_TOKENS))
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    if on_chapter is not None and OUTLINE_STREAMING:
+        outline = stream_outline(client, messages, on_chapter)
+    else:
+        try:
+            completion = client.chat.completions.create(
+                model=OUTLINE_MODEL,
+                messages=messages,
+                temperature=OUTLINE_TEMPERATURE,
+                max_tokens=OUTLINE_MAX_TOKENS
+            )
+            
+            outline = completion.choices[0].message.content.strip()
+        except Exception as e:
+            logging.error(f"Failed to generate outline: {e}")
+            return None
+
+    if outline and _is_complete_outline(outline):
+        outline_cache.set(cache_key, outline)
+    return outline
+
+
+def stream_outline(client, messages, on_chapter):
+    """Stream the outline completion, calling on_chapter(chapter, outline_so_far) per completed chapter.
+
+    Returns the full outline text, or None if the stream fails; chapters
+    already handed to on_chapter are kept by the caller.
+    """
+    parser = StreamingOutlineParser()
     try:
-        completion = client.chat.completions.create(
-            model="grok-4-latest",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=4000
+        stream = client.chat.completions.create(
+            model=OUTLINE_MODEL,
+            messages=messages,
+            temperature=OUTLINE_TEMPERATURE,
+            max_tokens=OUTLINE_MAX_TOKENS,
+            stream=True,
         )
-        
-        outline = completion.choices[0].message.content.strip()
-        return outline
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            for kind, _, value in parser.feed(chunk.choices[0].delta.content or ""):
+                if kind == "item":
+                    logger.info(f"Outline chapter {len(parser.items)} streamed: {value.get('chapter_title') if isinstance(value, dict) else value}")
+                    on_chapter(value, parser.partial())
     except Exception as e:
-        logging.error(f"Failed to generate outline: {e}")
+        logging.error(f"Outline stream failed after {len(parser.items)} chapters: {e}")
         return None
+    return parser.text.strip()
 
 
 def main():
@@ -5,12 +5,22 @@ import json
 import logging
 import requests
 import pandas as pd
+from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI, RateLimitError, APITimeoutError, APIConnectionError, APIStatusError
 from perplexity import Perplexity
-import concurrent.futures
 from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 
+# Make `app.*` importable when this file is run directly (python research_script.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.services.rate_limiter import acquire, estimate_tokens
+from app.services.concurrency import get_controller, controller_stats
+from app.services.summarizer import map_reduce_summarize
+from app.services.enrichment import enrich_person
+from app.services.batch_runner import (
+    BatchCheckpoint, run_batch, iter_csv_rows, count_csv_rows, checkpoint_path, new_run_id,
+)
+
 # ==========================
 # 1) Load Environment & Config
 # ==========================
@@ -21,7 +31,6 @@ XAI_API_KEY = os.getenv("XAI_API_KEY", "").strip()  # Grok
 ENRICH_SO_API_KEY = os.getenv("ENRICH_SO_API_KEY", "").strip()  # Enrich.so data enrichment
 
 GROK_ENDPOINT_BASE = "https://api.x.ai/v1"
-ENRICH_SO_ENDPOINT = "https://api.enrich.so/v1/api/person"
 
 # Filenames
 INPUT_CSV_PATH = "input_people.csv"
@@ -29,38 +38,58 @@ OUTPUT_DATA_DIR = "output_data"
 BIOS_DIR = "bios"
 LOG_FILE_PATH = "research_log.log"
 
+# Columns of the input CSV (see input_people.csv)
+INPUT_COLUMNS = [
+    "first_name", "last_name", "email", "linkedin", "full_name", "job_title", "profile_picture",
+    "background_image", "summary", "location", "industry", "education", "experience", "skills",
+    "followers", "connections",
+]
+# Finished rows of each run are logged to a checkpoint per input file and run id. It is removed
+# once a run finishes without failures; set BATCH_RESUME_RUN_ID to resume an interrupted run.
+CHECKPOINT_DIR = os.getenv("BATCH_CHECKPOINT_DIR", os.path.join(OUTPUT_DATA_DIR, "checkpoints"))
+RESUME_RUN_ID = os.getenv("BATCH_RESUME_RUN_ID", "").strip()
+
 # Models
 DEFAULT_PERPLEXITY_MODEL = "sonar-pro" # Ensure this matches your API access
 DEFAULT_GROK_MODEL = "grok-4-latest"   # Ensure this matches your API access
 
 # --- Concurrency & Retry Settings ---
-MAX_WORKERS = 5  # Set based on the lowest API concurrency limit (iScraper = 5)
+# Upper bound on rows in progress; per-provider parallelism is adapted by the AIMD stages below
+MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "32"))
+# Rows read per CSV chunk and rows submitted but not yet finished (bounds memory for large batches)
+CSV_CHUNK_SIZE = int(os.getenv("BATCH_CSV_CHUNK_SIZE", "500"))
+MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", str(MAX_WORKERS * 2)))
 RETRY_ATTEMPTS = 3 # Number of retry attempts for API calls
 RETRY_WAIT_MIN_SECONDS = 1 # Minimum wait time for retries
 RETRY_WAIT_MAX_SECONDS = 10 # Maximum wait time for retries
 
-# Delays (Keep only essential ones)
-CHUNK_SUMMARY_DELAY = 1.0 # Delay between summarizing chunks for the *same* person (helps Perplexity RPM)
-
 # API Timeouts (seconds)
 GROK_TIMEOUT = 120
 
+# Adaptive concurrency per provider stage (see app/services/concurrency.py)
+PERPLEXITY_SUMMARY_STAGE = get_controller("perplexity_summary")
+GROK_BIO_STAGE = get_controller("grok_bio")
+
 # ==========================
 # 2) Logging Setup
 # ==========================
-log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - Thread-%(thread)d - %(message)s')
+def setup_logging():
+    """Log to research_log.log and stdout. Only called when run as a script, so importing this
+    module (e.g. for research_person) leaves the caller's logging configuration alone."""
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - Thread-%(thread)d - %(message)s')
+
+    file_handler = logging.FileHandler(LOG_FILE_PATH, encoding='utf-8')
+    file_handler.setFormatter(log_formatter)
 
-file_handler = logging.FileHandler(LOG_FILE_PATH, encoding='utf-8')
-file_handler.setFormatter(log_formatter)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(log_formatter)
 
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(log_formatter)
+    # Clear existing handlers and set up basic config
+    logging.getLogger().handlers = []
+    logging.basicConfig(level=logging.INFO, handlers=[file_handler, stream_handler])
+    logging.getLogger("requests").setLevel(logging.WARNING) # Quieten requests library logs
+    logging.getLogger("urllib3").setLevel(logging.WARNING)  # Quieten urllib3 logs
 
-# Clear existing handlers and set up basic config
-logging.getLogger().handlers = []
-logging.basicConfig(level=logging.INFO, handlers=[file_handler, stream_handler])
-logging.getLogger("requests").setLevel(logging.WARNING) # Quieten requests library logs
-logging.getLogger("urllib3").setLevel(logging.WARNING)  # Quieten urllib3 logs
 
 # ==========================
 # 3) HTTP Sessions & API Clients
@@ -104,10 +133,6 @@ def sanitize_filename(name: str) -> str:
         safe = "unnamed"
     return safe.replace(" ", "_")
 
-def chunk_text(text, chunk_size=3000):
-    # Simple chunking, consider more sophisticated methods if needed (e.g., sentence boundaries)
-    return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-
 def parse_linkedin_slug(link_url: str):
     if not link_url: return None
     lower = link_url.lower()
@@ -170,15 +195,17 @@ def call_perplexity_for_summary(text_to_summarize, context_title="Large Data"):
     )
 
     try:
-        completion = perplexity_client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": user_msg}
-            ],
-            model=DEFAULT_PERPLEXITY_MODEL,
-            temperature=0.1, # Low temp for factual summary
-            max_tokens=1024 # Adjust as needed, shorter for summaries
-        )
+        acquire("perplexity", estimate_tokens(system_msg + user_msg, 1024))
+        with PERPLEXITY_SUMMARY_STAGE.slot():
+            completion = perplexity_client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": system_msg},
+                    {"role": "user", "content": user_msg}
+                ],
+                model=DEFAULT_PERPLEXITY_MODEL,
+                temperature=0.1, # Low temp for factual summary
+                max_tokens=1024 # Adjust as needed, shorter for summaries
+            )
         
         summary = completion.choices[0].message.content.strip()
         if summary:
@@ -192,7 +219,7 @@ def call_perplexity_for_summary(text_to_summarize, context_title="Large Data"):
 
 
 def summarize_large_field(field_data, context_title="Large Field"):
-    """Summarizes large data, chunking if necessary."""
+    """Summarizes large data, chunking if necessary (see app/services/summarizer.py)."""
     if not field_data:
         return f"No data provided for '{context_title}'."
 
@@ -206,37 +233,13 @@ def summarize_large_field(field_data, context_title="Large Field"):
         logging.error(f"Error converting field data to string for '{context_title}': {e}")
         return f"Error processing data for '{context_title}'"
 
-    # Check size *before* making the first call
-    # Use a slightly smaller threshold than chunk_size to avoid single tiny chunk overhead
-    CHUNK_THRESHOLD = 2800
-    CHUNK_SIZE = 3000
-
-    if len(text_str) < CHUNK_THRESHOLD:
-        logging.info(f"Summarizing '{context_title}' (size: {len(text_str)}) directly.")
-        return call_perplexity_for_summary(text_str, context_title)
-    else:
-        logging.info(f"Field '{context_title}' is large ({len(text_str)} chars). Chunking required.")
-        parts = chunk_text(text_str, CHUNK_SIZE)
-        partial_summaries = []
-        for i, chunk in enumerate(parts):
-            chunk_title = f"{context_title} (chunk {i+1}/{len(parts)})"
-            logging.info(f"Summarizing {chunk_title}")
-            summary = call_perplexity_for_summary(chunk, chunk_title)
-            if summary.startswith("Error"):
-                 logging.warning(f"Failed to summarize {chunk_title}. Stopping summary for this field.")
-                 # Decide: return partial summary, or error? Returning error is safer.
-                 return f"Error summarizing chunk {i+1} for '{context_title}'."
-
-            partial_summaries.append(f"--- Summary of Chunk {i+1} ---\n{summary}")
-            if i < len(parts) - 1:
-                time.sleep(CHUNK_SUMMARY_DELAY) # Delay between chunk calls
-
-        combined_text = "\n\n".join(partial_summaries)
-        logging.info(f"Combining {len(parts)} partial summaries for '{context_title}'.")
-
-        # Final summary of summaries
-        final_summary = call_perplexity_for_summary(combined_text, f"{context_title} - Combined Summary")
-        return final_summary
+    # Map-reduce: boundary-aware chunks summarized concurrently, memoized by content hash
+    return map_reduce_summarize(
+        text_str,
+        call_perplexity_for_summary,
+        title=context_title,
+        namespace=f"perplexity:{DEFAULT_PERPLEXITY_MODEL}",
+    )
 
 
 def read_research_files(person_name: str):
@@ -289,65 +292,18 @@ def condense_research_context(person_name: str):
 
 
 def enrich_with_enrichso(email=None, linkedin_url=None):
-    """Enrich data using Enrich.so API. Requires either email or LinkedIn URL.
+    """Enrich data using Enrich.so API (cached, see app/services/enrichment.py).
     Returns: dict with enriched data or None if enrichment fails/not available."""
     if not ENRICH_SO_API_KEY:
         return None
-    
-    # Enrich.so primarily works with email addresses
-    if not email and linkedin_url:
-        # If we only have LinkedIn, we can't use Enrich.so (it requires email)
-        logging.info("Enrich.so requires email address; LinkedIn URL alone not sufficient")
-        return None
-    
-    if not email:
-        return None
-    
-    headers = {
-        'accept': 'application/json',
-        'authorization': f'Bearer {ENRICH_SO_API_KEY}'
-    }
-    payload = {'email': email}
-    
-    try:
-        resp = requests.get(ENRICH_SO_ENDPOINT, params=payload, headers=headers, timeout=30)
-        
-        if resp.status_code == 200:
-            result = resp.json()
-            
-            enriched_data = {
-                "email": email,
-                "full_name": result.get("displayName"),
-                "first_name": result.get("firstName"),
-                "last_name": result.get("lastName"),
-                "linkedin": result.get("linkedInUrl"),
-                "company": result.get("company", {}).get("name"),
-                "company_website": result.get("company", {}).get("website"),
-                "company_industry": result.get("company", {}).get("industry"),
-                "company_size": result.get("company", {}).get("staff_count"),
-                "job_title": result.get("jobTitle"),
-                "location": result.get("location"),
-                "twitter": result.get("social", {}).get("twitter"),
-                "facebook": result.get("social", {}).get("facebook"),
-                "github": result.get("social", {}).get("github"),
-                "phone": result.get("phone"),
-                "additional_emails": ", ".join(result.get("emails", [])) if result.get("emails") else None,
-                "skills": ", ".join(result.get("skills", [])) if result.get("skills") else None,
-                "education": ", ".join([edu.get("name", "") for edu in result.get("education", [])]) if result.get("education") else None,
-                "experience": ", ".join([exp.get("title", "") + " at " + exp.get("company", "") for exp in result.get("experience", [])]) if result.get("experience") else None,
-                "success": True
-            }
-            logging.info(f"Successfully enriched data for {email} via Enrich.so")
-            return enriched_data
-        else:
-            logging.warning(f"Enrich.so API returned status {resp.status_code} for {email}")
-            return None
-    except requests.exceptions.RequestException as e:
-        logging.warning(f"Enrich.so API request failed for {email}: {e}")
-        return None
-    except Exception as e:
-        logging.warning(f"Unexpected error enriching {email}: {e}")
-        return None
+
+    # Enrich.so primarily works with email addresses; a LinkedIn URL alone only hits the cache
+    result = enrich_person(email=email, linkedin_url=linkedin_url, api_key=ENRICH_SO_API_KEY)
+    if result.get("success"):
+        logging.info(f"Successfully enriched data for {email or linkedin_url} via Enrich.so")
+        return result
+    logging.info(f"Enrich.so enrichment unavailable for {email or linkedin_url}: {result.get('error')}")
+    return None
 
 
 @retry(
@@ -417,13 +373,15 @@ Based *strictly* on the information within the 'SOURCE TEXT' below, write a prof
     ]
 
     try:
-        completion = grok_client.chat.completions.create(
-            model=DEFAULT_GROK_MODEL,
-            messages=messages,
-            temperature=0.2, # Lower temperature for more factual output
-            max_tokens=1500 # Adjust based on desired bio length
-            # Consider adding 'stop' sequences if needed
-        )
+        acquire("xai", estimate_tokens(system_prompt + user_prompt, 1500))
+        with GROK_BIO_STAGE.slot():
+            completion = grok_client.chat.completions.create(
+                model=DEFAULT_GROK_MODEL,
+                messages=messages,
+                temperature=0.2, # Lower temperature for more factual output
+                max_tokens=1500 # Adjust based on desired bio length
+                # Consider adding 'stop' sequences if needed
+            )
         bio = completion.choices[0].message.content.strip()
         if bio:
             return bio
@@ -445,11 +403,9 @@ Based *strictly* on the information within the 'SOURCE TEXT' below, write a prof
 # ==========================
 # 6) Main Processing Function for One Row
 # ==========================
-def process_row(row_data, index, total_rows):
-    """Processes a single row: iScraper -> Summarize -> Grok Bio -> Save."""
+def build_record(row_data, index=0):
+    """Research context -> Enrich.so -> Grok bio for one person. Returns the record; nothing is written to disk."""
     person_name = safe_get(row_data, 'full_name', f"Row_{index+1}")
-    logging.info(f"--- Starting processing for {index+1}/{total_rows}: {person_name} ---")
-    row_start_time = time.time()
 
     # --- Step A: Summarize Local Research Files (optional) ---
     research_start = time.time()
@@ -485,7 +441,7 @@ def process_row(row_data, index, total_rows):
     grok_end = time.time()
     logging.info(f"Grok biography generation took {grok_end - grok_start:.2f}s for {person_name}")
 
-    # --- Step D: Build Record and Save ---
+    # --- Step D: Build Record ---
     record_obj = {
         "index": index,
         "input_row": row_data, # Maybe rename for clarity
@@ -497,8 +453,13 @@ def process_row(row_data, index, total_rows):
         "supplemental_context_summary": research_summary,
         "grok_final_bio": final_bio_text
     }
+    return record_obj
+
 
-    save_start = time.time()
+def save_record(record_obj):
+    """Write a record to OUTPUT_DATA_DIR/<name>.json and its biography to BIOS_DIR/<name>.txt."""
+    person_name = safe_get(record_obj["input_row"], 'full_name', f"Row_{record_obj['index']+1}")
+    final_bio_text = record_obj["grok_final_bio"]
     safe_name = sanitize_filename(person_name)
     out_json_path = os.path.join(OUTPUT_DATA_DIR, safe_name + ".json")
     out_txt_path = os.path.join(BIOS_DIR, safe_name + ".txt")
@@ -525,8 +486,14 @@ def process_row(row_data, index, total_rows):
     except Exception as e:
         logging.error(f"Error writing TXT bio for {person_name} to {out_txt_path}: {e}")
 
-    save_end = time.time()
-    # logging.info(f"Saving outputs took {save_end - save_start:.2f}s")
+
+def process_row(row_data, index, total_rows):
+    """Processes a single row: iScraper -> Summarize -> Grok Bio -> Save."""
+    person_name = safe_get(row_data, 'full_name', f"Row_{index+1}")
+    logging.info(f"--- Starting processing for {index+1}/{total_rows}: {person_name} ---")
+    row_start_time = time.time()
+
+    save_record(build_record(row_data, index))
 
     row_end_time = time.time()
     logging.info(f"--- Finished processing {person_name} in {row_end_time - row_start_time:.2f}s ---")
@@ -535,6 +502,26 @@ def process_row(row_data, index, total_rows):
     return f"Successfully processed: {person_name}"
 
 
+def research_person(full_name, linkedin_url="", email="", **fields):
+    """Run the single-person pipeline in-process and return its record.
+
+    Uses the module's shared, already-initialized clients and writes no files,
+    so it is cheap to call per person and safe to call from several threads.
+    Extra keyword arguments fill the other INPUT_COLUMNS (job_title, summary, ...).
+    """
+    names = full_name.split()
+    row_data = {column: "" for column in INPUT_COLUMNS}
+    row_data.update(
+        first_name=names[0] if names else "",
+        last_name=" ".join(names[1:]),
+        full_name=full_name,
+        linkedin=linkedin_url or "",
+        email=email or "",
+    )
+    row_data.update({key: str(value) for key, value in fields.items() if value})
+    return build_record(row_data)
+
+
 # ==========================
 # 7) Main Execution Block
 # ==========================
@@ -546,11 +533,16 @@ def main():
     os.makedirs(OUTPUT_DATA_DIR, exist_ok=True)
     os.makedirs(BIOS_DIR, exist_ok=True)
 
-    # Load input CSV
+    run_id = RESUME_RUN_ID or new_run_id()
+    checkpoint = BatchCheckpoint(checkpoint_path(CHECKPOINT_DIR, INPUT_CSV_PATH, run_id))
+    if RESUME_RUN_ID and not checkpoint.path.exists():
+        logging.error(f"No checkpoint for run {RESUME_RUN_ID} of {INPUT_CSV_PATH} ({checkpoint.path}). Nothing to resume.")
+        return
+    logging.info(f"Batch run {run_id} ({'resumed' if RESUME_RUN_ID else 'new'}), checkpoint: {checkpoint.path}")
+
+    # Count rows with a streaming pass; the rows themselves are read chunk by chunk below
     try:
-        # Explicitly treat all columns as strings, handle NA values
-        df = pd.read_csv(INPUT_CSV_PATH, dtype=str, keep_default_na=False)
-        # df.fillna('', inplace=True) # Already handled by keep_default_na=False + dtype=str
+        total_rows = count_csv_rows(INPUT_CSV_PATH, CSV_CHUNK_SIZE)
     except FileNotFoundError:
         logging.error(f"Input CSV not found: {INPUT_CSV_PATH}")
         return
@@ -558,50 +550,48 @@ def main():
         logging.error(f"Error reading or processing CSV {INPUT_CSV_PATH}: {e}")
         return
 
-    total_rows = len(df)
     if total_rows == 0:
         logging.info("Input CSV is empty. Exiting.")
         return
 
-    logging.info(f"Loaded {total_rows} rows from {INPUT_CSV_PATH}. Starting concurrent processing.")
-
-    successful_count = 0
-    failed_count = 0
-
-    # Use ThreadPoolExecutor for concurrency
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Create future tasks
-        future_to_index = {executor.submit(process_row, df.iloc[i].to_dict(), i, total_rows): i for i in range(total_rows)}
-
-        # Process futures as they complete
-        for future in concurrent.futures.as_completed(future_to_index):
-            index = future_to_index[future]
-            person_name = safe_get(df.iloc[index].to_dict(), 'full_name', f"Row_{index+1}")
-            try:
-                result = future.result() # Get the result (or exception)
-                logging.info(f"Future completed for index {index} ({person_name}): {result}")
-                if "Successfully processed" in result:
-                    successful_count += 1
-                else: # Should not happen if exceptions are caught, but as fallback
-                    failed_count += 1
-            except Exception as exc:
-                logging.error(f"!!! Processing generated an exception for index {index} ({person_name}): {exc}", exc_info=True) # Log traceback
-                failed_count += 1
+    already_done = checkpoint.done_count()
+    logging.info(f"Streaming {total_rows} rows from {INPUT_CSV_PATH} (checkpoint: {already_done} rows already done, "
+                 f"window: {MAX_IN_FLIGHT} rows in flight). Starting concurrent processing.")
+
+    counts = run_batch(
+        iter_csv_rows(INPUT_CSV_PATH, CSV_CHUNK_SIZE),
+        lambda row, index: process_row(row, index, total_rows),
+        checkpoint=checkpoint,
+        max_workers=MAX_WORKERS,
+        max_in_flight=MAX_IN_FLIGHT,
+        is_success=lambda result: "Successfully processed" in result,
+    )
+    successful_count, failed_count = counts["succeeded"], counts["failed"]
+    if failed_count:
+        logging.info(f"{failed_count} rows failed; retry them with BATCH_RESUME_RUN_ID={run_id}")
+    else:
+        checkpoint.reset()
 
     overall_end_time = time.time()
     total_duration = overall_end_time - overall_start_time
 
     logging.info("=" * 50)
     logging.info(f"Script finished processing {total_rows} rows.")
-    logging.info(f"Successful: {successful_count}, Failed: {failed_count}")
+    logging.info(f"Successful: {successful_count}, Failed: {failed_count}, Skipped (checkpoint): {counts['skipped']}")
+    for stage, stats in controller_stats().items():
+        logging.info(f"Adaptive concurrency [{stage}]: {stats}")
     logging.info(f"Total execution time: {total_duration:.2f} seconds ({total_duration / 60:.2f} minutes)")
-    logging.info(f"Average time per row: {total_duration / total_rows:.2f} seconds (approx, depends on concurrency)")
+    processed = successful_count + failed_count
+    if processed:
+        logging.info(f"Average time per row: {total_duration / processed:.2f} seconds (approx, depends on concurrency)")
     logging.info(f"JSON records saved in: '{OUTPUT_DATA_DIR}'")
     logging.info(f"Final biographies saved in: '{BIOS_DIR}'")
     logging.info("=" * 50)
 
 
 if __name__ == "__main__":
+    setup_logging()
+
     # Make sure API keys are loaded before initializing clients that need them
     if not PERPLEXITY_API_KEY: logging.warning("PERPLEXITY_API_KEY environment variable not set.")
     if not XAI_API_KEY: logging.warning("XAI_API_KEY environment variable not set. Grok bio generation will be skipped.")
@@ -5,7 +5,7 @@
 #
 # Workflows:
 #   research     → Run "Deep Research Dossier" (web research, single dossier file)
-#   exhaustive   → Run "Exhaustive Research" (multi-phase, multiple files)
+#   exhaustive   → Run "Exhaustive Research" (multi-phase, multiple files, phases run in parallel)
 #   auto         → Run "Deep Research + Book Outline" (web research + outline)
 #   confirm      → Run "Research → Confirm → Outline" (web research + pause + outline)
 #   batch        → Run "Batch Research" with CSV processing
@@ -18,6 +18,7 @@
 #
 # Options:
 #   --refresh    Force new research (archive old file first, then overwrite)
+#   --sequential Run exhaustive research phases one after another
 #   --auto       Skip manual pause in confirm workflow
 #   --linkedin   Provide LinkedIn URL for enhanced research
 #   --email      Provide email address for Enrich.so data
@@ -145,7 +146,11 @@ case $WORKFLOW in
     ;;
   exhaustive)
     echo "🔬 Running Exhaustive Research for $FIGURE ..."
-    python3 scripts/exhaustive_research.py "$FIGURE" $(echo "$OPTIONS" | grep -o '\--[^ ]*')
+    PARALLEL_FLAG="--parallel"
+    if [[ "$OPTIONS" == *"--sequential"* ]]; then
+      PARALLEL_FLAG=""
+    fi
+    python3 scripts/exhaustive_research.py "$FIGURE" $PARALLEL_FLAG $(echo "$OPTIONS" | grep -o '\--[^ ]*' | grep -v -- '--sequential')
     ;;
   *)
     echo "❌ Unknown workflow: $WORKFLOW"
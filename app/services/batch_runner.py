@@ -0,0 +1,169 @@
+"""
+Streaming, resumable CSV batch runner.
+
+The input CSV is read in chunks and rows are fed to a thread pool through a
+bounded in-flight window, so memory stays flat however many people the batch
+holds. Every finished row is appended to a JSONL checkpoint file keyed by a
+hash of the row's content. Checkpoints belong to one input file and one run
+(checkpoint_path); when an interrupted run is resumed by its run id, rows
+already marked done are skipped instead of being paid for twice. Failed rows
+are recorded too but retried on resume.
+"""
+
+import os
+import json
+import time
+import secrets
+import logging
+import threading
+import concurrent.futures
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def new_run_id():
+    """Id for a batch run, e.g. 20250101-120000-3fa2 (also names its checkpoint file)."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+
+
+def checkpoint_path(checkpoint_dir, input_path, run_id):
+    """Checkpoint file of one run over one input CSV: <dir>/<input stem>-<path hash>-<run id>.jsonl."""
+    input_path = Path(input_path)
+    scope = make_key(os.path.abspath(input_path))[:10]
+    return Path(checkpoint_dir) / f"{input_path.stem}-{scope}-{run_id}.jsonl"
+
+
+def row_key(row):
+    """Stable identity for a CSV row (its content, independent of position in the file)."""
+    return make_key(sorted(row.items()))
+
+
+def iter_csv_rows(path, chunksize=DEFAULT_CHUNK_SIZE):
+    """Yield (index, row dict) for every row, reading the file chunksize rows at a time."""
+    index = 0
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+        for row in chunk.to_dict(orient="records"):
+            yield index, row
+            index += 1
+
+
+def count_csv_rows(path, chunksize=DEFAULT_CHUNK_SIZE):
+    """Row count of a CSV file without holding it in memory."""
+    return sum(len(chunk) for chunk in pd.read_csv(path, dtype=str, usecols=[0], chunksize=chunksize))
+
+
+class BatchCheckpoint:
+    """Append-only JSONL log of finished rows: {"key", "index", "status", "detail", "at"} per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._done = None
+        self._lock = threading.Lock()
+        self._handle = None
+
+    def _load(self):
+        done = set()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line from a crash mid-write
+                        continue
+                    if entry.get("status") == STATUS_DONE:
+                        done.add(entry["key"])
+                    else:
+                        done.discard(entry["key"])
+        except FileNotFoundError:
+            pass
+        return done
+
+    def is_done(self, key):
+        if self._done is None:
+            self._done = self._load()
+        return key in self._done
+
+    def done_count(self):
+        if self._done is None:
+            self._done = self._load()
+        return len(self._done)
+
+    def record(self, key, index, status, detail=None):
+        entry = {"key": key, "index": index, "status": status, "detail": detail, "at": time.time()}
+        with self._lock:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = open(self.path, "a", encoding="utf-8")
+            self._handle.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._handle.flush()
+            if self._done is not None:
+                if status == STATUS_DONE:
+                    self._done.add(key)
+                else:
+                    self._done.discard(key)
+
+    def reset(self):
+        with self._lock:
+            self.close()
+            self.path.unlink(missing_ok=True)
+            self._done = set()
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def run_batch(rows, process, checkpoint=None, max_workers=8, max_in_flight=None, is_success=None):
+    """Run process(row, index) over (index, row) pairs with at most max_in_flight rows pending.
+
+    Rows whose key is already done in the checkpoint are skipped. is_success(result)
+    decides whether a returned result counts as done (default: any result).
+    Returns {"succeeded", "failed", "skipped"} counts.
+    """
+    max_in_flight = max_in_flight or max_workers * 2
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+    pending = {}
+
+    def _collect(done):
+        for future in done:
+            index, key = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:
+                logger.error(f"Row {index} raised: {exc}", exc_info=True)
+                result, ok = str(exc), False
+            else:
+                ok = is_success(result) if is_success else True
+            counts["succeeded" if ok else "failed"] += 1
+            if checkpoint is not None:
+                checkpoint.record(key, index, STATUS_DONE if ok else STATUS_FAILED, result)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, row in rows:
+            key = row_key(row)
+            if checkpoint is not None and checkpoint.is_done(key):
+                counts["skipped"] += 1
+                continue
+            while len(pending) >= max_in_flight:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                _collect(done)
+            pending[executor.submit(process, row, index)] = (index, key)
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            _collect(done)
+
+    if checkpoint is not None:
+        checkpoint.close()
+    return counts
@@ -0,0 +1,157 @@
+"""
+Small persistent key/value cache on local disk.
+
+Each namespace is a table in a shared sqlite file, so it survives restarts
+and is safe to use from several threads and worker processes at once.
+Entries carry their own expiry and the table is kept under `max_entries`
+by evicting the least recently used rows.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+CACHE_DB_NAME = "cache.sqlite3"
+
+# namespace -> DiskCache, used by cache_stats()
+_registry = {}
+
+
+def make_key(*parts):
+    """Stable hash for a tuple of JSON-serialisable key parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """TTL + LRU bounded cache stored in sqlite."""
+
+    def __init__(self, namespace, ttl_seconds, max_entries=5000, cache_dir=None):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path = Path(cache_dir or CACHE_DIR) / CACHE_DB_NAME
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._table = "cache_" + "".join(c if c.isalnum() else "_" for c in namespace)
+        self._ready = False
+        _registry[namespace] = self
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{self._table}_last_access ON {self._table} (last_access)"
+            )
+            self._ready = True
+        return conn
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        """Return the cached value or `default` when missing/expired."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] < now:
+                    self._count(False)
+                    return default
+                conn.execute(f"UPDATE {self._table} SET last_access = ? WHERE key = ?", (now, key))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"[cache:{self.namespace}] read failed: {e}")
+            self._count(False)
+            return default
+
+        self._count(True)
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl_seconds=None):
+        """Store a JSON-serialisable value, optionally with its own TTL."""
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self._table} (key, value, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False, default=str), now, expires_at, now),
+                )
+                self._evict(conn, now)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"[cache:{self.namespace}] write failed: {e}")
+
+    def delete(self, key):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"[cache:{self.namespace}] delete failed: {e}")
+
+    def _evict(self, conn, now):
+        conn.execute(f"DELETE FROM {self._table} WHERE expires_at < ?", (now,))
+        overflow = conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f"DELETE FROM {self._table} WHERE key IN ("
+                f"SELECT key FROM {self._table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self):
+        entries = None
+        try:
+            conn = self._connect()
+            try:
+                entries = conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def cache_stats():
+    """Hit/miss counters for every cache created in this process."""
+    return [cache.stats() for cache in _registry.values()]
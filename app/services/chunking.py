@@ -0,0 +1,76 @@
+"""
+Boundary-aware text chunking with a token budget.
+
+Text is split on paragraphs first, then on lines and sentences for
+paragraphs that are too large on their own (pretty-printed JSON has no blank
+lines), and only as a last resort on words. The pieces are
+packed greedily into chunks of at most `max_tokens`, so a chunk never cuts a
+sentence in half unless that sentence alone exceeds the budget.
+"""
+
+import re
+
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_LINE_RE = re.compile(r"\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])")
+
+
+def approx_tokens(text):
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _split_words(text, max_tokens, count_tokens):
+    pieces, current, current_tokens = [], [], 0
+    for word in text.split():
+        word_tokens = count_tokens(" " + word)
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _fit(text, max_tokens, count_tokens, splitters):
+    """Yield (piece, separator) pairs, splitting with the next splitter only where needed."""
+    if count_tokens(text) <= max_tokens:
+        yield text, "\n\n"
+        return
+    if not splitters:
+        for piece in _split_words(text, max_tokens, count_tokens):
+            yield piece, " "
+        return
+    pattern, separator = splitters[0]
+    for part in pattern.split(text):
+        if not part.strip():
+            continue
+        for piece, inner_separator in _fit(part.strip("\n"), max_tokens, count_tokens, splitters[1:]):
+            yield piece, separator if inner_separator == "\n\n" else inner_separator
+
+
+def _pieces(text, max_tokens, count_tokens):
+    """Yield paragraph/line/sentence/word pieces that each fit the budget, with their separator."""
+    splitters = [(_LINE_RE, "\n"), (_SENTENCE_RE, " ")]
+    for paragraph in _PARAGRAPH_RE.split(text):
+        if paragraph.strip():
+            yield from _fit(paragraph.strip("\n"), max_tokens, count_tokens, splitters)
+
+
+def split_into_chunks(text, max_tokens=750, count_tokens=approx_tokens):
+    """Split text into chunks of at most max_tokens, cutting on paragraph/sentence boundaries."""
+    chunks, current, current_tokens = [], "", 0
+    for piece, separator in _pieces(text or "", max_tokens, count_tokens):
+        piece_tokens = count_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current = current + separator + piece if current else piece
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,127 @@
+"""
+Cited-claim index built from research answers.
+
+Perplexity answers mark their facts with numbered citations ("... in 2015.[1][3]")
+and return the cited URLs alongside. extract_claims turns every cited
+sentence of a research record into a claim with its resolved sources, keeping
+the phase and query it came from. Identical claims found by several queries
+are stored once with their sources merged.
+
+select_claims ranks a book's claims against a chapter brief (IDF-weighted term
+overlap) and render_claims formats the best ones within a token budget, so a
+chapter prompt can carry just the relevant cited facts instead of the whole
+dossier.
+"""
+
+import re
+import math
+from collections import Counter
+
+from app.services.chunking import approx_tokens
+from app.services.context_compression import terms
+
+MIN_CLAIM_CHARS = 25
+
+_CITATION_RE = re.compile(r"\[(\d{1,3})\]")
+_CLAIM_SPLIT_RE = re.compile(r"(?<=[.!?\]])\s+(?=[\"'(A-Z0-9*])")
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_MARKDOWN_RE = re.compile(r"\*\*|__|`")
+
+
+def _sources(record, numbers):
+    """Resolve citation numbers against the record's citations/search_results."""
+    urls = record.get("citations") or []
+    titles = {
+        result.get("url"): result.get("title")
+        for result in record.get("search_results") or []
+        if isinstance(result, dict)
+    }
+    sources = []
+    for n in numbers:
+        if 1 <= n <= len(urls):
+            url = urls[n - 1]
+            sources.append({"n": n, "url": url, "title": titles.get(url)})
+    return sources
+
+
+def extract_claims(record):
+    """Cited sentences of one research record as claim dicts.
+
+    Each claim: {"phase", "query_index", "query", "claim", "citations": [{"n", "url", "title"}]}.
+    Sentences without a citation marker, or whose markers resolve to no URL, are skipped.
+    """
+    claims = []
+    for line in (record.get("content") or "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        line = _LIST_MARKER_RE.sub("", line)
+        for sentence in _CLAIM_SPLIT_RE.split(line):
+            numbers = sorted({int(n) for n in _CITATION_RE.findall(sentence)})
+            if not numbers:
+                continue
+            text = _MARKDOWN_RE.sub("", _CITATION_RE.sub("", sentence))
+            text = re.sub(r"\s+([.,;:!?])", r"\1", " ".join(text.split())).strip()
+            sources = _sources(record, numbers)
+            if len(text) < MIN_CLAIM_CHARS or not sources:
+                continue
+            claims.append({
+                "phase": record["phase"],
+                "query_index": record["query_index"],
+                "query": record["query"],
+                "claim": text,
+                "citations": sources,
+            })
+    return claims
+
+
+def extract_claims_from_records(records):
+    """Claims of all records, de-duplicated by normalized text (sources merged)."""
+    merged = {}
+    for record in records:
+        for claim in extract_claims(record):
+            key = " ".join(terms(claim["claim"])) or claim["claim"].lower()
+            if key not in merged:
+                merged[key] = claim
+                continue
+            known = {source["url"] for source in merged[key]["citations"]}
+            merged[key]["citations"].extend(s for s in claim["citations"] if s["url"] not in known)
+    return list(merged.values())
+
+
+def select_claims(claims, brief, max_tokens=3000, count_tokens=approx_tokens):
+    """Claims most relevant to a brief (e.g. chapter title + focus + big ideas), within max_tokens.
+
+    Returned in research order (phase, query, position) for a readable prompt.
+    """
+    brief_terms = set(terms(brief))
+    if not claims or not brief_terms:
+        return []
+
+    claim_terms = [set(terms(claim["claim"])) for claim in claims]
+    df = Counter(term for term_set in claim_terms for term in term_set & brief_terms)
+    idf = {term: math.log((1 + len(claims)) / (1 + count)) + 1.0 for term, count in df.items()}
+
+    scored = []
+    for i, term_set in enumerate(claim_terms):
+        overlap = term_set & brief_terms
+        if overlap:
+            scored.append((sum(idf[t] for t in overlap) / math.sqrt(len(term_set)), i))
+    scored.sort(reverse=True)
+
+    picked, spent = [], 0
+    for _, i in scored:
+        cost = count_tokens(render_claims([claims[i]]))
+        if spent + cost > max_tokens:
+            continue
+        picked.append(i)
+        spent += cost
+    return [claims[i] for i in sorted(picked)]
+
+
+def render_claims(claims):
+    """Markdown bullet list of claims with their source URLs."""
+    return "\n".join(
+        f"- {claim['claim']} ({', '.join(source['url'] for source in claim['citations'])})"
+        for claim in claims
+    )
@@ -1,21 +1,354 @@
+import re
 import json
+import logging
 
-def safe_json_loads(text: str):
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\r\n"
+_SMART_QUOTES = "“”"
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+_PYTHON_LITERALS = {"True": True, "False": False, "None": None}
+_VALID_ESCAPES = '"\\/bfnrtu'
+_MISSING = object()
+# Runs of ordinary string characters, per set of closing quotes
+_STRING_RUN_RE = {
+    closers: re.compile("[^" + re.escape(closers) + '"\\\\\x00-\x1f]+')
+    for closers in ('"', "'", _SMART_QUOTES + '"')
+}
+
+
+class _JsonRepairer:
+    """Single-pass recursive-descent parser that accepts the JSON defects LLMs produce.
+
+    Fixes: text around the JSON (``` fences, prose), comments, trailing or
+    doubled commas, missing commas and colons, smart/single quotes,
+    unquoted keys, unescaped quotes and control characters inside strings,
+    invalid escapes, Python literals, and output truncated mid-structure
+    (open strings, arrays and objects are closed; a member cut off before
+    its value is dropped). Every fix is recorded with the path it applied to.
+    """
+
+    def __init__(self, text, start=None):
+        self.text = text
+        self.n = len(text)
+        self.i = 0
+        self.start = start
+        self.repairs = []
+
+    def note(self, path, fix):
+        self.repairs.append({"path": path, "fix": fix})
+
+    def skip_ws(self, path):
+        text, n = self.text, self.n
+        while self.i < n:
+            c = text[self.i]
+            if c in _WHITESPACE:
+                self.i += 1
+            elif text.startswith("//", self.i):
+                end = text.find("\n", self.i)
+                self.i = n if end == -1 else end + 1
+                self.note(path, "removed_comment")
+            elif text.startswith("/*", self.i):
+                end = text.find("*/", self.i + 2)
+                self.i = n if end == -1 else end + 2
+                self.note(path, "removed_comment")
+            else:
+                break
+
+    def parse(self):
+        if self.start is None:
+            starts = [i for i in (self.text.find("{"), self.text.find("[")) if i != -1]
+            if not starts:
+                raise json.JSONDecodeError("No JSON object or array found", self.text, 0)
+            self.start = min(starts)
+        self.i = self.start
+        if self.text[:self.i].strip():
+            self.note("$", "removed_leading_text")
+        value = self.parse_value("$")
+        self.skip_ws("$")
+        if self.i < self.n:
+            self.note("$", "removed_trailing_text")
+        return value
+
+    def parse_value(self, path):
+        self.skip_ws(path)
+        if self.i >= self.n:
+            return _MISSING
+        c = self.text[self.i]
+        if c == "{":
+            return self.parse_object(path)
+        if c == "[":
+            return self.parse_array(path)
+        if c == '"' or c in _SMART_QUOTES or c == "'":
+            return self.parse_string(path)
+        if c == "-" or c.isdigit():
+            return self.parse_number(path)
+        if c.isalpha() or c == "_":
+            return self.parse_word(path)
+        return _MISSING
+
+    def parse_object(self, path):
+        text = self.text
+        self.i += 1
+        obj = {}
+        while True:
+            self.skip_ws(path)
+            if self.i >= self.n:
+                self.note(path, "closed_truncated_object")
+                return obj
+            c = text[self.i]
+            if c == "}":
+                self.i += 1
+                return obj
+            if c == "]":
+                self.note(path, "fixed_mismatched_bracket")
+                self.i += 1
+                return obj
+            if c == ",":
+                self.i += 1
+                self.skip_ws(path)
+                if self.i < self.n and text[self.i] == "}":
+                    self.note(path, "removed_trailing_comma")
+                elif obj:
+                    self.note(path, "removed_extra_comma")
+                continue
+
+            if c == '"' or c in _SMART_QUOTES or c == "'":
+                key = self.parse_string(path)
+            else:
+                start = self.i
+                while self.i < self.n and text[self.i] not in ':,{}[]"' and text[self.i] not in _WHITESPACE:
+                    self.i += 1
+                key = text[start:self.i]
+                if not key:
+                    self.note(path, "removed_unexpected_character")
+                    self.i += 1
+                    continue
+                self.note(f"{path}.{key}", "quoted_key")
+            child = f"{path}.{key}"
+
+            self.skip_ws(child)
+            if self.i >= self.n:
+                self.note(child, "dropped_truncated_member")
+                return obj
+            if text[self.i] == ":":
+                self.i += 1
+            else:
+                self.note(child, "inserted_missing_colon")
+
+            value = self.parse_value(child)
+            if value is _MISSING:
+                if self.i >= self.n:
+                    self.note(child, "dropped_truncated_member")
+                    return obj
+                self.note(child, "filled_missing_value")
+                value = None
+            obj[key] = value
+
+            self.skip_ws(path)
+            if self.i < self.n:
+                c = text[self.i]
+                if c == ",":
+                    self.i += 1
+                    self.skip_ws(path)
+                    if self.i < self.n and text[self.i] == "}":
+                        self.note(path, "removed_trailing_comma")
+                elif c not in "}]":
+                    self.note(path, "inserted_missing_comma")
+
+    def parse_array(self, path):
+        text = self.text
+        self.i += 1
+        items = []
+        while True:
+            self.skip_ws(path)
+            if self.i >= self.n:
+                self.note(path, "closed_truncated_array")
+                return items
+            c = text[self.i]
+            if c == "]":
+                self.i += 1
+                return items
+            if c == "}":
+                self.note(path, "fixed_mismatched_bracket")
+                self.i += 1
+                return items
+            if c == ",":
+                self.i += 1
+                self.skip_ws(path)
+                if self.i < self.n and text[self.i] == "]":
+                    self.note(path, "removed_trailing_comma")
+                elif items:
+                    self.note(path, "removed_extra_comma")
+                continue
+
+            child = f"{path}[{len(items)}]"
+            value = self.parse_value(child)
+            if value is _MISSING:
+                if self.i >= self.n:
+                    self.note(path, "closed_truncated_array")
+                    return items
+                self.note(child, "removed_unexpected_character")
+                self.i += 1
+                continue
+            items.append(value)
+
+            self.skip_ws(path)
+            if self.i < self.n:
+                c = text[self.i]
+                if c == ",":
+                    self.i += 1
+                    self.skip_ws(path)
+                    if self.i < self.n and text[self.i] == "]":
+                        self.note(path, "removed_trailing_comma")
+                elif c not in "]}":
+                    self.note(path, "inserted_missing_comma")
+
+    def _closes_string(self, j):
+        """A quote at j ends the string if what follows it is structural (or the end);
+        otherwise it is an unescaped quote inside the text."""
+        text = self.text
+        j += 1
+        while j < self.n and text[j] in _WHITESPACE:
+            j += 1
+        return j >= self.n or text[j] in ',:}]"'
+
+    def parse_string(self, path):
+        text = self.text
+        quote = text[self.i]
+        if quote in _SMART_QUOTES:
+            closers = _SMART_QUOTES + '"'
+            self.note(path, "replaced_smart_quotes")
+        elif quote == "'":
+            closers = "'"
+            self.note(path, "replaced_single_quotes")
+        else:
+            closers = '"'
+        self.i += 1
+
+        raw = []
+        run_re = _STRING_RUN_RE[closers]
+        while self.i < self.n:
+            run = run_re.match(text, self.i)
+            if run:
+                raw.append(run.group())
+                self.i = run.end()
+                if self.i >= self.n:
+                    break
+            c = text[self.i]
+            if c == "\\":
+                if self.i + 1 >= self.n:
+                    self.i += 1
+                    break
+                e = text[self.i + 1]
+                if e == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[self.i + 2:self.i + 6]):
+                    raw.append(text[self.i:self.i + 6])
+                    self.i += 6
+                elif e in _VALID_ESCAPES and e != "u":
+                    raw.append(text[self.i:self.i + 2])
+                    self.i += 2
+                elif e == "'":
+                    self.note(path, "fixed_invalid_escape")
+                    raw.append("'")
+                    self.i += 2
+                else:
+                    self.note(path, "fixed_invalid_escape")
+                    raw.append("\\\\")
+                    self.i += 1
+                continue
+            if c in closers:
+                if self._closes_string(self.i):
+                    self.i += 1
+                    return json.loads('"' + "".join(raw) + '"')
+                self.note(path, "escaped_inner_quote")
+                raw.append('\\"' if c == '"' else c)
+            elif c == '"':
+                raw.append('\\"')
+            elif c < " ":
+                self.note(path, "escaped_control_character")
+                raw.append(json.dumps(c)[1:-1])
+            else:
+                raw.append(c)
+            self.i += 1
+
+        self.note(path, "closed_truncated_string")
+        return json.loads('"' + "".join(raw) + '"')
+
+    def parse_number(self, path):
+        match = _NUMBER_RE.match(self.text, self.i)
+        if not match:
+            self.i += 1
+            self.note(path, "removed_unexpected_character")
+            return _MISSING
+        self.i = match.end()
+        number = match.group()
+        return float(number) if any(c in number for c in ".eE") else int(number)
+
+    def parse_word(self, path):
+        text = self.text
+        match = _WORD_RE.match(text, self.i)
+        word = match.group()
+        if word in _LITERALS:
+            self.i = match.end()
+            return _LITERALS[word]
+        if word in _PYTHON_LITERALS:
+            self.i = match.end()
+            self.note(path, "converted_python_literal")
+            return _PYTHON_LITERALS[word]
+        if match.end() == self.n:
+            for literal, value in _LITERALS.items():
+                if literal.startswith(word):
+                    self.i = match.end()
+                    self.note(path, "completed_truncated_literal")
+                    return value
+        # Bare text as a value: read it up to the next delimiter
+        start = self.i
+        while self.i < self.n and text[self.i] not in ",}]\n":
+            self.i += 1
+        self.note(path, "quoted_bare_value")
+        return text[start:self.i].strip()
+
+
+def repair_json(text: str, expect=None):
+    """Parse JSON from an LLM response, repairing what json.loads rejects.
+
+    Parsing starts at the first "{" or "[". With expect=dict it starts at a
+    "{" instead, so prose such as 'Here is the outline [JSON]:' before the
+    object is skipped: each "{" is tried in turn and the first that parses to
+    a non-empty object wins (else the first one).
+
+    Returns (value, repairs) with repairs as [{"path": "$.chapters[3].big_ideas", "fix": "..."}].
+    Raises json.JSONDecodeError only when no object (or, without expect, array) is present at all.
+    """
+    if expect is not dict:
+        repairer = _JsonRepairer(text)
+        value = repairer.parse()
+        return value, repairer.repairs
+
+    first = None
+    start = text.find("{")
+    while start != -1:
+        repairer = _JsonRepairer(text, start)
+        value = repairer.parse()
+        if value:
+            return value, repairer.repairs
+        first = first or (value, repairer.repairs)
+        start = text.find("{", start + 1)
+    if first is None:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    return first
+
+
+def safe_json_loads(text: str, expect=None):
+    """json.loads, falling back to repair_json (see there for `expect`) and logging its fixes."""
     try:
         return json.loads(text)
     except json.JSONDecodeError:
-        # Common fixes
-        repaired = (
-            text
-            .replace("“", "\"")
-            .replace("”", "\"")
-            .replace("’", "'")
-        )
-
-        # Trim anything before first { and after last }
-        start = repaired.find("{")
-        end = repaired.rfind("}")
-        if start != -1 and end != -1:
-            repaired = repaired[start:end+1]
-
-        return json.loads(repaired)
+        value, repairs = repair_json(text, expect)
+        if repairs:
+            summary = ", ".join(f"{r['fix']} at {r['path']}" for r in repairs[:20])
+            more = f" (+{len(repairs) - 20} more)" if len(repairs) > 20 else ""
+            logger.warning(f"Repaired malformed JSON ({len(repairs)} fixes): {summary}{more}")
+        return value
@@ -0,0 +1,141 @@
+"""
+Adaptive (AIMD) concurrency control for batch pipelines.
+
+Each provider stage (Enrich.so lookup, Perplexity summary, Grok bio) gets its
+own controller. A controller caps how many calls of that stage are in flight:
+every success raises the cap by about one per window (additive increase), and
+a rate-limit or timeout response halves it (multiplicative decrease). A burst
+of failures from calls that were already in flight counts as one decrease,
+like TCP's once-per-RTT rule. Large batches then settle at the highest
+concurrency each provider sustains without hand-tuning MAX_WORKERS.
+
+Limits per stage can be overridden with AIMD_<STAGE>_INITIAL / _MIN / _MAX.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL = 4
+DEFAULT_MIN = 1
+DEFAULT_MAX = 32
+DECREASE_FACTOR = 0.5
+
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+def _env_int(stage, suffix, default):
+    return int(os.getenv(f"AIMD_{stage.upper()}_{suffix}", str(default)))
+
+
+def is_throttle_error(exc):
+    """True for rate-limit (429/503) responses and timeouts from requests, httpx or the OpenAI-style SDKs."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status in THROTTLE_STATUS_CODES:
+        return True
+    name = type(exc).__name__
+    return "RateLimit" in name or "Timeout" in name
+
+
+class _Slot:
+    def __init__(self, started):
+        self.started = started
+        self.outcome = "success"
+
+    def throttled(self):
+        """Mark this call as rate limited without raising (e.g. a 429 status the caller handles)."""
+        self.outcome = "throttled"
+
+    def failed(self):
+        """Mark this call as failed for reasons unrelated to load (no limit change)."""
+        self.outcome = "error"
+
+
+class AIMDController:
+    """Thread-safe adaptive concurrency limit for one provider stage."""
+
+    def __init__(self, name, initial=None, minimum=None, maximum=None):
+        self.name = name
+        self.minimum = minimum or _env_int(name, "MIN", DEFAULT_MIN)
+        self.maximum = maximum or _env_int(name, "MAX", DEFAULT_MAX)
+        self.limit = float(min(self.maximum, initial or _env_int(name, "INITIAL", DEFAULT_INITIAL)))
+        self.in_flight = 0
+        self.peak = 0
+        self.successes = 0
+        self.throttles = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return time.monotonic()
+
+    def release(self, started, outcome="success"):
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "success":
+                self.successes += 1
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif outcome == "throttled":
+                self.throttles += 1
+                # Only calls issued after the last decrease may shrink the window again
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+                    self._last_decrease = time.monotonic()
+                    self.decreases += 1
+                    logger.warning(f"[aimd:{self.name}] throttled, concurrency limit -> {int(self.limit)}")
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold one concurrency slot for the duration of a provider call.
+
+        Exceptions are classified with is_throttle_error and re-raised.
+        """
+        slot = _Slot(self.acquire())
+        try:
+            yield slot
+        except Exception as e:
+            slot.outcome = "throttled" if is_throttle_error(e) else "error"
+            raise
+        finally:
+            self.release(slot.started, slot.outcome)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "peak_in_flight": self.peak,
+                "successes": self.successes,
+                "throttles": self.throttles,
+                "decreases": self.decreases,
+            }
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(name):
+    """Shared controller for a stage name (created on first use)."""
+    with _controllers_lock:
+        if name not in _controllers:
+            _controllers[name] = AIMDController(name)
+        return _controllers[name]
+
+
+def controller_stats():
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return {c.name: c.stats() for c in controllers}
@@ -0,0 +1,199 @@
+"""
+Local extractive compression of research context to a token budget.
+
+Each sentence is a sparse TF-IDF term vector. Sentences are picked greedily
+by information per token: the TF-IDF weight of the terms they add that the
+already picked sentences do not cover yet, divided by their length. Repeated
+material therefore stops scoring once it is in, and the budget goes to
+sentences that bring new names, facts and figures. The picks are emitted in
+their original order together with the headings they sit under, keeping the
+original line breaks and indentation (lists and other multi-line blocks stay
+intact). The weights
+are computed with NumPy over (sentence, term) pairs, so MB-sized dossiers
+compress in about a second without a dense matrix or any model call.
+
+compress_sections compresses several titled sections against one shared
+budget; "protected" sections (the interview transcript, the user's own
+answers) are kept verbatim whenever they fit.
+"""
+
+import re
+import heapq
+import logging
+
+import numpy as np
+
+from app.services.chunking import approx_tokens
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])")
+_TERM_RE = re.compile(r"[a-z0-9]{3,}")
+_HEADING_RE = re.compile(r"^(#{1,6} |=== ).*")
+
+STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has him his how its may new now "
+    "old see two way who did get let put say she too use that with have this will your from they know "
+    "want been good much some time very when come here just like long make many more only over such "
+    "take than them well were what also into most other their there these which would about after "
+    "could first where those being while should through".split()
+)
+
+
+def _units(text):
+    """Split text into [(kind, text, paragraph_no, line_no, indent)] with kind "heading" or "sentence"."""
+    units = []
+    for paragraph_no, paragraph in enumerate(_PARAGRAPH_RE.split(text)):
+        for line_no, line in enumerate(paragraph.strip("\n").split("\n")):
+            if not line.strip():
+                continue
+            indent = line[:len(line) - len(line.lstrip())]
+            if _HEADING_RE.match(line.strip()):
+                units.append(("heading", line.strip(), paragraph_no, line_no, ""))
+            else:
+                for sentence in _SENTENCE_RE.split(line.strip()):
+                    if sentence:
+                        units.append(("sentence", sentence, paragraph_no, line_no, indent))
+    return units
+
+
+def terms(text):
+    """Lowercased content terms of a text (3+ characters, stopwords removed)."""
+    return [t for t in _TERM_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def term_weights(sentences):
+    """Sparse TF-IDF matrix of the sentences as (rows, cols, weights) arrays, sorted by row."""
+    vocabulary = {}
+    sentence_ids, term_ids = [], []
+    for i, sentence in enumerate(sentences):
+        sentence_terms = terms(sentence)
+        for term in sentence_terms:
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+        sentence_ids.extend([i] * len(sentence_terms))
+
+    n, v = len(sentences), len(vocabulary)
+    if not term_ids:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    pairs, counts = np.unique(
+        np.asarray(sentence_ids, dtype=np.int64) * v + np.asarray(term_ids, dtype=np.int64),
+        return_counts=True,
+    )
+    rows, cols = pairs // v, pairs % v
+    idf = np.log((1 + n) / (1 + np.bincount(cols, minlength=v)))
+    return rows, cols, (1.0 + np.log(counts)) * idf[cols]
+
+
+def _select(sections, max_tokens, count_tokens):
+    """Greedy coverage selection over all sections' sentences; returns {(section, unit_no)} to keep."""
+    flat = [(s, u, text) for s, units in enumerate(sections) for u, (kind, text, *_) in enumerate(units) if kind == "sentence"]
+    if not flat:
+        return set()
+
+    # Heading a sentence sits under (charged once, when its first sentence is kept)
+    owner = {}
+    for s, units in enumerate(sections):
+        heading = None
+        for u, (kind, *_) in enumerate(units):
+            if kind == "heading":
+                heading = u
+            elif heading is not None:
+                owner[(s, u)] = heading
+
+    rows, cols, weights = term_weights([text for _, _, text in flat])
+    bounds = np.searchsorted(rows, np.arange(len(flat) + 1))
+    covered = np.zeros(int(cols.max()) + 1 if len(cols) else 0, dtype=bool)
+    # +1 per unit for the separator it is joined with
+    costs = np.array([count_tokens(text) + 1 for _, _, text in flat], dtype=float)
+    gains = np.bincount(rows, weights=weights, minlength=len(flat)) / costs
+
+    def gain(i):
+        start, end = bounds[i], bounds[i + 1]
+        return weights[start:end][~covered[cols[start:end]]].sum() / costs[i]
+
+    # Lazy greedy: a sentence's gain only shrinks as terms get covered, so a
+    # popped entry whose recomputed gain still beats the next best is the true best
+    heap = [(-g, i) for i, g in enumerate(gains) if g > 0]
+    heapq.heapify(heap)
+    keep, spent = set(), 0
+    while heap:
+        _, i = heapq.heappop(heap)
+        current = gain(i)
+        if heap and current < -heap[0][0]:
+            if current > 0:
+                heapq.heappush(heap, (-current, i))
+            continue
+        s, u, _ = flat[i]
+        cost = costs[i]
+        heading = owner.get((s, u))
+        if heading is not None and (s, heading) not in keep:
+            cost += count_tokens(sections[s][heading][1]) + 1
+        if spent + cost > max_tokens:
+            continue
+        keep.add((s, u))
+        if heading is not None:
+            keep.add((s, heading))
+        spent += cost
+        covered[cols[bounds[i]:bounds[i + 1]]] = True
+    return keep
+
+
+def _render(units, keep_unit):
+    """Kept units in order: sentences of one line joined by spaces, lines by newlines, paragraphs by blank lines."""
+    paragraphs, current, current_no, line_no = [], [], None, None
+    for u, (kind, text, paragraph_no, unit_line_no, indent) in enumerate(units):
+        if not keep_unit(u):
+            continue
+        if kind == "heading" or paragraph_no != current_no:
+            if current:
+                paragraphs.append(current)
+            current, current_no, line_no = [], paragraph_no, None
+        if kind == "heading":
+            paragraphs.append([text])
+            current_no = None
+        elif unit_line_no == line_no:
+            current[-1] += " " + text
+        else:
+            current.append(indent + text)
+            line_no = unit_line_no
+    if current:
+        paragraphs.append(current)
+    return "\n\n".join("\n".join(lines) for lines in paragraphs)
+
+
+def compress_sections(sections, max_tokens, protected=(), count_tokens=approx_tokens):
+    """Compress [(title, text)] to about max_tokens in total; returns [(title, text)] in the same order.
+
+    Sections whose title is in `protected` are kept verbatim as long as they
+    fit in the budget on their own; the rest share what is left.
+    """
+    sizes = [count_tokens(text or "") for _, text in sections]
+    total = sum(sizes)
+    if total <= max_tokens:
+        return list(sections)
+
+    protected_tokens = sum(size for (title, _), size in zip(sections, sizes) if title in protected)
+    if protected_tokens >= max_tokens:
+        protected, budget = (), max_tokens
+    else:
+        budget = max_tokens - protected_tokens
+
+    compressible = [i for i, (title, _) in enumerate(sections) if title not in protected]
+    units = [_units(sections[i][1] or "") for i in compressible]
+    keep = _select(units, budget, count_tokens)
+
+    result = list(sections)
+    for s, i in enumerate(compressible):
+        result[i] = (sections[i][0], _render(units[s], lambda u, s=s: (s, u) in keep))
+
+    compressed = sum(count_tokens(text) for _, text in result)
+    logger.info(f"Compressed context from ~{total} to ~{compressed} tokens (budget {max_tokens})")
+    return result
+
+
+def compress_text(text, max_tokens, count_tokens=approx_tokens):
+    """Compress a single text to about max_tokens, keeping its highest-information sentences."""
+    return compress_sections([("", text)], max_tokens, count_tokens=count_tokens)[0][1]
@@ -0,0 +1,183 @@
+"""
+Token-aware packing of prompt context into a model's window.
+
+count_tokens counts with the model's real tokenizer (tiktoken) and caches the
+count per text hash, so the same dossier or answer section is only tokenized
+once per process. Without tiktoken (or its encoding files) it falls back to
+the ~4 chars/token estimate and packing keeps a safety margin instead.
+
+pack_sections fills a token budget by priority tier: the user's own answers
+first, then the interview, quotes, themes and finally the dossier. A tier
+that fits is kept verbatim; the first tier that does not is compressed
+extractively (context_compression) into what is left, and lower tiers get
+nothing. Every shrink or drop is logged. The assembled context is counted
+again and re-packed until it fits, so prompts never overflow the window.
+
+context_budget works out how much of a model's window is left for context
+once the fixed prompt text and the completion budget are reserved.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from app.services.chunking import approx_tokens
+from app.services.context_compression import compress_sections
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to the character estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONTEXT_WINDOWS = {
+    "grok-4-latest": 256000,
+    "gpt-5.1": 400000,
+}
+DEFAULT_CONTEXT_WINDOW = 128000
+DEFAULT_ENCODING = "o200k_base"
+# Tokens per chat message for role/formatting framing
+MESSAGE_OVERHEAD_TOKENS = 4
+# Share of the budget kept free when counts are only estimated
+ESTIMATE_MARGIN = float(os.getenv("CONTEXT_ESTIMATE_MARGIN", "0.1"))
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "50000"))
+# Tier of sections missing from a priorities map (packed last)
+DEFAULT_PRIORITY = 99
+
+_encoders = {}
+_counts = OrderedDict()
+_lock = threading.Lock()
+
+
+def _encoder(model=None):
+    """tiktoken encoding for a model (o200k_base for unknown models), or None if unavailable."""
+    if tiktoken is None:
+        return None
+    key = model or DEFAULT_ENCODING
+    if key not in _encoders:
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+            except KeyError:
+                encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding unavailable ({e}); estimating tokens from characters")
+            encoding = None
+        _encoders[key] = encoding
+    return _encoders[key]
+
+
+def is_exact(model=None):
+    """True when counts for this model come from a real tokenizer."""
+    return _encoder(model) is not None
+
+
+def count_tokens(text, model=None):
+    """Token count of text for a model, cached per text hash."""
+    if not text:
+        return 0
+    encoding = _encoder(model)
+    if encoding is None:
+        return approx_tokens(text)
+
+    key = (encoding.name, hashlib.sha1(text.encode("utf-8")).hexdigest())
+    with _lock:
+        if key in _counts:
+            _counts.move_to_end(key)
+            return _counts[key]
+    count = len(encoding.encode(text, disallowed_special=()))
+    with _lock:
+        _counts[key] = count
+        if len(_counts) > TOKEN_COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+
+def token_counter(model=None):
+    """count_tokens bound to a model, for APIs that take a count_tokens(text) callable."""
+    return lambda text: count_tokens(text, model)
+
+
+def context_budget(model, fixed_texts, max_output_tokens, cap=None):
+    """Tokens left for context in the model's window after the fixed prompt parts and the completion.
+
+    fixed_texts: the system prompt and the user prompt without its context
+    (one entry per message). `cap` limits the result, e.g. to bound prompt cost.
+    """
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    fixed = sum(count_tokens(text, model) + MESSAGE_OVERHEAD_TOKENS for text in fixed_texts)
+    budget = window - fixed - max_output_tokens
+    if not is_exact(model):
+        budget = int(budget * (1 - ESTIMATE_MARGIN))
+    if cap is not None:
+        budget = min(budget, cap)
+    return max(budget, 0)
+
+
+def render_sections(sections, separator="\n\n"):
+    """Join (header, content) sections the way the prompts embed them; empty sections are left out."""
+    return separator.join(f"{header}\n{content}\n" for header, content in sections if content)
+
+
+def _allocate(sections, priorities, budget, count, separator_tokens):
+    """One packing pass: keep tiers verbatim while they fit, compress the first that does not."""
+    result = {title: "" for title, _ in sections}
+    remaining = budget
+    tiers = sorted(set(priorities))
+    for n, tier in enumerate(tiers):
+        members = [(title, text) for (title, text), p in zip(sections, priorities) if p == tier and text]
+        if not members:
+            continue
+        overhead = sum(count(title) + separator_tokens for title, _ in members)
+        size = sum(count(text) for _, text in members) + overhead
+        if size <= remaining:
+            result.update(members)
+            remaining -= size
+            continue
+
+        allot = remaining - overhead
+        if allot > 0:
+            result.update(compress_sections(members, allot, count_tokens=count))
+            logger.info(f"Context tier {tier} ({', '.join(t for t, _ in members)}) compressed from ~{size} to {remaining} tokens")
+        else:
+            logger.warning(f"Context tier {tier} ({', '.join(t for t, _ in members)}) dropped: no budget left")
+        dropped = [title for (title, text), p in zip(sections, priorities) if p in tiers[n + 1:] and text]
+        if dropped:
+            logger.warning(f"Context sections dropped for budget: {', '.join(dropped)}")
+        break
+    return [(title, result[title]) for title, _ in sections]
+
+
+def pack_sections(sections, priorities, max_tokens, model=None, separator="\n\n", max_passes=4):
+    """Fit [(header, content)] into max_tokens by priority.
+
+    priorities maps a header to its tier (lower = more important, packed
+    first); headers it does not list go last. Sections of one tier share
+    their budget when they have to be compressed.
+
+    Returns the sections in their original order, with content shrunk or
+    emptied as needed so that render_sections(result) counts at most
+    max_tokens; the rendered result is re-counted and re-packed until it does.
+    """
+    priorities = [priorities.get(title, DEFAULT_PRIORITY) for title, _ in sections]
+    count = token_counter(model)
+    separator_tokens = count(separator) + 2
+    total = count(render_sections(sections, separator))
+    if total <= max_tokens:
+        logger.info(f"Context: {total} tokens, fits budget {max_tokens}")
+        return list(sections)
+
+    budget = max_tokens
+    for _ in range(max_passes):
+        packed = _allocate(sections, priorities, budget, count, separator_tokens)
+        used = count(render_sections(packed, separator))
+        if used <= max_tokens:
+            logger.info(f"Context packed from {total} to {used} tokens (budget {max_tokens})")
+            return packed
+        # Token boundaries shift when pieces are joined; shrink by the overshoot and repack
+        budget -= used - max_tokens + separator_tokens
+    logger.warning(f"Context still {used} tokens after {max_passes} passes (budget {max_tokens}), using last pack")
+    return packed
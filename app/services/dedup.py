@@ -0,0 +1,143 @@
+"""
+Near-duplicate paragraph removal for research dossiers.
+
+Perplexity tends to return the same biography paragraph for bio, media,
+quote and theme queries. Each paragraph is reduced to a set of word
+shingles, summarised with MinHash, and bucketed in an LSH index so only
+likely matches are compared. A paragraph is dropped when its Jaccard
+similarity to an earlier kept paragraph reaches DEDUP_THRESHOLD.
+Phases are processed in order, so the first occurrence wins.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows -> candidates from ~0.5 similarity
+DEDUP_THRESHOLD = 0.7
+MIN_PARAGRAPH_WORDS = 8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+
+_CITATION_RE = re.compile(r"\[\d+\]")
+_WORD_RE = re.compile(r"\w+")
+_SEARCH_HEADER_RE = re.compile(r"^### Search \d+:")
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    """Set of k-word shingles of the normalised text (citations stripped)."""
+    words = _WORD_RE.findall(_CITATION_RE.sub(" ", text.lower()))
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def minhash(shingle_set):
+    """NUM_PERM-long MinHash signature of a shingle set."""
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingle_set),
+        dtype=np.uint64,
+        count=len(shingle_set),
+    )
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures."""
+
+    def __init__(self, bands=LSH_BANDS, num_perm=NUM_PERM):
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets = {}
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            yield band, chunk.tobytes()
+
+    def candidates(self, signature):
+        found = set()
+        for key in self._band_keys(signature):
+            found.update(self.buckets.get(key, ()))
+        return found
+
+    def add(self, item_id, signature):
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(item_id)
+
+
+def _split_paragraphs(text):
+    return [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def _drop_empty_search_headers(paragraphs):
+    """Remove '### Search N: query' headers whose answer was entirely deduplicated."""
+    kept = []
+    for i, paragraph in enumerate(paragraphs):
+        if _SEARCH_HEADER_RE.match(paragraph.strip()):
+            next_paragraph = paragraphs[i + 1].strip() if i + 1 < len(paragraphs) else ""
+            if not next_paragraph or _SEARCH_HEADER_RE.match(next_paragraph):
+                continue
+        kept.append(paragraph)
+    return kept
+
+
+def dedupe_sections(sections, threshold=DEDUP_THRESHOLD):
+    """Remove near-duplicate paragraphs across an ordered {name: markdown} mapping.
+
+    Returns (deduped_sections, stats).
+    """
+    index = LSHIndex()
+    kept_shingles = []
+    deduped = {}
+    total = dropped = chars_in = chars_out = 0
+
+    for name, text in sections.items():
+        chars_in += len(text or "")
+        kept = []
+        for paragraph in _split_paragraphs(text or ""):
+            total += 1
+            stripped = paragraph.strip()
+            if stripped.startswith("#") or len(stripped.split()) < MIN_PARAGRAPH_WORDS:
+                kept.append(paragraph)
+                continue
+
+            shingle_set = shingles(stripped)
+            if not shingle_set:
+                kept.append(paragraph)
+                continue
+            signature = minhash(shingle_set)
+            if any(jaccard(shingle_set, kept_shingles[c]) >= threshold for c in index.candidates(signature)):
+                dropped += 1
+                continue
+
+            index.add(len(kept_shingles), signature)
+            kept_shingles.append(shingle_set)
+            kept.append(paragraph)
+
+        kept = _drop_empty_search_headers(kept)
+        deduped[name] = "\n\n".join(kept) + "\n\n" if kept else ""
+        chars_out += len(deduped[name])
+
+    stats = {
+        "paragraphs": total,
+        "dropped": dropped,
+        "chars_in": chars_in,
+        "chars_out": chars_out,
+    }
+    return deduped, stats
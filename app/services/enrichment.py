@@ -0,0 +1,213 @@
+"""
+Cached Enrich.so person lookups over pooled connections.
+
+Every worker thread keeps one requests.Session (keep-alive connection pool),
+so repeated lookups skip the TCP/TLS handshake. Results are cached on disk by
+normalized email: found people for ENRICH_CACHE_TTL_SECONDS, 404s for the
+shorter ENRICH_NEGATIVE_TTL_SECONDS so unknown addresses are not paid for on
+every run. A found person is also indexed by its LinkedIn URL, so a later
+lookup that only has the profile URL is answered from the cache (a lookup
+that also has an email only accepts a LinkedIn hit found under that email).
+
+enrich_many enriches a whole onboarding wave concurrently on one long-lived
+thread pool (or an executor the caller passes), so the per-thread sessions and
+their connections outlive a single batch. Calls go through the shared
+"enrich_so" rate budget and the adaptive "enrich" stage limit.
+"""
+
+import os
+import logging
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.services.cache import DiskCache, make_key
+from app.services.concurrency import get_controller
+from app.services.rate_limiter import acquire
+
+logger = logging.getLogger(__name__)
+
+ENRICH_SO_ENDPOINT = "https://api.enrich.so/v1/api/person"
+ENRICH_SO_TIMEOUT = (5, 30)  # (connect, read) seconds
+ENRICH_CACHE_TTL_SECONDS = int(os.getenv("ENRICH_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+ENRICH_NEGATIVE_TTL_SECONDS = int(os.getenv("ENRICH_NEGATIVE_TTL_SECONDS", str(7 * 24 * 3600)))
+ENRICH_MAX_WORKERS = int(os.getenv("ENRICH_MAX_WORKERS", "8"))
+
+enrichment_cache = DiskCache("enrich_so_person", ttl_seconds=ENRICH_CACHE_TTL_SECONDS, max_entries=20000)
+
+ENRICH_STAGE = get_controller("enrich")
+
+_local = threading.local()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        session.headers["accept"] = "application/json"
+        _local.session = session
+    return session
+
+
+def _shared_executor():
+    """Module-wide pool whose threads (and their sessions) are reused across enrich_many calls."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=ENRICH_MAX_WORKERS, thread_name_prefix="enrich"
+            )
+        return _executor
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def normalize_linkedin_url(url):
+    """Canonical profile URL: no scheme/www/query/trailing slash, lowercase."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip() if "://" in url else "https://" + url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}".lower()
+
+
+def _email_key(email):
+    return make_key("email", normalize_email(email))
+
+
+def _linkedin_key(url):
+    return make_key("linkedin", normalize_linkedin_url(url))
+
+
+def parse_person(email, result):
+    """Flatten an Enrich.so person response into the record used by the research scripts."""
+    return {
+        "email": email,
+        "full_name": result.get("displayName"),
+        "first_name": result.get("firstName"),
+        "last_name": result.get("lastName"),
+        "linkedin": result.get("linkedInUrl"),
+        "company": result.get("company", {}).get("name"),
+        "company_website": result.get("company", {}).get("website"),
+        "company_industry": result.get("company", {}).get("industry"),
+        "company_size": result.get("company", {}).get("staff_count"),
+        "job_title": result.get("jobTitle"),
+        "location": result.get("location"),
+        "twitter": result.get("social", {}).get("twitter"),
+        "facebook": result.get("social", {}).get("facebook"),
+        "github": result.get("social", {}).get("github"),
+        "phone": result.get("phone"),
+        "additional_emails": ", ".join(result.get("emails", [])) if result.get("emails") else None,
+        "skills": ", ".join(result.get("skills", [])) if result.get("skills") else None,
+        "education": ", ".join([edu.get("name", "") for edu in result.get("education", [])]) if result.get("education") else None,
+        "experience": ", ".join([exp.get("title", "") + " at " + exp.get("company", "") for exp in result.get("experience", [])]) if result.get("experience") else None,
+        "success": True
+    }
+
+
+def _fetch(email, api_key):
+    acquire("enrich_so")
+    with ENRICH_STAGE.slot() as slot:
+        resp = _session().get(
+            ENRICH_SO_ENDPOINT,
+            params={"email": email},
+            headers={"authorization": f"Bearer {api_key}"},
+            timeout=ENRICH_SO_TIMEOUT,
+        )
+        if resp.status_code in (429, 503):
+            slot.throttled()
+    return resp
+
+
+def enrich_person(email=None, linkedin_url=None, api_key=None, use_cache=True):
+    """Enrich one identity. Always returns a dict with "success"; failures carry "error".
+
+    Enrich.so looks people up by email; a LinkedIn URL alone is answered only
+    from the cache (people previously found by email).
+    """
+    api_key = api_key or os.getenv("ENRICH_SO_API_KEY", "").strip()
+    email = (email or "").strip()
+
+    if use_cache:
+        cached = enrichment_cache.get(_email_key(email)) if email else None
+        if cached is None and linkedin_url:
+            cached = enrichment_cache.get(_linkedin_key(linkedin_url))
+            if cached is not None and email and normalize_email(cached.get("email")) != normalize_email(email):
+                # The profile was found under another address; look this one up itself
+                cached = None
+        if cached is not None:
+            return cached
+
+    if not email:
+        return {"email": email, "error": "Enrich.so requires an email address", "success": False}
+    if not api_key:
+        return {"email": email, "error": "ENRICH_SO_API_KEY not found in environment variables", "success": False}
+
+    try:
+        resp = _fetch(email, api_key)
+    except requests.exceptions.RequestException as e:
+        return {"email": email, "error": f"Request failed: {str(e)}", "success": False}
+
+    if resp.status_code == 200:
+        try:
+            person = parse_person(email, resp.json())
+        except (ValueError, AttributeError, TypeError) as e:
+            return {"email": email, "error": f"Invalid API response: {e}", "success": False}
+        enrichment_cache.set(_email_key(email), person)
+        if person.get("linkedin"):
+            enrichment_cache.set(_linkedin_key(person["linkedin"]), person)
+        return person
+
+    failure = {"email": email, "error": f"API Error {resp.status_code}: {resp.text}", "success": False}
+    if resp.status_code == 404:
+        # Negative cache: unknown addresses stay unknown for a while
+        failure["not_found"] = True
+        enrichment_cache.set(_email_key(email), failure, ttl_seconds=ENRICH_NEGATIVE_TTL_SECONDS)
+    return failure
+
+
+def enrich_many(identities, executor=None, api_key=None):
+    """Enrich many identities concurrently; returns results in input order.
+
+    Each identity is an email string or a dict with "email" and/or
+    "linkedin_url". Duplicates (after normalization) are looked up once.
+    Lookups run on `executor`, or on the module's shared pool of
+    ENRICH_MAX_WORKERS threads.
+    """
+    normalized = []
+    for identity in identities:
+        if isinstance(identity, dict):
+            normalized.append((identity.get("email") or "", identity.get("linkedin_url") or identity.get("linkedin") or ""))
+        else:
+            normalized.append((identity or "", ""))
+
+    unique = {}
+    for email, linkedin_url in normalized:
+        unique.setdefault((normalize_email(email), normalize_linkedin_url(linkedin_url)), (email, linkedin_url))
+
+    results = {}
+    if unique:
+        executor = executor or _shared_executor()
+        futures = {
+            executor.submit(enrich_person, email, linkedin_url, api_key): key
+            for key, (email, linkedin_url) in unique.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.warning(f"Unexpected error enriching {key[0] or key[1]}: {e}")
+                results[key] = {"email": key[0], "error": str(e), "success": False}
+
+    found = sum(1 for result in results.values() if result.get("success"))
+    logger.info(f"Enriched {found}/{len(results)} unique identities ({len(normalized)} requested)")
+    return [results[(normalize_email(e), normalize_linkedin_url(l))] for e, l in normalized]
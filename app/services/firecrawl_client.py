@@ -0,0 +1,153 @@
+"""
+Pooled async Firecrawl search client.
+
+One httpx.AsyncClient (keep-alive, HTTP/2 when `h2` is installed) is shared
+by every request made inside an `async with FirecrawlClient()` block, so
+profile lookups run concurrently over reused connections. Requests have
+explicit timeouts and are retried with jittered exponential backoff on
+timeouts, 429s and 5xx. Results are cached on disk for Firecrawl's `maxAge`,
+so repeat lookups of the same profile cost nothing; empty results are only
+kept briefly, so a profile that is not indexed yet is looked up again soon.
+FIRECRAWL_API_KEY must be set in the environment.
+"""
+
+import os
+import random
+import asyncio
+import logging
+import importlib.util
+
+import httpx
+
+from app.services.cache import DiskCache, make_key
+from app.services.rate_limiter import acquire_async
+
+logger = logging.getLogger(__name__)
+
+FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY", "").strip()
+FIRECRAWL_SEARCH_URL = "https://api.firecrawl.dev/v2/search"
+FIRECRAWL_MAX_AGE_MS = 172800000  # 2 days, also used as the local cache TTL
+FIRECRAWL_EMPTY_TTL_SECONDS = int(os.getenv("FIRECRAWL_EMPTY_TTL_SECONDS", "600"))
+FIRECRAWL_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+FIRECRAWL_MAX_CONNECTIONS = 10
+FIRECRAWL_RETRY_ATTEMPTS = 3
+FIRECRAWL_RETRY_BASE_SECONDS = 1.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+firecrawl_cache = DiskCache(
+    "firecrawl_search",
+    ttl_seconds=FIRECRAWL_MAX_AGE_MS // 1000,
+    max_entries=5000,
+)
+
+
+def _search_payload(query, limit=1):
+    return {
+        "query": query,
+        "sources": [
+            "web"
+        ],
+        "categories": [],
+        "limit": limit,
+        "scrapeOptions": {
+            "onlyMainContent": False,
+            "maxAge": FIRECRAWL_MAX_AGE_MS,
+            "parsers": [
+                "pdf"
+            ],
+            "formats": []
+        }
+    }
+
+
+class FirecrawlClient:
+    """Async context manager wrapping a pooled httpx client for Firecrawl."""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or FIRECRAWL_API_KEY
+        if not self.api_key:
+            raise RuntimeError("FIRECRAWL_API_KEY not set. Cannot run Firecrawl searches.")
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            timeout=FIRECRAWL_TIMEOUT,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=FIRECRAWL_MAX_CONNECTIONS,
+                max_keepalive_connections=FIRECRAWL_MAX_CONNECTIONS,
+            ),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    async def _post_with_retry(self, payload):
+        for attempt in range(1, FIRECRAWL_RETRY_ATTEMPTS + 1):
+            await acquire_async("firecrawl")
+            retry_after = None
+            try:
+                response = await self._client.post(FIRECRAWL_SEARCH_URL, json=payload)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get("Retry-After")
+                error = f"HTTP {response.status_code}"
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = repr(e)
+
+            if attempt == FIRECRAWL_RETRY_ATTEMPTS:
+                raise RuntimeError(f"Firecrawl search failed after {attempt} attempts: {error}")
+
+            delay = random.uniform(0, FIRECRAWL_RETRY_BASE_SECONDS * 2 ** attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            logger.warning(f"[firecrawl] {error}, retrying in {delay:.1f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def search(self, query, limit=1):
+        """Return Firecrawl's `data.web` list for a query (cached for maxAge, empty results briefly)."""
+        key = make_key(query, limit)
+        cached = firecrawl_cache.get(key)
+        if cached is not None:
+            return cached
+
+        data = await self._post_with_retry(_search_payload(query, limit))
+        web_data = (data.get("data") or {}).get("web") or []
+        firecrawl_cache.set(key, web_data, ttl_seconds=None if web_data else FIRECRAWL_EMPTY_TTL_SECONDS)
+        return web_data
+
+    async def search_many(self, queries, limit=1):
+        """Run several searches concurrently; failed queries yield an empty list."""
+        async def _one(query):
+            try:
+                return await self.search(query, limit)
+            except Exception as e:
+                logger.info(f"error at search crawl for '{query}': {e}")
+                return []
+
+        return await asyncio.gather(*(_one(q) for q in queries))
+
+
+def search_firecrawl_many(queries, limit=1):
+    """Blocking helper: fetch all queries concurrently over one pooled client.
+
+    Without FIRECRAWL_API_KEY the searches are skipped with an error logged
+    and every query yields an empty list.
+    """
+    async def _run():
+        async with FirecrawlClient() as client:
+            return await client.search_many(queries, limit)
+
+    if not queries:
+        return []
+    if not FIRECRAWL_API_KEY:
+        logger.error("FIRECRAWL_API_KEY not set. Skipping Firecrawl profile searches.")
+        return [[] for _ in queries]
+    return asyncio.run(_run())
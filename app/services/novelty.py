@@ -0,0 +1,64 @@
+"""
+Novelty scoring for adaptive research.
+
+Private individuals with a thin web footprint get the same two or three facts
+back from every query in a phase. Each answer is reduced to word shingles
+(see dedup.shingles) and scored by the share of shingles not seen in anything
+gathered so far, including earlier answers of the same round. Once a phase
+has run NOVELTY_MIN_QUERIES queries and a round of answers scores below
+NOVELTY_THRESHOLD, the rest of that phase is skipped. Failed queries (no
+answer at all) are left out of the score, and callers do not stop a phase on
+a round that had failures.
+
+Adaptive mode is off unless RESEARCH_ADAPTIVE is set.
+"""
+
+import os
+
+from app.services.dedup import shingles
+
+RESEARCH_ADAPTIVE = os.getenv("RESEARCH_ADAPTIVE", "false").lower() in ("1", "true", "yes")
+NOVELTY_THRESHOLD = float(os.getenv("RESEARCH_NOVELTY_THRESHOLD", "0.35"))
+NOVELTY_MIN_QUERIES = int(os.getenv("RESEARCH_NOVELTY_MIN_QUERIES", "3"))
+NOVELTY_WAVE_SIZE = int(os.getenv("RESEARCH_NOVELTY_WAVE_SIZE", "3"))
+NOVELTY_SHINGLE_SIZE = 3  # shorter than dedup's, so reworded repeats still overlap
+
+
+class NoveltyTracker:
+    """Remembers every shingle gathered so far and scores new answers against them."""
+
+    def __init__(self, threshold=NOVELTY_THRESHOLD, min_queries=NOVELTY_MIN_QUERIES):
+        self.threshold = threshold
+        self.min_queries = min_queries
+        self.seen = set()
+
+    def _shingles(self, texts):
+        found = set()
+        for text in texts:
+            if text:
+                found |= shingles(text, NOVELTY_SHINGLE_SIZE)
+        return found
+
+    def score(self, texts):
+        """Mean share of new shingles per answer, each scored against everything before it.
+
+        None (a failed query) is not scored; an answer without any shingles counts
+        as 0.0, so a round of "nothing found" replies scores low.
+        """
+        texts = [text for text in texts if text is not None]
+        if not texts:
+            return 0.0
+        seen = set(self.seen)
+        scores = []
+        for text in texts:
+            found = self._shingles([text])
+            scores.append(len(found - seen) / len(found) if found else 0.0)
+            seen |= found
+        return sum(scores) / len(scores)
+
+    def add(self, texts):
+        self.seen |= self._shingles(texts)
+
+    def should_stop(self, executed, novelty):
+        """True once a phase has run its minimum queries and stopped finding new material."""
+        return executed >= self.min_queries and novelty < self.threshold
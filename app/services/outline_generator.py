@@ -1,5 +1,83 @@
-def generate_outline(project_id):
-    # create outlines row
-    # parse JSON
-    # create 12 chapter rows (status=pending)
-    return True
\ No newline at end of file
+"""
+Outline materialization into Chapter rows.
+
+The generated outline lives on the book as one JSON blob (Book.raw_outline_json).
+materialize_outline turns its chapters into Chapter rows, one per
+(book_id, chapter_index) with the chapter's outline entry, so later stages
+read, check and update a single chapter row instead of decoding and
+re-encoding the whole outline. Chapter indexes are 1-based, in outline order,
+matching the chapter<N>_*.md files the expansion writes.
+"""
+
+import re
+import logging
+
+from app.crud.chapter import get_chapters_for_book, upsert_outline_chapter, delete_chapters_after
+from app.services.common import safe_json_loads
+
+logger = logging.getLogger(__name__)
+
+_SECTION_RE = re.compile(r"^(#{1,2} .*)$", re.MULTILINE)
+
+
+def outline_chapters(outline):
+    """The chapter entries of an outline dict (empty when it has none)."""
+    if not isinstance(outline, dict):
+        return []
+    return [chapter for chapter in outline.get("chapters") or [] if isinstance(chapter, dict)]
+
+
+def materialize_outline(db, book_id, outline):
+    """Create/refresh the book's Chapter rows from its outline (caller commits); returns them in order."""
+    chapters = outline_chapters(outline)
+    rows = [
+        upsert_outline_chapter(db, book_id, index, chapter)
+        for index, chapter in enumerate(chapters, start=1)
+    ]
+    removed = delete_chapters_after(db, book_id, len(chapters))
+    logger.info(f"Materialized {len(rows)} chapters for book {book_id} ({removed} stale removed)")
+    return rows
+
+
+def store_streamed_chapter(db, book_id, index, chapter):
+    """Store the index-th streamed chapter and drop the rows after it (caller commits).
+
+    Rows past the last streamed chapter belong to a previous outline; dropping
+    them as the stream goes keeps the rows in step with raw_outline_json even
+    when the stream fails before its last chapter.
+    """
+    row = upsert_outline_chapter(db, book_id, index, chapter)
+    delete_chapters_after(db, book_id, index)
+    return row
+
+
+def outline_from_chapters(chapters):
+    """Rebuild the {"chapters": [...]} outline the expansion takes from Chapter rows."""
+    return {"chapters": [chapter.outline or {"chapter_title": chapter.title} for chapter in chapters]}
+
+
+def load_outline_chapters(db, book):
+    """The book's Chapter rows, materialized from raw_outline_json for books outlined
+    before rows existed or whose rows no longer match it."""
+    chapters = get_chapters_for_book(db, book.id)
+    if not book.raw_outline_json:
+        return chapters
+    outline = book.raw_outline_json
+    if isinstance(outline, str):
+        outline = safe_json_loads(outline, expect=dict)
+    expected = outline_chapters(outline)
+    if expected and [chapter.outline for chapter in chapters] != expected:
+        chapters = materialize_outline(db, book.id, outline)
+        db.commit()
+    return chapters
+
+
+def chapter_pages(content):
+    """Expanded chapter markdown as Chapter.pages: {"sections": [{"heading", "content"}], "word_count"}."""
+    sections = []
+    parts = _SECTION_RE.split(content)
+    if parts[0].strip():
+        sections.append({"heading": None, "content": parts[0].strip()})
+    for heading, body in zip(parts[1::2], parts[2::2]):
+        sections.append({"heading": heading.lstrip("#").strip(), "content": body.strip()})
+    return {"sections": sections, "word_count": len(content.split())}
@@ -0,0 +1,140 @@
+"""
+Incremental parsing of a streamed outline completion.
+
+The outline is one JSON object ({"book_title", "introduction", "chapters": [...]}),
+generated token by token. StreamingOutlineParser is fed the text deltas as
+they arrive and tracks just enough JSON structure (string/escape state and
+the container stack) to notice when a top-level field or a chapter object of
+the "chapters" array has closed. That value is parsed on its own and handed
+back right away, so chapters can be stored while the rest is still being
+generated; anything before the first "{" (e.g. a ``` fence) is ignored.
+"""
+
+import json
+import logging
+
+from app.services.common import safe_json_loads
+
+logger = logging.getLogger(__name__)
+
+
+def _loads(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return safe_json_loads(text)
+
+
+class StreamingOutlineParser:
+    """Feed streamed text; returns the fields and chapters completed by each delta."""
+
+    def __init__(self, items_key="chapters"):
+        self.items_key = items_key
+        self.text = ""
+        self.fields = {}
+        self.items = []
+        self.done = False
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._expect_key = False
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+
+    def partial(self):
+        """The outline as far as it has been parsed: completed fields plus the chapters so far."""
+        return {**self.fields, self.items_key: list(self.items)}
+
+    def _emit_field(self, end, events):
+        raw = self.text[self._value_start:end].strip()
+        self._value_start = None
+        if self._key == self.items_key or not raw:
+            return
+        try:
+            self.fields[self._key] = _loads(raw)
+            events.append(("field", self._key, self.fields[self._key]))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not parse streamed outline field '{self._key}': {e}")
+
+    def _emit_item(self, end, events):
+        raw = self.text[self._item_start:end]
+        self._item_start = None
+        try:
+            item = _loads(raw)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not parse streamed outline {self.items_key} item {len(self.items) + 1}: {e}")
+            return
+        self.items.append(item)
+        events.append(("item", len(self.items) - 1, item))
+
+    def feed(self, delta):
+        """Consume a text delta; returns [("field", key, value) | ("item", index, value)] completed by it."""
+        events = []
+        if not delta or self.done:
+            return events
+        self.text += delta
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            depth = len(self._stack)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if depth == 1 and self._expect_key:
+                        self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if depth == 0:
+                if ch == "{":
+                    self._stack.append(ch)
+                    self._expect_key = True
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                if depth == 1 and not self._expect_key and self._value_start is None:
+                    self._value_start = i
+            elif ch == ":" and depth == 1:
+                self._key = self._last_string
+                self._expect_key = False
+                self._value_start = None
+            elif ch in "{[":
+                if depth == 1:
+                    self._value_start = i
+                elif depth == 2 and self._key == self.items_key and self._stack[-1] == "[" and ch == "{":
+                    self._item_start = i
+                self._stack.append(ch)
+            elif ch in "}]":
+                self._stack.pop()
+                depth = len(self._stack)
+                if depth == 0:
+                    if self._value_start is not None:
+                        self._emit_field(i, events)
+                    self.done = True
+                    self._pos = i + 1
+                    return events
+                if depth == 1 and self._value_start is not None:
+                    self._emit_field(i + 1, events)
+                elif depth == 2 and self._item_start is not None and self._key == self.items_key:
+                    self._emit_item(i + 1, events)
+            elif ch == "," and depth == 1:
+                if self._value_start is not None:
+                    self._emit_field(i, events)
+                self._expect_key = True
+            elif depth == 1 and not self._expect_key and self._value_start is None and not ch.isspace():
+                # number / true / false / null
+                self._value_start = i
+
+        self._pos = len(text)
+        return events
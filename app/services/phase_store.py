@@ -0,0 +1,209 @@
+"""
+Per-phase research results keyed by an input fingerprint.
+
+A phase's fingerprint covers everything that decides what it would fetch:
+the fully formatted query list (figure name, identity clause and source URLs
+are all baked in), the model and the answer budget. When a later run produces
+the same fingerprint, the stored answer records are reused instead of calling
+Perplexity again. Only complete phases are reused: a phase where a query
+failed is retried on the next run. A phase that adaptive mode stopped early
+(stop_reason "novelty") is complete, since the skipped queries were left out
+on purpose and would be left out again.
+
+FilePhaseStore keeps one figure's phases next to its dossier files.
+SubjectPhaseStore keeps them per canonical research subject in the database,
+so every book that resolves to the same public figure shares one copy of its
+public-web research, refreshed once it is older than the phase's max age.
+Phases whose queries embed the user's own sources (SOURCE_PHASES) are kept
+per hash of those sources instead, so two books with different sources do
+not keep overwriting one shared row.
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.services.cache import make_key
+from app.models.research import ResearchSubjectPhase
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_VERSION = 1
+
+
+def phase_fingerprint(phase_name, queries, model, max_tokens):
+    """Stable hash of one phase's formatted queries and search settings."""
+    return make_key(FINGERPRINT_VERSION, phase_name, list(queries), model, max_tokens)
+
+
+def is_complete(records, phase_stats):
+    """True when every query the phase sent came back with an answer.
+
+    Queries skipped by an adaptive novelty stop do not make a phase incomplete.
+    """
+    return bool(records) and not phase_stats.get("failed")
+
+
+class FilePhaseStore:
+    """Stores {phase: {fingerprint, records, updated_at, complete, [queries, executed, skipped, failed, stop_reason]}}
+    in <research_dir>/phases.json."""
+
+    def __init__(self, research_dir):
+        self.path = Path(research_dir) / "phases.json"
+        self._phases = None
+
+    def _load(self):
+        if self._phases is None:
+            try:
+                self._phases = json.loads(self.path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._phases = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable phase store {self.path}: {e}")
+                self._phases = {}
+        return self._phases
+
+    def get(self, phase_name, fingerprint):
+        """Stored answer records for the phase if produced from the same inputs, else None."""
+        entry = self._load().get(phase_name)
+        if entry and entry.get("fingerprint") == fingerprint and entry.get("complete", True):
+            return entry.get("records")
+        return None
+
+    def save(self, results, fingerprints, stats=None):
+        """Persist freshly researched phases alongside the ones already stored.
+
+        Incomplete phases (failed queries) are kept with complete=False,
+        which get() never returns, so the next run researches them again.
+        Empty phases are not stored.
+        """
+        phases = self._load()
+        now = int(time.time())
+        for phase_name, records in results.items():
+            if not records:
+                continue
+            phase_stats = (stats or {}).get(phase_name) or {}
+            complete = is_complete(records, phase_stats)
+            if not complete:
+                logger.info(f"Phase {phase_name} is incomplete ({phase_stats}), it will be researched again")
+            phases[phase_name] = {
+                "fingerprint": fingerprints[phase_name],
+                "records": records,
+                "updated_at": now,
+                "complete": complete,
+                **phase_stats,
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(phases, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+# Phases whose queries include the user's research sources or social profile URLs
+# (see conduct_research_copy); the rest only depend on the subject
+SOURCE_PHASES = {"Biography", "Media", "Quotes"}
+
+
+def sources_key(research_inputs):
+    """Stable hash of a book user's own sources ("" when there are none)."""
+    research_inputs = research_inputs or {}
+    sources = sorted(source.strip().lower() for source in research_inputs.get("research_sources") or [] if source)
+    profiles = [(research_inputs.get(name) or "").strip().lower() for name in ("linkedin", "twitter", "youtube")]
+    if not sources and not any(profiles):
+        return ""
+    return make_key(sources, profiles)
+
+
+# Shared subject research is reused for this long; news-driven phases go stale faster
+SUBJECT_MAX_AGE_DAYS = int(os.getenv("RESEARCH_SUBJECT_MAX_AGE_DAYS", "30"))
+PHASE_MAX_AGE_DAYS = {"Media": int(os.getenv("RESEARCH_SUBJECT_MEDIA_MAX_AGE_DAYS", "7"))}
+
+
+class SubjectPhaseStore:
+    """Phase store backed by research_subject_phases rows of one ResearchSubject.
+
+    `sources` are the book user's research inputs (see get_research_inputs);
+    SOURCE_PHASES rows are kept per hash of them, the other phases are shared.
+    Every get/save uses its own short session from session_factory, so shared
+    research is committed as soon as it is produced, independently of the
+    caller's transaction.
+    """
+
+    def __init__(self, subject_id, session_factory, sources=None):
+        self.subject_id = subject_id
+        self.session_factory = session_factory
+        self.sources_key = sources_key(sources)
+
+    def _scope(self, phase_name):
+        return self.sources_key if phase_name in SOURCE_PHASES else ""
+
+    def _is_fresh(self, phase_name, researched_at):
+        max_age = timedelta(days=PHASE_MAX_AGE_DAYS.get(phase_name, SUBJECT_MAX_AGE_DAYS))
+        return researched_at is not None and datetime.utcnow() - researched_at <= max_age
+
+    def get(self, phase_name, fingerprint):
+        """Shared answer records for the phase if produced from the same inputs and still fresh, else None."""
+        db = self.session_factory()
+        try:
+            row = (
+                db.query(ResearchSubjectPhase.fingerprint, ResearchSubjectPhase.records, ResearchSubjectPhase.researched_at)
+                .filter(
+                    ResearchSubjectPhase.subject_id == self.subject_id,
+                    ResearchSubjectPhase.phase == phase_name,
+                    ResearchSubjectPhase.sources_key == self._scope(phase_name),
+                )
+                .first()
+            )
+        finally:
+            db.close()
+        if row is None or row.fingerprint != fingerprint:
+            return None
+        if not self._is_fresh(phase_name, row.researched_at):
+            logger.info(f"Shared research for phase {phase_name} is stale, refreshing")
+            return None
+        return row.records
+
+    def save(self, results, fingerprints, stats=None):
+        """Store freshly researched phases, bumping each phase's version.
+
+        Only complete phases are shared; a phase with failed queries leaves the
+        stored row as it was, so the next run researches it again.
+        """
+        db = self.session_factory()
+        try:
+            existing = {
+                (row.phase, row.sources_key): row
+                for row in db.query(ResearchSubjectPhase).filter(
+                    ResearchSubjectPhase.subject_id == self.subject_id,
+                    ResearchSubjectPhase.phase.in_(list(results)),
+                )
+            }
+            now = datetime.utcnow()
+            for phase_name, records in results.items():
+                phase_stats = (stats or {}).get(phase_name) or {}
+                if not is_complete(records, phase_stats):
+                    logger.info(f"Not sharing incomplete phase {phase_name} ({phase_stats})")
+                    continue
+                scope = self._scope(phase_name)
+                row = existing.get((phase_name, scope))
+                if row is None:
+                    row = ResearchSubjectPhase(
+                        subject_id=self.subject_id, phase=phase_name, sources_key=scope, version=0
+                    )
+                    db.add(row)
+                row.fingerprint = fingerprints[phase_name]
+                row.records = records
+                row.version = (row.version or 0) + 1
+                row.researched_at = now
+                row.queries = phase_stats.get("queries")
+                row.executed = phase_stats.get("executed")
+                row.skipped = phase_stats.get("skipped")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
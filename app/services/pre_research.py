@@ -0,0 +1,96 @@
+"""
+Speculative public-web research, started at onboarding.
+
+Everything the research phases need (name, title, LinkedIn, Twitter, website)
+is known once onboarding is submitted, long before the user finishes the
+interview and asks for an outline. enqueue_speculative_research queues the
+research on the low-priority speculative queue right then; it runs into the
+figure's SubjectPhaseStore, where phases are keyed by their input
+fingerprint. The outline worker later runs the same phases, finds matching
+fingerprints and reuses them instead of waiting on Perplexity.
+
+Jobs are keyed by book user and fingerprinted by the research inputs, so an
+unchanged /onboarding/modify is a no-op while a changed one cancels the stale
+job and queues a new one. A cancelled run never saves partial phases.
+"""
+
+import os
+import logging
+
+from app.db.database import SessionLocal
+from app.models.book_user import BookUser
+from app.crud.research import get_research_inputs, resolve_research_subject, subject_profile_url
+from app.services.cache import make_key
+from app.services.phase_store import SubjectPhaseStore
+from app.services.speculative import SpeculativeQueue
+from app.scripts.web_research import conduct_research_copy, PERPLEXITY_API_KEY
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_RESEARCH_ENABLED = os.getenv("SPECULATIVE_RESEARCH_ENABLED", "true").lower() in ("1", "true", "yes")
+# Concurrent Perplexity calls of a speculative run (the outline run uses RESEARCH_MAX_CONCURRENCY)
+SPECULATIVE_RESEARCH_CONCURRENCY = int(os.getenv("SPECULATIVE_RESEARCH_CONCURRENCY", "2"))
+# How long the outline worker waits for a speculative run already in flight
+SPECULATIVE_RESEARCH_WAIT_SECONDS = int(os.getenv("SPECULATIVE_RESEARCH_WAIT_SECONDS", "900"))
+
+speculative_research = SpeculativeQueue("research")
+
+
+def research_inputs_fingerprint(figure_name, research_inputs):
+    """Stable hash of everything a speculative research run depends on."""
+    return make_key(figure_name, research_inputs)
+
+
+def _figure_name(book_user):
+    return book_user.name + " " + (book_user.title or "")
+
+
+def run_speculative_research(book_user_id, cancel=None):
+    """Research a book user's public footprint into the shared subject store (runs on the speculative queue)."""
+    db = SessionLocal()
+    try:
+        book_user = (
+            db.query(BookUser)
+            .filter(BookUser.id == book_user_id, BookUser.is_deleted == False)
+            .first()
+        )
+        if not book_user or not book_user.name:
+            logger.info(f"Speculative research skipped, no book user {book_user_id}")
+            return
+
+        research_inputs = get_research_inputs(db, book_user.id)
+        subject = resolve_research_subject(db, book_user.name, book_user.title, subject_profile_url(research_inputs))
+        book_user.subject_id = subject.id
+        db.commit()
+
+        if cancel is not None and cancel.is_set():
+            return
+        logger.info(f"🔮 Speculative research started for {_figure_name(book_user)}")
+        result = conduct_research_copy(
+            figure_name=_figure_name(book_user),
+            refresh=True,
+            store=SubjectPhaseStore(subject.id, SessionLocal, sources=research_inputs),
+            cancel=cancel,
+            max_concurrency=SPECULATIVE_RESEARCH_CONCURRENCY,
+            **research_inputs,
+        )
+        if result:
+            logger.info(f"🔮 Speculative research ready for {_figure_name(book_user)}")
+    finally:
+        db.close()
+
+
+def enqueue_speculative_research(db, book_user):
+    """Queue speculative research for a book user; returns True if a new job was queued."""
+    if not SPECULATIVE_RESEARCH_ENABLED or not PERPLEXITY_API_KEY or not book_user.name:
+        return False
+    fingerprint = research_inputs_fingerprint(_figure_name(book_user), get_research_inputs(db, book_user.id))
+    return speculative_research.submit(book_user.id, fingerprint, run_speculative_research, book_user.id)
+
+
+def settle_speculative_research(book_user_id):
+    """Called before the real research run: cancel a queued job, or wait for a running one to finish."""
+    state = speculative_research.settle(book_user_id, timeout=SPECULATIVE_RESEARCH_WAIT_SECONDS)
+    if state:
+        logger.info(f"Speculative research for {book_user_id}: {state}")
+    return state
@@ -0,0 +1,125 @@
+"""
+Cross-phase research query planner.
+
+Phase query lists are built independently and overlap a lot: the same
+`site:` URL lands in both bio and media, and most queries are the same
+quoted subject with a different OR-suffix. The planner
+
+1. normalises queries and merges exact duplicates (across and within phases),
+2. packs up to QUERY_PACK_SIZE open-web questions about the same quoted
+   subject into one Perplexity call, asking for one "## Q<n>" section per
+   question, and
+3. splits packed answers back so every (phase, position) slot gets its text.
+   Questions a packed answer left out come back as None; the engine asks
+   them again on their own (single_unit).
+
+`site:` queries are never packed, because each one restricts the search to a
+different domain.
+"""
+
+import os
+import re
+
+QUERY_PACK_SIZE = int(os.getenv("RESEARCH_QUERY_PACK_SIZE", "3"))
+PACKED_MAX_TOKENS = 6000
+
+_SUBJECT_RE = re.compile(r'^\s*("[^"]+"|\'[^\']+\')')
+_ANSWER_MARKER_RE = re.compile(r"^#{1,6}\s*Q(\d+)\b[^\n]*$", re.MULTILINE)
+
+
+def normalize_query(query):
+    """Whitespace/case/quote-insensitive form used to detect duplicate queries (and as their cache key)."""
+    return " ".join(query.replace("'", '"').split()).casefold()
+
+
+def _pack_subject(query):
+    """Quoted subject a query can be packed under, or None if it must run alone."""
+    if "site:" in query.lower():
+        return None
+    match = _SUBJECT_RE.match(query)
+    return normalize_query(match.group(1)) if match else None
+
+
+def _packed_prompt(questions):
+    lines = [
+        "Research each of the following questions separately.",
+        "Answer them in order. Start each answer with a line containing only '## Q<number>' "
+        "(for example '## Q1'), followed by a detailed, cited answer.",
+        "",
+    ]
+    for number, question in enumerate(questions, 1):
+        lines.append(f"Q{number}: {question['query']}")
+    return "\n".join(lines)
+
+
+def single_unit(question, max_tokens):
+    """Execution unit asking one question on its own."""
+    return {"prompt": question["query"], "max_tokens": max_tokens, "questions": [question]}
+
+
+def plan_queries(phases, pack_size=None, single_max_tokens=2000):
+    """Turn [(phase_name, [query, ...]), ...] into execution units.
+
+    Each unit is {"prompt", "max_tokens", "questions"} where every question is
+    {"query", "slots": [(phase_name, position), ...]} and position is 1-based.
+    Returns (units, planned_query_count).
+    """
+    pack_size = pack_size or QUERY_PACK_SIZE
+    questions = {}
+    planned = 0
+    for phase_name, queries in phases:
+        for position, query in enumerate(queries, 1):
+            planned += 1
+            key = normalize_query(query)
+            if key not in questions:
+                questions[key] = {"query": query, "slots": []}
+            questions[key]["slots"].append((phase_name, position))
+
+    groups = {}
+    units = []
+    for question in questions.values():
+        subject = _pack_subject(question["query"]) if pack_size > 1 else None
+        if subject is None:
+            units.append(single_unit(question, single_max_tokens))
+        else:
+            groups.setdefault(subject, []).append(question)
+
+    for grouped in groups.values():
+        for start in range(0, len(grouped), pack_size):
+            batch = grouped[start:start + pack_size]
+            if len(batch) == 1:
+                units.append(single_unit(batch[0], single_max_tokens))
+            else:
+                units.append({
+                    "prompt": _packed_prompt(batch),
+                    "max_tokens": min(single_max_tokens * len(batch), PACKED_MAX_TOKENS),
+                    "questions": batch,
+                })
+    return units, planned
+
+
+def split_answer(unit, answer):
+    """Split a unit's answer into one text per question.
+
+    Questions the answer has no section for are None, so the caller can ask
+    them again unpacked.
+    """
+    questions = unit["questions"]
+    if not answer or len(questions) == 1:
+        return [answer] * len(questions)
+
+    parts = [None] * len(questions)
+    markers = list(_ANSWER_MARKER_RE.finditer(answer))
+    if not markers:
+        # Model ignored the format; keep the text under the first question,
+        # the others are left unanswered
+        parts[0] = answer.strip()
+        return parts
+
+    for i, marker in enumerate(markers):
+        number = int(marker.group(1))
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(answer)
+        text = answer[marker.end():end].strip()
+        if 1 <= number <= len(questions) and text:
+            parts[number - 1] = text
+    return parts
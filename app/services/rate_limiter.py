@@ -0,0 +1,163 @@
+"""
+Shared token-bucket rate limiter for outbound providers.
+
+Every provider (Perplexity, xAI/Grok, OpenAI, Firecrawl, Enrich.so) has a
+requests-per-minute and an optional tokens-per-minute bucket. Bucket state
+lives in a small JSON file guarded by an exclusive file lock, so all threads
+and all worker processes on the host draw from the same budget. Callers
+block only as long as the quota actually requires instead of sleeping a
+fixed interval.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DIR = Path(os.getenv("CACHE_DIR", ".cache")) / "ratelimit"
+
+# provider -> (requests per minute, tokens per minute; 0 = no token budget)
+DEFAULT_LIMITS = {
+    "perplexity": (50, 0),
+    "xai": (60, 100000),
+    "openai": (500, 200000),
+    "firecrawl": (100, 0),
+    "enrich_so": (60, 0),
+}
+
+# Bucket capacity as a fraction of the per-minute budget (limits bursts)
+BURST_FRACTION = float(os.getenv("RATE_LIMIT_BURST_FRACTION", "0.2"))
+
+
+def estimate_tokens(text, max_output_tokens=0):
+    """Rough token estimate (~4 chars/token) for budgeting a request."""
+    return len(text or "") // 4 + (max_output_tokens or 0)
+
+
+def _limit_from_env(provider, kind, default):
+    return int(os.getenv(f"RATE_LIMIT_{provider.upper()}_{kind}", str(default)))
+
+
+class RateLimiter:
+    """Requests/tokens per minute bucket for one provider."""
+
+    def __init__(self, provider, rpm, tpm=0):
+        self.provider = provider
+        self.rpm = rpm
+        self.tpm = tpm
+        self.request_capacity = max(1.0, rpm * BURST_FRACTION)
+        self.token_capacity = max(1.0, tpm * BURST_FRACTION) if tpm else 0.0
+        self.state_path = RATE_LIMIT_DIR / f"{provider}.json"
+        self._lock = threading.Lock()
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state["updated"])
+        state["requests"] = min(self.request_capacity, state["requests"] + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            state["tokens"] = min(self.token_capacity, state["tokens"] + elapsed * self.tpm / 60.0)
+        state["updated"] = now
+
+    def _try_acquire_locked(self, state_file, tokens):
+        now = time.time()
+        raw = state_file.read()
+        state = json.loads(raw) if raw else {
+            "requests": self.request_capacity,
+            "tokens": self.token_capacity,
+            "updated": now,
+        }
+        self._refill(state, now)
+
+        tokens = min(tokens, self.token_capacity) if self.tpm else 0
+        wait = 0.0
+        if state["requests"] < 1:
+            wait = (1 - state["requests"]) * 60.0 / self.rpm
+        if self.tpm and state["tokens"] < tokens:
+            wait = max(wait, (tokens - state["tokens"]) * 60.0 / self.tpm)
+        if wait == 0.0:
+            state["requests"] -= 1
+            state["tokens"] -= tokens
+
+        state_file.seek(0)
+        state_file.truncate()
+        state_file.write(json.dumps(state))
+        return wait
+
+    def try_acquire(self, tokens=0):
+        """Take one request (and `tokens`) if available; otherwise return seconds to wait."""
+        if self.rpm <= 0:
+            return 0.0
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.state_path, "a+", encoding="utf-8") as state_file:
+                if fcntl:
+                    fcntl.flock(state_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    state_file.seek(0)
+                    return self._try_acquire_locked(state_file, tokens)
+                finally:
+                    if fcntl:
+                        fcntl.flock(state_file.fileno(), fcntl.LOCK_UN)
+
+    def acquire(self, tokens=0):
+        """Block until the request fits in the provider budget."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                break
+            waited += wait
+            time.sleep(wait)
+        if waited > 1:
+            logger.info(f"[rate-limit:{self.provider}] waited {waited:.1f}s for quota")
+
+    async def acquire_async(self, tokens=0):
+        """Async variant of `acquire`; yields to the event loop while waiting.
+
+        The file-locked refill runs in a worker thread, since flock blocks
+        while another thread or process holds the bucket.
+        """
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, tokens)
+            if wait <= 0:
+                break
+            waited += wait
+            await asyncio.sleep(wait)
+        if waited > 1:
+            logger.info(f"[rate-limit:{self.provider}] waited {waited:.1f}s for quota")
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider):
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rpm, tpm = DEFAULT_LIMITS.get(provider, (60, 0))
+            limiter = RateLimiter(
+                provider,
+                rpm=_limit_from_env(provider, "RPM", rpm),
+                tpm=_limit_from_env(provider, "TPM", tpm),
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def acquire(provider, tokens=0):
+    get_limiter(provider).acquire(tokens)
+
+
+async def acquire_async(provider, tokens=0):
+    await get_limiter(provider).acquire_async(tokens)
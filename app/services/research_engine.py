@@ -1,5 +1,254 @@
-def run_research(project_id, inputs):
-    # 1. Insert into research_inputs
-    # 2. Scrape URLs / SERP
-    # 3. Store each site in research_sources
-    return True
+"""
+Async research engine.
+
+Plans the queries of every research phase together (see query_planner),
+fans the resulting calls out concurrently (bounded by a semaphore) and folds
+the answers back into one markdown block per phase, in the same
+"### Search N: query" layout that `research_phase` produces. In adaptive
+mode phases run in waves and stop once answers stop adding new material;
+must-run queries (e.g. the user's own sources) are still sent after a stop.
+"""
+
+import os
+import time
+import asyncio
+import logging
+
+from app.services.query_planner import plan_queries, split_answer, single_unit
+from app.services.novelty import (
+    NoveltyTracker,
+    RESEARCH_ADAPTIVE,
+    NOVELTY_MIN_QUERIES,
+    NOVELTY_WAVE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+RESEARCH_MAX_CONCURRENCY = int(os.getenv("RESEARCH_MAX_CONCURRENCY", "8"))
+
+
+def format_search_result(index, query, result):
+    """Render a single query answer the way the dossier expects it."""
+    return f"### Search {index}: {query}\n\n{result}\n\n"
+
+
+def render_phase(records):
+    """Render a phase's answer records as the dossier's markdown block."""
+    return "\n".join(
+        format_search_result(r["query_index"], r["query"], r["content"]) for r in records
+    )
+
+
+def _as_record(answer):
+    """Search callbacks may return plain text or a record dict with citations/usage."""
+    if not answer:
+        return None
+    if isinstance(answer, str):
+        return {"content": answer}
+    return dict(answer) if answer.get("content") else None
+
+
+def _unit_records(unit, record, parts, positions):
+    """Map one call's split answer to (phase_name, text, record) per phase slot it served.
+
+    positions maps each phase to the 1-based phase positions of the queries it
+    sent in this wave, in the order they were planned.
+    """
+    collected = []
+    for n, (question, part) in enumerate(zip(unit["questions"], parts)):
+        for phase_name, position in question["slots"]:
+            slot_record = None
+            if part:
+                slot_record = {
+                    **record,
+                    "phase": phase_name,
+                    "query_index": positions[phase_name][position - 1],
+                    "query": question["query"],
+                    "content": part,
+                    "usage": record.get("usage") if n == 0 else None,
+                }
+            collected.append((phase_name, part, slot_record))
+    return collected
+
+
+def format_queries(templates, figure_name, context=None):
+    """Fill the {figure}/{context} placeholders of a phase's query templates."""
+    return [t.format(figure=figure_name, context=context or "") for t in templates or []]
+
+
+async def run_phases_async(
+    phases,
+    search,
+    figure_name,
+    context=None,
+    max_concurrency=None,
+    max_tokens=2000,
+    adaptive=None,
+    stats=None,
+    on_result=None,
+    must_run=None,
+    pack=True,
+):
+    """Run all phase queries concurrently.
+
+    phases: list of (phase_name, query_templates) tuples.
+    search: coroutine function taking (prompt, max_tokens) and returning the answer text,
+        a record dict ({"content", "citations", "usage", ...}) or None.
+    Queries are first passed through the query planner, so duplicates run once
+    and related questions share a call; answers are mapped back to every phase
+    that asked for them. Questions a packed answer skipped are asked again on
+    their own. With pack=False every question gets its own call (duplicates
+    are still merged).
+
+    In adaptive mode (default: RESEARCH_ADAPTIVE) phases run in waves and a
+    phase stops early once its answers stop adding new material (see novelty).
+    A wave with failed queries never stops a phase, and queries listed in
+    `must_run` (templates, like the phase queries) are sent even after a stop.
+    If `stats` is a dict it is filled with {phase_name: {queries, executed, skipped, failed, stop_reason}}
+    (failed: executed queries that got no answer; stop_reason: "novelty" when
+    adaptive mode skipped the rest of the phase, else None).
+    `on_result(record)` is called as soon as each answer arrives, e.g. to stream it to disk.
+    Returns {phase_name: [record, ...]} in the original phase order, one record
+    per answered query with "phase", "query_index" and "query" filled in
+    (see render_phase). A packed call's usage is attributed to its first question.
+    """
+    adaptive = RESEARCH_ADAPTIVE if adaptive is None else adaptive
+    semaphore = asyncio.Semaphore(max_concurrency or RESEARCH_MAX_CONCURRENCY)
+
+    async def run_unit(index, total, unit):
+        async with semaphore:
+            label = unit["questions"][0]["query"]
+            if len(unit["questions"]) > 1:
+                label += f" (+{len(unit['questions']) - 1} packed)"
+            logger.info(f"  Query {index}/{total}: {label}...")
+            try:
+                return await search(unit["prompt"], unit["max_tokens"])
+            except Exception as e:
+                logger.error(f"Research query failed '{label}': {e}")
+                return None
+
+    async def run_and_collect(index, total, unit, positions):
+        record = _as_record(await run_unit(index, total, unit))
+        parts = split_answer(unit, record["content"] if record else None)
+        collected = _unit_records(unit, record, parts, positions)
+        missed = [question for question, part in zip(unit["questions"], parts) if not part]
+        if record and missed:
+            # The packed answer skipped some questions: ask those separately
+            logger.warning(f"  Query {index}/{total}: {len(missed)} packed question(s) unanswered, asking separately")
+            collected = [item for item in collected if item[1]]
+            retries = [single_unit(question, max_tokens) for question in missed]
+            answers = await asyncio.gather(*(run_unit(index, total, retry) for retry in retries))
+            for retry, answer in zip(retries, answers):
+                retry_record = _as_record(answer)
+                retry_parts = split_answer(retry, retry_record["content"] if retry_record else None)
+                collected += _unit_records(retry, retry_record, retry_parts, positions)
+        if on_result is not None:
+            for _, _, record in collected:
+                if record:
+                    on_result(record)
+        return collected
+
+    started = time.monotonic()
+    formatted = []
+    for phase_name, templates in phases:
+        queries = format_queries(templates, figure_name, context)
+        logger.info(f"Planning {phase_name} research for {figure_name} ({len(queries)} queries)...")
+        formatted.append((phase_name, queries))
+
+    must_run = set(format_queries(must_run, figure_name, context))
+    tracker = NoveltyTracker()
+    pending = {phase_name: list(range(1, len(queries) + 1)) for phase_name, queries in formatted}
+    executed = {phase_name: 0 for phase_name, _ in formatted}
+    stopped = set()
+    slot_records = {}
+    planned_total = calls_total = 0
+
+    while True:
+        wave = []
+        for phase_name, queries in formatted:
+            remaining = pending[phase_name]
+            if phase_name in stopped:
+                # An early stop skips the rest of the phase except its must-run queries
+                chunk_positions = [p for p in remaining if queries[p - 1] in must_run]
+            elif adaptive:
+                chunk_positions = remaining[:NOVELTY_MIN_QUERIES if executed[phase_name] == 0 else NOVELTY_WAVE_SIZE]
+            else:
+                chunk_positions = remaining
+            if chunk_positions:
+                wave.append((phase_name, [queries[p - 1] for p in chunk_positions], chunk_positions))
+        if not wave:
+            break
+
+        units, planned = plan_queries(
+            [(name, chunk) for name, chunk, _ in wave],
+            pack_size=None if pack else 1,
+            single_max_tokens=max_tokens,
+        )
+        planned_total += planned
+        calls_total += len(units)
+        logger.info(
+            f"Query plan: {planned} planned -> {len(units)} executed "
+            f"({planned - len(units)} saved by merging and packing)"
+        )
+
+        positions = {name: chunk_positions for name, _, chunk_positions in wave}
+        collected_per_unit = await asyncio.gather(*(
+            asyncio.create_task(run_and_collect(i, len(units), unit, positions))
+            for i, unit in enumerate(units, 1)
+        ))
+
+        wave_texts = {name: [] for name, _, _ in wave}
+        for collected in collected_per_unit:
+            for phase_name, part, record in collected:
+                wave_texts[phase_name].append(part)
+                if record:
+                    slot_records[(phase_name, record["query_index"])] = record
+
+        novelty = {name: tracker.score(texts) for name, texts in wave_texts.items()}
+        for phase_name, chunk, chunk_positions in wave:
+            sent = set(chunk_positions)
+            pending[phase_name] = [p for p in pending[phase_name] if p not in sent]
+            executed[phase_name] += len(chunk)
+            if not adaptive or phase_name in stopped or not pending[phase_name]:
+                continue
+            if None in wave_texts[phase_name]:
+                # Failed queries say nothing about novelty; keep going
+                continue
+            if tracker.should_stop(executed[phase_name], novelty[phase_name]):
+                stopped.add(phase_name)
+                logger.info(
+                    f"[{phase_name}] novelty {novelty[phase_name]:.2f} below threshold, "
+                    f"stopping after {executed[phase_name]} queries"
+                )
+        for texts in wave_texts.values():
+            tracker.add(texts)
+
+    results = {}
+    phase_stats = {}
+    for phase_name, queries in formatted:
+        records = [
+            slot_records[(phase_name, i)]
+            for i in range(1, len(queries) + 1)
+            if (phase_name, i) in slot_records
+        ]
+        results[phase_name] = records
+        phase_stats[phase_name] = {
+            "queries": len(queries),
+            "executed": executed[phase_name],
+            "skipped": len(pending[phase_name]),
+            "failed": executed[phase_name] - len(records),
+            "stop_reason": "novelty" if phase_name in stopped else None,
+        }
+        logger.info(
+            f"Completed {phase_name} research ({len(records)} queries, {len(pending[phase_name])} skipped, "
+            f"{executed[phase_name] - len(records)} failed)"
+        )
+
+    if stats is not None:
+        stats.update(phase_stats)
+    logger.info(
+        f"Research engine finished {planned_total} queries ({calls_total} calls, "
+        f"{sum(s['skipped'] for s in phase_stats.values())} skipped) across {len(formatted)} phases "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    return results
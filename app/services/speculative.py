@@ -0,0 +1,158 @@
+"""
+Low-priority, cancellable background jobs for speculative work.
+
+Jobs run one at a time on a single daemon thread, so speculation never
+competes with user-facing requests for more than one slot. Each job is keyed
+(e.g. by book user) and carries an input fingerprint: submitting the same key
+with the same fingerprint again is a no-op, while a new fingerprint cancels
+the older job and queues a fresh one. The job function receives a
+threading.Event as `cancel` and should stop early (without storing partial
+results) once it is set.
+
+settle(key) is called by the real, user-triggered work before it starts: a
+job still waiting in the queue is cancelled, and a running job is waited for
+so its results can be reused instead of paid for twice. A settled job is
+forgotten; finished jobs nobody settles are dropped after
+SPECULATIVE_JOB_RETENTION_SECONDS.
+
+The queue lives in the process that created it. With several uvicorn
+workers, settle() only sees jobs submitted in the same process: a job from
+another worker is neither cancelled nor waited for, and both runs pay for
+the work (results stored in a shared store are still reused afterwards).
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Finished jobs are kept this long so a resubmit with the same inputs is still a no-op
+SPECULATIVE_JOB_RETENTION_SECONDS = int(os.getenv("SPECULATIVE_JOB_RETENTION_SECONDS", "3600"))
+
+
+class _Job:
+    def __init__(self, key, fingerprint, fn, args):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.fn = fn
+        self.args = args
+        self.state = PENDING
+        self.cancel = threading.Event()
+        self.finished = threading.Event()
+        self.finished_at = None
+
+    def finish(self, state):
+        self.state = state
+        self.finished_at = time.monotonic()
+        self.finished.set()
+
+
+class SpeculativeQueue:
+    """Single-worker FIFO of cancellable jobs, at most one live job per key."""
+
+    def __init__(self, name):
+        self.name = name
+        self._jobs = {}
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=f"speculative-{self.name}", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                if job.cancel.is_set():
+                    job.finish(CANCELLED)
+                    continue
+                job.state = RUNNING
+
+            logger.info(f"[speculative:{self.name}] running job for {job.key}")
+            try:
+                job.fn(*job.args, cancel=job.cancel)
+                state = CANCELLED if job.cancel.is_set() else DONE
+            except Exception as e:
+                logger.warning(f"[speculative:{self.name}] job for {job.key} failed: {e}")
+                state = FAILED
+            with self._cond:
+                job.finish(state)
+            logger.info(f"[speculative:{self.name}] job for {job.key} {state}")
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period (caller holds the lock)."""
+        cutoff = time.monotonic() - SPECULATIVE_JOB_RETENTION_SECONDS
+        for key in [k for k, job in self._jobs.items() if job.state in FINISHED_STATES and job.finished_at < cutoff]:
+            del self._jobs[key]
+
+    def _forget(self, key, job):
+        with self._cond:
+            if self._jobs.get(key) is job:
+                del self._jobs[key]
+
+    def submit(self, key, fingerprint, fn, *args):
+        """Queue fn(*args, cancel=Event) for key unless a live or finished job has the same fingerprint."""
+        with self._cond:
+            self._prune()
+            existing = self._jobs.get(key)
+            if existing is not None:
+                if existing.fingerprint == fingerprint and existing.state in (PENDING, RUNNING, DONE):
+                    return False
+                existing.cancel.set()
+            job = _Job(key, fingerprint, fn, args)
+            self._jobs[key] = job
+            self._queue.append(job)
+            self._ensure_worker()
+            self._cond.notify()
+        logger.info(f"[speculative:{self.name}] queued job for {key}")
+        return True
+
+    def cancel(self, key):
+        """Cancel the job for key; a running job stops at its next cancellation check."""
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None or job.state not in (PENDING, RUNNING):
+                return False
+            job.cancel.set()
+            return True
+
+    def settle(self, key, timeout=None):
+        """Before doing the real work for key: drop a queued job, or wait for a running one.
+
+        Returns the job's final state, or None when there was no job. A job
+        that has finished is forgotten once settled.
+        """
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            if job.state == PENDING:
+                job.cancel.set()
+                job.finish(CANCELLED)
+                del self._jobs[key]
+                return CANCELLED
+        if not job.finished.wait(timeout):
+            logger.info(f"[speculative:{self.name}] still running for {key} after {timeout}s, not waiting longer")
+            return job.state
+        self._forget(key, job)
+        return job.state
+
+    def state(self, key):
+        with self._cond:
+            job = self._jobs.get(key)
+            return job.state if job else None
@@ -0,0 +1,99 @@
+"""
+Map-reduce summarization of large text fields.
+
+map:    the text is chunked on paragraph/sentence boundaries (see chunking)
+        and every chunk is summarized concurrently (SUMMARY_MAX_WORKERS per
+        call). Chunk summaries are memoized on disk by content hash only;
+        the chunk's position goes into the prompt's title but not the key, so
+        an edit that changes the chunk count never re-summarizes unchanged
+        chunks. Whole-text summaries are also keyed on their title.
+reduce: chunk summaries are concatenated; while the result is still over the
+        chunk budget it is chunked and summarized again (hierarchically), and
+        a final call produces the combined summary.
+
+The caller provides `summarize(text, title)`, which returns the summary or a
+string starting with "Error" on failure (the research_script convention).
+"""
+
+import os
+import hashlib
+import logging
+import concurrent.futures
+
+from app.services.cache import DiskCache, make_key
+from app.services.chunking import split_into_chunks, approx_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CHUNK_TOKENS = 750
+# Chunk summaries in flight per map_reduce_summarize call; callers already run in worker pools
+SUMMARY_MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", "8"))
+SUMMARY_MAX_LEVELS = 4
+SUMMARY_PROMPT_VERSION = 1
+
+chunk_summary_cache = DiskCache("chunk_summaries", ttl_seconds=30 * 24 * 3600, max_entries=50000)
+
+
+def _content_key(text, namespace, title=None):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return make_key(namespace, SUMMARY_PROMPT_VERSION, title, digest)
+
+
+def _is_error(summary):
+    return not summary or summary.startswith("Error")
+
+
+def _summarize_cached(summarize, text, title, namespace, key=None):
+    key = key or _content_key(text, namespace, title)
+    cached = chunk_summary_cache.get(key)
+    if cached is not None:
+        return cached
+    summary = summarize(text, title)
+    if not _is_error(summary):
+        chunk_summary_cache.set(key, summary)
+    return summary
+
+
+def _map(summarize, chunks, title, namespace, max_workers):
+    titles = [f"{title} (chunk {i}/{len(chunks)})" for i in range(1, len(chunks) + 1)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return list(executor.map(
+            lambda args: _summarize_cached(summarize, args[0], args[1], namespace, key=_content_key(args[0], namespace)),
+            zip(chunks, titles),
+        ))
+
+
+def map_reduce_summarize(
+    text,
+    summarize,
+    title="Large Field",
+    namespace="default",
+    chunk_tokens=SUMMARY_CHUNK_TOKENS,
+    max_workers=SUMMARY_MAX_WORKERS,
+    count_tokens=approx_tokens,
+):
+    """Summarize text of any size with concurrent chunk summaries and a hierarchical reduce.
+
+    namespace separates memoized summaries of different summarize functions/models.
+    """
+    if count_tokens(text) <= chunk_tokens:
+        return _summarize_cached(summarize, text, title, namespace)
+
+    current = text
+    for level in range(1, SUMMARY_MAX_LEVELS + 1):
+        chunks = split_into_chunks(current, chunk_tokens, count_tokens)
+        logger.info(f"Summarizing '{title}' level {level}: {len(chunks)} chunks in parallel")
+        summaries = _map(summarize, chunks, title, namespace, max_workers)
+        for i, summary in enumerate(summaries, 1):
+            if _is_error(summary):
+                logger.warning(f"Failed to summarize chunk {i} of '{title}' (level {level})")
+                return f"Error summarizing chunk {i} for '{title}'."
+
+        current = "\n\n".join(
+            f"--- Summary of Chunk {i} ---\n{summary}" for i, summary in enumerate(summaries, 1)
+        )
+        if count_tokens(current) <= chunk_tokens or len(chunks) == 1:
+            break
+
+    logger.info(f"Combining partial summaries for '{title}'.")
+    return _summarize_cached(summarize, current, f"{title} - Combined Summary", namespace)
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep disk caches and checkpoints out of the working tree, and give
+# app.db a URL so modules that import it can be loaded (nothing connects).
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="bookcreate-cache-"))
+os.environ.setdefault("DATABASE_URL", "postgresql://test@localhost/test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,53 @@
+from app.services.batch_runner import BatchCheckpoint, checkpoint_path, iter_csv_rows, new_run_id, run_batch
+
+
+def _write_csv(path, names):
+    path.write_text("first_name,last_name\n" + "".join(f"{n},Doe\n" for n in names), encoding="utf-8")
+
+
+def test_checkpoint_is_scoped_to_input_and_run(tmp_path):
+    a = checkpoint_path(tmp_path, tmp_path / "people.csv", "run1")
+    assert a != checkpoint_path(tmp_path, tmp_path / "people.csv", "run2")
+    assert a != checkpoint_path(tmp_path, tmp_path / "other" / "people.csv", "run1")
+    assert a.name.startswith("people-") and a.name.endswith("-run1.jsonl")
+    assert new_run_id() != new_run_id()
+
+
+def test_resumed_run_skips_done_rows_and_retries_failed(tmp_path):
+    csv_path = tmp_path / "people.csv"
+    _write_csv(csv_path, ["Ann", "Bob", "Cy"])
+    path = checkpoint_path(tmp_path, csv_path, "run1")
+
+    def flaky(row, index):
+        return "failed" if row["first_name"] == "Bob" else "ok"
+
+    counts = run_batch(iter_csv_rows(csv_path), flaky, checkpoint=BatchCheckpoint(path), is_success=lambda r: r == "ok")
+    assert counts == {"succeeded": 2, "failed": 1, "skipped": 0}
+
+    seen = []
+
+    def record(row, index):
+        seen.append(row["first_name"])
+        return "ok"
+
+    counts = run_batch(iter_csv_rows(csv_path), record, checkpoint=BatchCheckpoint(path), is_success=lambda r: r == "ok")
+    assert counts == {"succeeded": 1, "failed": 0, "skipped": 2}
+    assert seen == ["Bob"]
+
+
+def test_new_run_does_not_see_other_runs(tmp_path):
+    csv_path = tmp_path / "people.csv"
+    _write_csv(csv_path, ["Ann"])
+    run_batch(iter_csv_rows(csv_path), lambda row, index: "ok", checkpoint=BatchCheckpoint(checkpoint_path(tmp_path, csv_path, "run1")))
+    counts = run_batch(
+        iter_csv_rows(csv_path), lambda row, index: "ok", checkpoint=BatchCheckpoint(checkpoint_path(tmp_path, csv_path, "run2"))
+    )
+    assert counts["skipped"] == 0
+
+
+def test_reset_removes_checkpoint(tmp_path):
+    checkpoint = BatchCheckpoint(tmp_path / "c.jsonl")
+    checkpoint.record("k", 0, "done")
+    checkpoint.reset()
+    assert not checkpoint.path.exists()
+    assert not checkpoint.is_done("k")
@@ -0,0 +1,38 @@
+from app.services.context_compression import compress_sections, compress_text
+
+FILLER = " ".join(f"Filler sentence number {i} repeats the same dull words again." for i in range(60))
+
+
+def test_text_under_budget_is_unchanged():
+    text = "# Title\n\nShort paragraph."
+    assert compress_text(text, 1000) == text
+
+
+def test_compression_keeps_line_breaks_and_list_structure():
+    text = (
+        "## Career\n\n"
+        "- Founded Acme Robotics in 2004 with seed money from Ohio investors.\n"
+        "- Sold Acme Robotics to Globex in 2015 for $40 million.\n"
+        "  - Stayed on as chief technology officer until 2018.\n\n"
+        + FILLER
+    )
+    result = compress_text(text, 80)
+    assert len(result) < len(text)
+    assert "## Career" in result
+    assert "- Founded Acme Robotics in 2004 with seed money from Ohio investors.\n" in result
+    assert "\n  - Stayed on as chief technology officer until 2018." in result
+
+
+def test_sentences_of_one_line_are_joined_with_spaces():
+    line = "Jane Doe grew up in Lisbon. She studied marine biology at Porto. She later moved to Boston."
+    result = compress_text(line + "\n\n" + FILLER, 60)
+    kept = [s for s in line.split(". ") if s.rstrip(".") in result]
+    assert len(kept) >= 2
+    assert "\n" not in result.split("\n\n")[0]
+
+
+def test_protected_sections_stay_verbatim():
+    interview = "Q: Where did you grow up?\nA: In Lisbon, by the sea."
+    result = dict(compress_sections([("Interview", interview), ("Dossier", FILLER)], 60, protected=("Interview",)))
+    assert result["Interview"] == interview
+    assert len(result["Dossier"]) < len(FILLER)
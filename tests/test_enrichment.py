@@ -0,0 +1,96 @@
+import threading
+import concurrent.futures
+
+import pytest
+
+from app.services import enrichment
+from app.services.cache import DiskCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, text=""):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = text
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+        return self._payload
+
+
+@pytest.fixture
+def fetches(tmp_path, monkeypatch):
+    monkeypatch.setattr(enrichment, "enrichment_cache", DiskCache("enrich_test", 3600, cache_dir=tmp_path))
+    responses = {}
+    calls = []
+
+    def fetch(email, api_key):
+        calls.append(email)
+        return responses[email]
+
+    monkeypatch.setattr(enrichment, "_fetch", fetch)
+    return responses, calls
+
+
+def test_non_json_body_is_a_failure(fetches):
+    responses, _ = fetches
+    responses["jane@example.com"] = FakeResponse(200, text="<html>maintenance</html>")
+    result = enrichment.enrich_person("jane@example.com", api_key="key")
+    assert result["success"] is False
+    assert "Invalid API response" in result["error"]
+
+
+def test_found_person_is_cached_by_email_and_linkedin(fetches):
+    responses, calls = fetches
+    responses["jane@example.com"] = FakeResponse(200, {"displayName": "Jane Doe", "linkedInUrl": "https://www.linkedin.com/in/jane/"})
+    assert enrichment.enrich_person("jane@example.com", api_key="key")["full_name"] == "Jane Doe"
+    assert enrichment.enrich_person("JANE@example.com ", api_key="key")["full_name"] == "Jane Doe"
+    assert enrichment.enrich_person(linkedin_url="linkedin.com/in/jane", api_key="key")["full_name"] == "Jane Doe"
+    assert calls == ["jane@example.com"]
+
+
+def test_linkedin_hit_for_another_email_is_ignored(fetches):
+    responses, calls = fetches
+    responses["jane@example.com"] = FakeResponse(200, {"displayName": "Jane Doe", "linkedInUrl": "linkedin.com/in/jane"})
+    responses["john@example.com"] = FakeResponse(200, {"displayName": "John Roe", "linkedInUrl": "linkedin.com/in/john"})
+    enrichment.enrich_person("jane@example.com", api_key="key")
+    result = enrichment.enrich_person("john@example.com", linkedin_url="linkedin.com/in/jane", api_key="key")
+    assert result["full_name"] == "John Roe"
+    assert calls == ["jane@example.com", "john@example.com"]
+
+
+def test_enrich_many_reuses_one_pool_across_batches(fetches, monkeypatch):
+    responses, _ = fetches
+    threads = []
+    for n in range(6):
+        responses[f"user{n}@example.com"] = FakeResponse(200, {"displayName": f"User {n}"})
+    fetch = enrichment._fetch
+
+    def recording_fetch(email, api_key):
+        threads.append(threading.current_thread())
+        return fetch(email, api_key)
+
+    monkeypatch.setattr(enrichment, "_fetch", recording_fetch)
+    enrichment.enrich_many([f"user{n}@example.com" for n in range(3)], api_key="key")
+    enrichment.enrich_many([f"user{n}@example.com" for n in range(3, 6)], api_key="key")
+
+    assert all(thread.name.startswith("enrich") for thread in threads)
+    assert enrichment._shared_executor() is enrichment._shared_executor()
+
+
+def test_enrich_many_uses_the_callers_executor(fetches, monkeypatch):
+    responses, _ = fetches
+    responses["jane@example.com"] = FakeResponse(200, {"displayName": "Jane Doe"})
+    threads = []
+    fetch = enrichment._fetch
+
+    def recording_fetch(email, api_key):
+        threads.append(threading.current_thread().name)
+        return fetch(email, api_key)
+
+    monkeypatch.setattr(enrichment, "_fetch", recording_fetch)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="caller") as executor:
+        [result] = enrichment.enrich_many(["jane@example.com"], executor=executor, api_key="key")
+    assert result["full_name"] == "Jane Doe"
+    assert threads[0].startswith("caller")
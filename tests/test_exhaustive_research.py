@@ -0,0 +1,58 @@
+import asyncio
+
+from app.scripts import exhaustive_research
+
+
+class FakeAsyncPerplexity:
+    def __init__(self, api_key=None):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def test_parallel_writes_unpacked_answers_in_query_order(tmp_path, monkeypatch):
+    prompts = []
+
+    async def search(client, query, max_tokens, refresh=False):
+        prompts.append(query)
+        # Later queries answer first
+        await asyncio.sleep(0.01 * (5 - int(query.split()[-1])))
+        if query.endswith("2"):
+            return None
+        return f"answer {query.split()[-1]}"
+
+    monkeypatch.setattr(exhaustive_research, "AsyncPerplexity", FakeAsyncPerplexity)
+    monkeypatch.setattr(exhaustive_research, "search_perplexity_async", search)
+    queries = [f'"Jane Doe" topic {n}' for n in range(1, 5)]
+    timings = exhaustive_research.run_phases_parallel("Jane Doe", [("Phase 1", "bio.md", queries)], tmp_path)
+
+    assert sorted(prompts) == sorted(queries)
+    text = (tmp_path / "bio.md").read_text(encoding="utf-8")
+    assert text.index("answer 1") < text.index("answer 3") < text.index("answer 4")
+    assert "answer 2" not in text
+    assert timings["Phase 1"][0] == 3
+
+
+def test_both_modes_pass_refresh_to_the_cached_search(tmp_path, monkeypatch):
+    seen = []
+
+    async def search_async(client, query, max_tokens, refresh=False):
+        seen.append(("parallel", refresh))
+        return "answer"
+
+    def search_record(client, query, max_tokens, refresh=False):
+        seen.append(("sequential", refresh))
+        return {"content": "answer"}
+
+    monkeypatch.setattr(exhaustive_research, "AsyncPerplexity", FakeAsyncPerplexity)
+    monkeypatch.setattr(exhaustive_research, "search_perplexity_async", search_async)
+    monkeypatch.setattr(exhaustive_research, "search_perplexity_record", search_record)
+    phases = [("Phase 1", "bio.md", ['"Jane Doe" topic 1'])]
+    exhaustive_research.run_phases_parallel("Jane Doe", phases, tmp_path, refresh=True)
+    exhaustive_research.run_phases_sequential(None, phases, tmp_path, refresh=True)
+    exhaustive_research.run_phases_sequential(None, phases, tmp_path)
+    assert seen == [("parallel", True), ("sequential", True), ("sequential", False)]
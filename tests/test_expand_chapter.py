@@ -0,0 +1,15 @@
+from app.scripts import expand_chapter
+from app.services.context_packer import MODEL_CONTEXT_WINDOWS
+
+
+def test_budget_fills_the_model_window(monkeypatch):
+    monkeypatch.setattr(expand_chapter, "CHAPTER_CONTEXT_TOKENS", None)
+    budget = expand_chapter.chapter_context_budget("system", "prompt")
+    window = MODEL_CONTEXT_WINDOWS[expand_chapter.CHAPTER_MODEL]
+    assert budget > 125000
+    assert budget <= (window - expand_chapter.CHAPTER_RESERVED_TOKENS) // 2
+
+
+def test_env_cap_overrides_the_window(monkeypatch):
+    monkeypatch.setattr(expand_chapter, "CHAPTER_CONTEXT_TOKENS", 5000)
+    assert expand_chapter.chapter_context_budget("system", "prompt") == 5000
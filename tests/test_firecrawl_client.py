@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.services import firecrawl_client
+from app.services.cache import DiskCache
+
+
+class FakeClient(firecrawl_client.FirecrawlClient):
+    """FirecrawlClient with the HTTP call replaced by canned responses."""
+
+    def __init__(self, responses):
+        super().__init__(api_key="test-key")
+        self.responses = list(responses)
+        self.queries = []
+
+    async def _post_with_retry(self, payload):
+        self.queries.append(payload["query"])
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = DiskCache("firecrawl_test", ttl_seconds=3600, cache_dir=tmp_path)
+    monkeypatch.setattr(firecrawl_client, "firecrawl_cache", cache)
+    return cache
+
+
+def test_client_requires_api_key(monkeypatch):
+    monkeypatch.setattr(firecrawl_client, "FIRECRAWL_API_KEY", "")
+    with pytest.raises(RuntimeError, match="FIRECRAWL_API_KEY"):
+        firecrawl_client.FirecrawlClient()
+
+
+def test_search_many_without_key_returns_empty_results(monkeypatch):
+    monkeypatch.setattr(firecrawl_client, "FIRECRAWL_API_KEY", "")
+    assert firecrawl_client.search_firecrawl_many(["a", "b"]) == [[], []]
+
+
+def test_results_are_cached(cache):
+    client = FakeClient([{"data": {"web": [{"url": "https://example.com"}]}}])
+    first = asyncio.run(client.search("site:example.com jane"))
+    second = asyncio.run(client.search("site:example.com jane"))
+    assert first == second == [{"url": "https://example.com"}]
+    assert client.queries == ["site:example.com jane"]
+
+
+def test_empty_results_expire_quickly(cache, monkeypatch):
+    monkeypatch.setattr(firecrawl_client, "FIRECRAWL_EMPTY_TTL_SECONDS", 0)
+    client = FakeClient([{"data": {"web": []}}, {"data": {"web": [{"url": "https://example.com"}]}}])
+    assert asyncio.run(client.search("site:example.com new")) == []
+    assert asyncio.run(client.search("site:example.com new")) == [{"url": "https://example.com"}]
+    assert client.queries == ["site:example.com new", "site:example.com new"]
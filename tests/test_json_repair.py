@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from app.scripts.benchmark_json_repair import DEFECTS, synthetic_outline
+from app.services.common import repair_json, safe_json_loads
+
+OUTLINE = synthetic_outline(3)
+TEXT = json.dumps(OUTLINE, indent=2, ensure_ascii=False)
+
+
+def fixes(repairs):
+    return {r["fix"] for r in repairs}
+
+
+@pytest.mark.parametrize("defect", [name for name in DEFECTS if name != "truncated 70%"])
+def test_benchmark_defects_keep_every_chapter(defect):
+    value, _ = repair_json(DEFECTS[defect](TEXT))
+    assert isinstance(value, dict)
+    assert len(value["chapters"]) == 3
+    assert value["book_title"] == OUTLINE["book_title"]
+
+
+def test_benchmark_defects_repair_to_original_content():
+    for defect in ("clean", "fenced", "trailing commas", "smart quotes"):
+        assert repair_json(DEFECTS[defect](TEXT))[0] == OUTLINE, defect
+
+
+def test_truncated_outline_keeps_complete_prefix():
+    value, repairs = repair_json(DEFECTS["truncated 70%"](TEXT))
+    assert 1 <= len(value["chapters"]) <= 3
+    assert value["chapters"][0] == OUTLINE["chapters"][0]
+    assert any(fix.startswith(("closed_truncated", "dropped_truncated")) for fix in fixes(repairs))
+
+
+def test_inner_quotes_and_raw_newlines_are_preserved():
+    value, repairs = repair_json('{"a": "he said "hi" to me", "b": "line one\nline two"}')
+    assert value == {"a": 'he said "hi" to me', "b": "line one\nline two"}
+    assert {"escaped_inner_quote", "escaped_control_character"} <= fixes(repairs)
+
+
+def test_single_quotes_python_literals_and_comments():
+    value, _ = repair_json("{'name': 'Jane', // who\n 'ok': True, 'none': None,}")
+    assert value == {"name": "Jane", "ok": True, "none": None}
+
+
+def test_bracketed_prose_before_object():
+    text = 'Here is the outline [JSON]:\n```json\n{"book_title": "X", "chapters": [{"chapter_title": "One"}]}\n```'
+    assert repair_json(text)[0] == ["JSON"]
+    value, repairs = repair_json(text, expect=dict)
+    assert value == {"book_title": "X", "chapters": [{"chapter_title": "One"}]}
+    assert "removed_leading_text" in fixes(repairs)
+    assert safe_json_loads(text, expect=dict) == value
+
+
+def test_expect_dict_skips_empty_braces_in_prose():
+    text = 'Fill the {} placeholders: {"chapters": [1]}'
+    assert repair_json(text, expect=dict)[0] == {"chapters": [1]}
+
+
+def test_no_json_at_all_raises():
+    with pytest.raises(ValueError):
+        repair_json("no json here")
+    with pytest.raises(ValueError):
+        repair_json("only [a list]", expect=dict)
+
+
+def test_valid_json_is_untouched():
+    assert safe_json_loads('{"a": [1, 2.5, null]}') == {"a": [1, 2.5, None]}
@@ -0,0 +1,64 @@
+import asyncio
+import importlib
+
+from app.services import novelty
+from app.services.novelty import NoveltyTracker
+from app.services.research_engine import run_phases_async
+
+REPEAT = "Jane Doe founded Acme Widgets in Ohio and later served as its chief executive officer."
+
+
+def test_adaptive_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("RESEARCH_ADAPTIVE", raising=False)
+    assert importlib.reload(novelty).RESEARCH_ADAPTIVE is False
+
+
+def test_failed_queries_are_not_scored():
+    tracker = NoveltyTracker()
+    tracker.add([REPEAT])
+    assert tracker.score([None, None]) == 0.0
+    fresh = "A completely different story about sailing across the Atlantic with three friends in winter."
+    assert tracker.score([fresh, None]) == tracker.score([fresh])
+
+
+def _run(search, phases, **kwargs):
+    stats = {}
+    results = asyncio.run(run_phases_async(phases, search, "Jane Doe", adaptive=True, stats=stats, **kwargs))
+    return results, stats
+
+
+def test_repetitive_phase_stops_early():
+    async def search(prompt, max_tokens):
+        return REPEAT
+
+    phases = [("Bio", [f"site:s{i}.com {{figure}}" for i in range(9)])]
+    _, stats = _run(search, phases)
+    assert stats["Bio"]["executed"] < 9
+    assert stats["Bio"]["skipped"] == 9 - stats["Bio"]["executed"]
+
+
+def test_wave_with_failures_never_stops_phase():
+    async def search(prompt, max_tokens):
+        if prompt.startswith("site:s1.com"):
+            raise TimeoutError("429")
+        return REPEAT
+
+    phases = [("Bio", [f"site:s{i}.com {{figure}}" for i in range(9)])]
+    _, stats = _run(search, phases)
+    # The first wave had a failure, so a second wave ran before the phase stopped
+    assert stats["Bio"]["executed"] > 3
+    assert stats["Bio"]["failed"] == 1
+
+
+def test_must_run_queries_survive_early_stop():
+    sent = []
+
+    async def search(prompt, max_tokens):
+        sent.append(prompt)
+        return REPEAT
+
+    queries = [f"site:s{i}.com {{figure}}" for i in range(8)] + ["site:my-blog.example {figure}"]
+    results, stats = _run(search, [("Bio", queries)], must_run=["site:my-blog.example {figure}"])
+    assert "site:my-blog.example Jane Doe" in sent
+    assert stats["Bio"]["skipped"] > 0
+    assert results["Bio"][-1]["query_index"] == 9
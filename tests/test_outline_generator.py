@@ -0,0 +1,60 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud.chapter import get_chapters_for_book
+from app.models.chapter import Chapter
+from app.services.outline_generator import load_outline_chapters, materialize_outline, store_streamed_chapter
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Chapter.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _outline(*titles):
+    return {"chapters": [{"chapter_title": title} for title in titles]}
+
+
+def test_stream_failure_leaves_no_stale_rows(db):
+    book_id = uuid.uuid4()
+    materialize_outline(db, book_id, _outline("a", "b", "c", "d", "e"))
+    db.commit()
+
+    # A regenerate streams two chapters, then fails
+    streamed = _outline("x", "y")
+    for index, chapter in enumerate(streamed["chapters"], start=1):
+        store_streamed_chapter(db, book_id, index, chapter)
+        db.commit()
+
+    rows = get_chapters_for_book(db, book_id)
+    assert [row.title for row in rows] == ["x", "y"]
+
+
+def test_load_rebuilds_rows_that_do_not_match_the_outline(db):
+    book = SimpleNamespace(id=uuid.uuid4(), raw_outline_json=_outline("x", "y"))
+    materialize_outline(db, book.id, _outline("a", "b", "c"))
+    db.commit()
+
+    rows = load_outline_chapters(db, book)
+    assert [row.title for row in rows] == ["x", "y"]
+    assert [row.title for row in get_chapters_for_book(db, book.id)] == ["x", "y"]
+
+
+def test_load_keeps_matching_rows(db):
+    book = SimpleNamespace(id=uuid.uuid4(), raw_outline_json=_outline("a", "b"))
+    rows = materialize_outline(db, book.id, book.raw_outline_json)
+    rows[0].pages = {"sections": [], "word_count": 0}
+    rows[0].status = "ready"
+    db.commit()
+
+    loaded = load_outline_chapters(db, book)
+    assert loaded[0].status == "ready"
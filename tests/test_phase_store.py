@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services.phase_store import FilePhaseStore, is_complete, phase_fingerprint
+from app.services.research_engine import run_phases_async
+
+RECORDS = [{"query_index": 1, "query": "q1", "content": "answer"}]
+
+
+def test_fingerprint_changes_with_queries():
+    assert phase_fingerprint("Bio", ["a"], "sonar-pro", 2000) != phase_fingerprint("Bio", ["b"], "sonar-pro", 2000)
+
+
+def test_is_complete():
+    assert is_complete(RECORDS, {"queries": 1, "executed": 1, "skipped": 0, "failed": 0})
+    assert not is_complete(RECORDS, {"queries": 2, "executed": 2, "skipped": 0, "failed": 1})
+    assert is_complete(RECORDS, {"queries": 4, "executed": 1, "skipped": 3, "failed": 0, "stop_reason": "novelty"})
+    assert not is_complete([], {})
+
+
+def test_complete_phase_is_reused(tmp_path):
+    FilePhaseStore(tmp_path).save({"Bio": RECORDS}, {"Bio": "fp"}, {"Bio": {"skipped": 0, "failed": 0}})
+    store = FilePhaseStore(tmp_path)
+    assert store.get("Bio", "fp") == RECORDS
+    assert store.get("Bio", "other") is None
+
+
+def test_incomplete_phases_are_not_reused(tmp_path):
+    FilePhaseStore(tmp_path).save(
+        {"Bio": RECORDS, "Media": RECORDS},
+        {"Bio": "fp-bio", "Media": "fp-media"},
+        {"Bio": {"skipped": 0, "failed": 2}, "Media": {"skipped": 5, "failed": 1}},
+    )
+    store = FilePhaseStore(tmp_path)
+    assert store.get("Bio", "fp-bio") is None
+    assert store.get("Media", "fp-media") is None
+
+
+def test_incomplete_rerun_replaces_complete_entry(tmp_path):
+    store = FilePhaseStore(tmp_path)
+    store.save({"Bio": RECORDS}, {"Bio": "fp"}, {"Bio": {"skipped": 0, "failed": 0}})
+    store.save({"Bio": RECORDS}, {"Bio": "fp"}, {"Bio": {"skipped": 0, "failed": 1}})
+    assert FilePhaseStore(tmp_path).get("Bio", "fp") is None
+
+
+def test_adaptively_stopped_phase_is_reused(tmp_path):
+    calls = []
+
+    async def search(prompt, max_tokens):
+        calls.append(prompt)
+        return "Jane Doe founded Acme Widgets in Ohio and later served as its chief executive officer."
+
+    phases = [("Bio", [f"site:s{i}.com {{figure}}" for i in range(9)])]
+    stats = {}
+    results = asyncio.run(run_phases_async(phases, search, "Jane Doe", adaptive=True, stats=stats))
+    assert stats["Bio"]["skipped"] > 0
+    assert stats["Bio"]["stop_reason"] == "novelty"
+
+    FilePhaseStore(tmp_path).save(results, {"Bio": "fp"}, stats)
+    entry = FilePhaseStore(tmp_path)._load()["Bio"]
+    assert entry["complete"] and entry["stop_reason"] == "novelty"
+    assert FilePhaseStore(tmp_path).get("Bio", "fp") == results["Bio"]
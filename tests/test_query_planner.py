@@ -0,0 +1,65 @@
+import asyncio
+
+from app.services.query_planner import normalize_query, plan_queries, split_answer
+from app.services.research_engine import run_phases_async
+
+
+def test_normalize_query_ignores_case_whitespace_and_quote_style():
+    assert normalize_query("'Jane Doe'  Career") == normalize_query('"jane doe" career')
+
+
+def test_plan_merges_duplicates_and_packs_same_subject():
+    phases = [
+        ("Bio", ['"Jane Doe" early life', '"Jane Doe" education', "site:example.com Jane Doe"]),
+        ("Media", ['"jane doe"  early life', '"Jane Doe" interviews']),
+    ]
+    units, planned = plan_queries(phases, pack_size=3)
+    assert planned == 5
+    site_units = [u for u in units if u["prompt"].startswith("site:")]
+    assert len(site_units) == 1 and len(site_units[0]["questions"]) == 1
+    packed = [u for u in units if len(u["questions"]) > 1]
+    assert len(packed) == 1 and len(packed[0]["questions"]) == 3
+    early_life = packed[0]["questions"][0]
+    assert early_life["slots"] == [("Bio", 1), ("Media", 1)]
+
+
+def test_split_answer_by_markers():
+    unit = {"questions": [{"query": "a"}, {"query": "b"}]}
+    assert split_answer(unit, "## Q1\nfirst\n## Q2 - b\nsecond") == ["first", "second"]
+
+
+def test_split_answer_without_markers_leaves_others_unanswered():
+    unit = {"questions": [{"query": "a"}, {"query": "b"}, {"query": "c"}]}
+    assert split_answer(unit, "one combined answer") == ["one combined answer", None, None]
+
+
+def test_engine_asks_skipped_packed_questions_separately():
+    prompts = []
+
+    async def search(prompt, max_tokens):
+        prompts.append(prompt)
+        if prompt.startswith("Research each"):
+            return "An answer that ignores the requested format."
+        return f"Separate answer to {prompt}"
+
+    phases = [("Bio", ['"{figure}" early life', '"{figure}" education', '"{figure}" family'])]
+    results = asyncio.run(run_phases_async(phases, search, "Jane Doe", adaptive=False))
+    records = results["Bio"]
+    assert [r["query_index"] for r in records] == [1, 2, 3]
+    assert records[0]["content"] == "An answer that ignores the requested format."
+    assert records[1]["content"] == 'Separate answer to "Jane Doe" education'
+    assert records[2]["content"] == 'Separate answer to "Jane Doe" family'
+    assert len(prompts) == 3
+
+
+def test_engine_reports_failed_queries():
+    async def search(prompt, max_tokens):
+        if "education" in prompt:
+            raise TimeoutError("slow")
+        return f"Answer to {prompt}"
+
+    phases = [("Bio", ["site:a.com {figure}", "site:b.com {figure} education"])]
+    stats = {}
+    results = asyncio.run(run_phases_async(phases, search, "Jane Doe", adaptive=False, stats=stats))
+    assert [r["query_index"] for r in results["Bio"]] == [1]
+    assert stats["Bio"] == {"queries": 2, "executed": 2, "skipped": 0, "failed": 1, "stop_reason": None}
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import time
+
+from app.services import rate_limiter
+from app.services.rate_limiter import RateLimiter
+
+
+def test_empty_bucket_reports_the_wait(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_DIR", tmp_path)
+    limiter = RateLimiter("test", rpm=5)
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() > 0
+
+
+def test_async_acquire_keeps_the_event_loop_free(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_DIR", tmp_path)
+    limiter = RateLimiter("test", rpm=600)
+    lock_threads = []
+
+    def slow_try_acquire(tokens=0):
+        # Stands in for flock waiting on another process
+        lock_threads.append(threading.get_ident())
+        time.sleep(0.2)
+        return 0.0
+
+    monkeypatch.setattr(limiter, "try_acquire", slow_try_acquire)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await limiter.acquire_async()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 5
+    assert threading.get_ident() not in lock_threads
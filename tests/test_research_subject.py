@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud.research import research_subject_key, resolve_research_subject, subject_profile_url
+from app.models.research import ResearchSubject
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    ResearchSubject.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_key_ignores_case_and_punctuation():
+    assert research_subject_key("Jane  Doe", "CEO, Acme") == research_subject_key("jane doe", "ceo acme")
+
+
+def test_profile_url_separates_namesakes():
+    a = research_subject_key("Jane Doe", "CEO", "https://www.linkedin.com/in/jane-doe-1/")
+    b = research_subject_key("Jane Doe", "CEO", "linkedin.com/in/jane-doe-2")
+    assert a != b
+    assert a == research_subject_key("Jane Doe", "CEO", "http://linkedin.com/in/Jane-Doe-1?trk=x")
+
+
+def test_profile_url_prefers_linkedin():
+    assert subject_profile_url({"linkedin": "li", "twitter": "x", "youtube": "yt"}) == "li"
+    assert subject_profile_url({"linkedin": None, "twitter": "x", "youtube": "yt"}) == "x"
+    assert subject_profile_url({"linkedin": None, "twitter": None, "youtube": None}) is None
+
+
+def test_resolve_reuses_subject_per_identity(db):
+    first = resolve_research_subject(db, "Jane Doe", "CEO", "linkedin.com/in/jane-doe-1")
+    again = resolve_research_subject(db, "jane doe", "ceo", "https://linkedin.com/in/jane-doe-1/")
+    namesake = resolve_research_subject(db, "Jane Doe", "CEO", "linkedin.com/in/jane-doe-2")
+    assert first.id == again.id
+    assert namesake.id != first.id
@@ -0,0 +1,46 @@
+import threading
+
+from app.services import speculative
+from app.services.speculative import CANCELLED, DONE, SpeculativeQueue
+
+
+def test_settle_waits_for_running_job_and_forgets_it():
+    started, release = threading.Event(), threading.Event()
+
+    def job(cancel):
+        started.set()
+        release.wait(5)
+
+    queue = SpeculativeQueue("test-wait")
+    assert queue.submit("user-1", "fp", job)
+    assert started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    assert queue.settle("user-1", timeout=5) == DONE
+    assert queue.state("user-1") is None
+    assert queue._jobs == {}
+
+
+def test_settle_cancels_pending_job():
+    release = threading.Event()
+    ran = []
+    queue = SpeculativeQueue("test-cancel")
+    queue.submit("busy", "fp", lambda cancel: release.wait(5))
+    queue.submit("user-2", "fp", lambda cancel: ran.append(True))
+    assert queue.settle("user-2") == CANCELLED
+    release.set()
+    queue.settle("busy", timeout=5)
+    assert ran == []
+    assert queue._jobs == {}
+
+
+def test_same_fingerprint_is_not_resubmitted_until_pruned(monkeypatch):
+    queue = SpeculativeQueue("test-prune")
+    done = threading.Event()
+    assert queue.submit("user-3", "fp", lambda cancel: done.set())
+    assert done.wait(5)
+    queue._jobs["user-3"].finished.wait(5)
+    assert not queue.submit("user-3", "fp", lambda cancel: None)
+
+    monkeypatch.setattr(speculative, "SPECULATIVE_JOB_RETENTION_SECONDS", -1)
+    assert queue.submit("other", "fp", lambda cancel: None)
+    assert "user-3" not in queue._jobs
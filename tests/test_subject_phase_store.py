@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.research import ResearchSubjectPhase
+from app.services.phase_store import SubjectPhaseStore, sources_key
+
+RECORDS = [{"query_index": 1, "query": "q1", "content": "answer"}]
+COMPLETE = {"skipped": 0, "failed": 0}
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(element, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    ResearchSubjectPhase.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def _save(store, phase, fingerprint, records=RECORDS):
+    store.save({phase: records}, {phase: fingerprint}, {phase: COMPLETE})
+
+
+def test_sources_key_ignores_order_and_case():
+    a = {"research_sources": ["b.com", "A.com"], "linkedin": "li", "twitter": None, "youtube": None}
+    b = {"research_sources": ["a.com", "b.com"], "linkedin": "LI", "twitter": None, "youtube": None}
+    assert sources_key(a) == sources_key(b)
+    assert sources_key({"research_sources": [], "linkedin": None}) == ""
+
+
+def test_source_phases_are_kept_per_user_sources(session_factory):
+    subject_id = uuid.uuid4()
+    mine = SubjectPhaseStore(subject_id, session_factory, sources={"research_sources": ["mine.com"]})
+    theirs = SubjectPhaseStore(subject_id, session_factory, sources={"research_sources": ["theirs.com"]})
+
+    _save(mine, "Biography", "fp-mine")
+    _save(theirs, "Biography", "fp-theirs", [{**RECORDS[0], "content": "theirs"}])
+
+    # Neither run overwrote the other's row
+    assert mine.get("Biography", "fp-mine") == RECORDS
+    assert theirs.get("Biography", "fp-theirs")[0]["content"] == "theirs"
+
+
+def test_other_phases_stay_shared(session_factory):
+    subject_id = uuid.uuid4()
+    mine = SubjectPhaseStore(subject_id, session_factory, sources={"research_sources": ["mine.com"]})
+    theirs = SubjectPhaseStore(subject_id, session_factory, sources={"research_sources": ["theirs.com"]})
+
+    _save(mine, "Themes", "fp")
+    assert theirs.get("Themes", "fp") == RECORDS
+    db = session_factory()
+    assert db.query(ResearchSubjectPhase).filter(ResearchSubjectPhase.phase == "Themes").count() == 1
+    db.close()
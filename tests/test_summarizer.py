@@ -0,0 +1,61 @@
+import pytest
+
+from app.services import summarizer
+from app.services.cache import DiskCache
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(summarizer, "chunk_summary_cache", DiskCache("summaries_test", 3600, cache_dir=tmp_path))
+
+
+def test_memo_key_includes_title():
+    calls = []
+
+    def summarize(text, title):
+        calls.append(title)
+        return f"{title}: {len(text)}"
+
+    assert summarizer.map_reduce_summarize("short text", summarize, title="Experience") == "Experience: 10"
+    assert summarizer.map_reduce_summarize("short text", summarize, title="Education") == "Education: 10"
+    assert summarizer.map_reduce_summarize("short text", summarize, title="Education") == "Education: 10"
+    assert calls == ["Experience", "Education"]
+
+
+def test_large_text_is_mapped_and_reduced():
+    def summarize(text, title):
+        return "summary of " + title
+
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 200 for i in range(12))
+    result = summarizer.map_reduce_summarize(text, summarize, title="Bio", chunk_tokens=300, max_workers=2)
+    assert result == "summary of Bio - Combined Summary"
+
+
+def test_errors_are_not_memoized():
+    answers = iter(["Error: rate limited", "fine"])
+
+    def summarize(text, title):
+        return next(answers)
+
+    assert summarizer.map_reduce_summarize("text", summarize).startswith("Error")
+    assert summarizer.map_reduce_summarize("text", summarize) == "fine"
+
+
+def test_appended_chunk_reuses_earlier_chunk_memos():
+    chunk_calls = []
+
+    def summarize(text, title):
+        if "(chunk" in title:
+            chunk_calls.append(text)
+        return "summary of " + title
+
+    paragraphs = [f"Paragraph {i}. " + "word " * 200 for i in range(4)]
+    summarizer.map_reduce_summarize("\n\n".join(paragraphs[:3]), summarize, title="Bio", chunk_tokens=300)
+    first_run = list(chunk_calls)
+    assert len(first_run) == 3
+
+    chunk_calls.clear()
+    summarizer.map_reduce_summarize("\n\n".join(paragraphs), summarize, title="Bio", chunk_tokens=300)
+    # Only the new chunk is summarized at the chunk level (plus any reduce-level chunks)
+    assert not set(first_run) & set(chunk_calls)
+    assert any(text.startswith("Paragraph 3.") for text in chunk_calls)
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.scripts import web_research
+from app.services.cache import DiskCache
+
+
+class FakeClient:
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, max_tokens, temperature):
+        self.prompts.append(messages[0]["content"])
+        message = SimpleNamespace(content=f"answer {len(self.prompts)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_research, "research_cache", DiskCache("research_test", 3600, cache_dir=tmp_path))
+    monkeypatch.setattr(web_research, "acquire", lambda *args: None)
+
+
+def test_sync_search_uses_research_cache():
+    client = FakeClient()
+    first = web_research.search_perplexity_record(client, '"Jane Doe" biography')
+    again = web_research.search_perplexity_record(client, '"jane doe"  biography')
+    assert first["content"] == again["content"] == "answer 1"
+    assert len(client.prompts) == 1
+
+
+def test_refresh_skips_cached_answer_and_stores_new_one():
+    client = FakeClient()
+    web_research.search_perplexity_record(client, '"Jane Doe" biography')
+    fresh = web_research.search_perplexity_record(client, '"Jane Doe" biography', refresh=True)
+    assert fresh["content"] == "answer 2"
+    assert web_research.search_perplexity_record(client, '"Jane Doe" biography')["content"] == "answer 2"